@@ -1,4 +1,6 @@
 from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right
+from operator import attrgetter
 
 
 class Repository(ABC):
@@ -26,13 +28,74 @@ class Repository(ABC):
     def get_by_attribute(self, attr_name, attr_value):
         pass
 
+    @abstractmethod
+    def get_all_by_attribute(self, attr_name, attr_value):
+        pass
+
+    @abstractmethod
+    def get_range(self, attr_name, low=None, high=None):
+        pass
+
 
 class InMemoryRepository(Repository):
-    def __init__(self):
+    """In-memory storage with optional secondary indexes.
+
+    hash_indexes lists the attributes looked up by equality, in O(1)
+    for lookups and writes. ordered_indexes lists those looked up by
+    range: lookups bisect a sorted list in O(log N), but each write
+    inserts into or deletes from that list in O(N). An attribute may be
+    a dotted path such as 'place.id'. The indexes are kept up to date by
+    add(), update() and delete(); objects changed without update() must
+    be added again. Lookups on other attributes scan the storage.
+    """
+
+    def __init__(self, hash_indexes=(), ordered_indexes=()):
         self._storage = {}
+        # attribute -> value -> {id: obj}, in insertion order
+        self._hash_indexes = {name: {} for name in hash_indexes}
+        # attribute -> (sorted values, ids in the same order)
+        self._ordered_indexes = {name: ([], []) for name in ordered_indexes}
+        # id -> {attribute: value indexed}, to unindex changed objects
+        self._indexed_values = {}
+
+    def _index(self, obj):
+        values = {}
+        for name, buckets in self._hash_indexes.items():
+            value = attrgetter(name)(obj)
+            buckets.setdefault(value, {})[obj.id] = obj
+            values[name] = value
+        for name, (keys, ids) in self._ordered_indexes.items():
+            value = attrgetter(name)(obj)
+            if value is None:
+                continue
+            position = bisect_right(keys, value)
+            keys.insert(position, value)
+            ids.insert(position, obj.id)
+            values[name] = value
+        self._indexed_values[obj.id] = values
+
+    def _unindex(self, obj_id):
+        values = self._indexed_values.pop(obj_id, {})
+        for name, buckets in self._hash_indexes.items():
+            bucket = buckets.get(values.get(name))
+            if bucket is not None:
+                bucket.pop(obj_id, None)
+                if not bucket:
+                    del buckets[values[name]]
+        for name, (keys, ids) in self._ordered_indexes.items():
+            if name not in values:
+                continue
+            value = values[name]
+            start = bisect_left(keys, value)
+            position = ids.index(obj_id, start, bisect_right(keys, value))
+            del keys[position]
+            del ids[position]
 
     def add(self, obj):
+        if obj.id in self._storage:
+            self._unindex(obj.id)
         self._storage[obj.id] = obj
+        self._index(obj)
 
     def get(self, obj_id):
         return self._storage.get(obj_id)
@@ -43,12 +106,47 @@ class InMemoryRepository(Repository):
     def update(self, obj_id, data):
         obj = self.get(obj_id)
         if obj:
-            obj.update(data)
+            self._unindex(obj_id)
+            try:
+                obj.update(data)
+            finally:
+                self._index(obj)
 
     def delete(self, obj_id):
         if obj_id in self._storage:
+            self._unindex(obj_id)
             del self._storage[obj_id]
 
     def get_by_attribute(self, attr_name, attr_value):
+        if attr_name in self._hash_indexes:
+            bucket = self._hash_indexes[attr_name].get(attr_value, {})
+            return next(iter(bucket.values()), None)
+        getter = attrgetter(attr_name)
         return next((obj for obj in self._storage.values()
-                    if getattr(obj, attr_name) == attr_value), None)
+                    if getter(obj) == attr_value), None)
+
+    def get_all_by_attribute(self, attr_name, attr_value):
+        if attr_name in self._hash_indexes:
+            bucket = self._hash_indexes[attr_name].get(attr_value, {})
+            return list(bucket.values())
+        getter = attrgetter(attr_name)
+        return [obj for obj in self._storage.values()
+                if getter(obj) == attr_value]
+
+    def get_range(self, attr_name, low=None, high=None):
+        """Return the objects with low <= attribute <= high, in order.
+
+        A bound left to None is open; objects whose attribute is None
+        are never returned.
+        """
+        if attr_name in self._ordered_indexes:
+            keys, ids = self._ordered_indexes[attr_name]
+            start = 0 if low is None else bisect_left(keys, low)
+            end = len(keys) if high is None else bisect_right(keys, high)
+            return [self._storage[obj_id] for obj_id in ids[start:end]]
+        getter = attrgetter(attr_name)
+        return sorted((obj for obj in self._storage.values()
+                       if getter(obj) is not None
+                       and (low is None or getter(obj) >= low)
+                       and (high is None or getter(obj) <= high)),
+                      key=getter)
@@ -7,10 +7,14 @@ from app.persistence.repository import InMemoryRepository
 
 class HBnBFacade:
     def __init__(self):
-        self.user_repo = InMemoryRepository()
-        self.amenity_repo = InMemoryRepository()
-        self.review_repo = InMemoryRepository()
-        self.place_repo = InMemoryRepository()
+        self.user_repo = InMemoryRepository(
+            hash_indexes=('email',), ordered_indexes=('created_at',))
+        self.amenity_repo = InMemoryRepository(hash_indexes=('name',))
+        self.review_repo = InMemoryRepository(
+            hash_indexes=('place.id',), ordered_indexes=('created_at',))
+        self.place_repo = InMemoryRepository(
+            hash_indexes=('title',),
+            ordered_indexes=('price', 'created_at'))
 
     def create_user(self, user_data):
         user = UserModel(**user_data)
@@ -27,7 +31,7 @@ class HBnBFacade:
         user = self.user_repo.get(user_id)
         if not user:
             return None
-        user.update(user_data)
+        self.user_repo.update(user_id, user_data)
         user.validate_user_data()
         user.save()
         return user
@@ -58,7 +62,7 @@ class HBnBFacade:
         amenity = self.amenity_repo.get(amenity_id)
         if not amenity:
             return None
-        amenity.update(amenity_data)
+        self.amenity_repo.update(amenity_id, amenity_data)
         amenity.save()
         return amenity
 
@@ -90,6 +94,10 @@ class HBnBFacade:
         # Placeholder for logic to retrieve all places
         return self.place_repo.get_all()
 
+    def get_places_by_price(self, min_price=None, max_price=None):
+        # Places priced between min_price and max_price, cheapest first
+        return self.place_repo.get_range('price', min_price, max_price)
+
     def update_place(self, place_id, place_data):
         # Placeholder for logic to update a place
         place = self.place_repo.get(place_id)
@@ -105,7 +113,7 @@ class HBnBFacade:
             place_data['owner'] = owner
             del place_data['owner_id']
 
-        place.update(place_data)
+        self.place_repo.update(place_id, place_data)
         place.save()
         return place
 
@@ -145,16 +153,14 @@ class HBnBFacade:
 
     def get_reviews_by_place(self, place_id):
         # Retrieve all reviews for a specific place
-        all_reviews = self.review_repo.get_all()
-        return [review for review in all_reviews
-                if review.place.id == place_id]
+        return self.review_repo.get_all_by_attribute('place.id', place_id)
 
     def update_review(self, review_id, review_data):
         # Placeholder for logic to update a review
         review = self.review_repo.get(review_id)
         if not review:
             return None
-        review.update(review_data)
+        self.review_repo.update(review_id, review_data)
         review.save()
         return review
 
@@ -1,5 +1,7 @@
 import unittest
 from app import create_app
+from app.models.user import UserModel
+from app.persistence.repository import InMemoryRepository
 
 
 class TestEndpointsValidation(unittest.TestCase):
@@ -575,6 +577,78 @@ class TestEndpointsValidation(unittest.TestCase):
         data = response.get_json()
         self.assertIn('error', data)
 
+    # ========================================================================
+    # REPOSITORY TESTS - Secondary indexes
+    # ========================================================================
+
+    def test_repository_hash_index_follows_updates(self):
+        """Test equality lookups after add, update and delete"""
+        repo = InMemoryRepository(hash_indexes=('email',))
+        user = UserModel("Jane", "Doe", "jane@example.com")
+        repo.add(user)
+        self.assertIs(repo.get_by_attribute('email', 'jane@example.com'),
+                      user)
+
+        repo.update(user.id, {"email": "jane.doe@example.com"})
+        self.assertIsNone(repo.get_by_attribute('email', 'jane@example.com'))
+        self.assertIs(repo.get_by_attribute('email', 'jane.doe@example.com'),
+                      user)
+
+        repo.delete(user.id)
+        self.assertEqual(
+            repo.get_all_by_attribute('email', 'jane.doe@example.com'), [])
+
+    def test_repository_ordered_index_range(self):
+        """Test range lookups on an ordered index and without one"""
+        indexed = InMemoryRepository(ordered_indexes=('first_name',))
+        scanned = InMemoryRepository()
+        for name in ["Carl", "Anna", "Eve", "Bob", "Dan"]:
+            user = UserModel(name, "Doe", name.lower() + "@example.com")
+            indexed.add(user)
+            scanned.add(user)
+        indexed.update(indexed.get_by_attribute('first_name', 'Eve').id,
+                       {"first_name": "Abe"})
+
+        for repo in (indexed, scanned):
+            names = [user.first_name
+                     for user in repo.get_range('first_name', 'B', 'Dan')]
+            self.assertEqual(names, ["Bob", "Carl", "Dan"])
+            names = [user.first_name
+                     for user in repo.get_range('first_name', high='Anna')]
+            self.assertEqual(names, ["Abe", "Anna"])
+
+    def test_get_reviews_by_place(self):
+        """Test listing the reviews of a place through its index"""
+        user = self.client.post('/api/v1/users/', json={
+            "first_name": "Jane",
+            "last_name": "Doe",
+            "email": "reviews.by.place@example.com"
+        }).get_json()
+        place_ids = []
+        for title in ["Indexed Loft", "Indexed Cabin"]:
+            place_ids.append(self.client.post('/api/v1/places/', json={
+                "title": title,
+                "price": 80.0,
+                "latitude": 10.0,
+                "longitude": 20.0,
+                "owner_id": user['id']
+            }).get_json()['id'])
+        for place_id, text in [(place_ids[0], "Great"),
+                               (place_ids[1], "Cosy"),
+                               (place_ids[0], "Quiet")]:
+            self.client.post('/api/v1/reviews/', json={
+                "text": text,
+                "rating": 5,
+                "user_id": user['id'],
+                "place_id": place_id
+            })
+
+        response = self.client.get(
+            '/api/v1/places/{}/reviews'.format(place_ids[0]))
+        self.assertEqual(response.status_code, 200)
+        texts = [review['text'] for review in response.get_json()]
+        self.assertEqual(texts, ["Great", "Quiet"])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -4,22 +4,26 @@
 This module defines the Flask application factory pattern.
 It initializes all extensions (database, authentication, API)
 and registers all routes and namespaces.
+
+Scripts create a lean application with create_app(config, http=False):
+only the database, its engines and the password hashing are set up, and
+flask-restx, CORS and the API namespaces are never imported.
 """
 from flask import Flask, jsonify
-from flask_restx import Api
 from flask_bcrypt import Bcrypt
 from flask_jwt_extended import JWTManager
 from flask_sqlalchemy import SQLAlchemy
-from flask_cors import CORS
+from app.persistence.routing import RoutingSession
 
 # Initialize Flask extensions
 # These are initialized here but configured in create_app()
 bcrypt = Bcrypt()  # Password hashing
 jwt = JWTManager()  # JWT token management
-db = SQLAlchemy()  # Database ORM
+# Database ORM, sessions route marked reads to the optional read replica
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 
-def create_app(config_class="config.DevelopmentConfig"):
+def create_app(config_class="config.DevelopmentConfig", http=True):
     """Create and configure the Flask application.
     
     This function implements the application factory pattern,
@@ -28,6 +32,8 @@ def create_app(config_class="config.DevelopmentConfig"):
     Args:
         config_class (str): Path to configuration class to use.
                            Default: "config.DevelopmentConfig"
+        http (bool): Set up the HTTP layer (CORS, request hooks, API
+            namespaces and documentation). Scripts pass False.
     
     Returns:
         Flask: Configured Flask application instance
@@ -38,18 +44,55 @@ def create_app(config_class="config.DevelopmentConfig"):
     # Load configuration from the specified class
     app.config.from_object(config_class)
     
+    # Initialize extensions with the app instance
+    bcrypt.init_app(app)  # Enable password hashing
+    jwt.init_app(app)  # Enable JWT authentication
+    db.init_app(app)  # Connect database ORM
+
+    # Register every table on db.metadata, so db.create_all() is complete
+    # even when no namespace or repository has been imported
+    from app.models import amenity, place, refresh_token, review, user
+
+    # Read replica engine, if SQLALCHEMY_READ_REPLICA_URI is set
+    from app.persistence import routing
+    routing.init_app(app)
+
+    # Connection pragmas (WAL, busy timeout...) for SQLite engines
+    from app.persistence import sqlite
+    sqlite.init_app(app)
+
+    # Configure the business facade (caches) for this app instance, when
+    # it is first used
+    from app import services
+    services.init_app(app)
+
+    if not http:
+        return app
+
     # Configure CORS to allow requests from frontend
     # This must be done AFTER loading config
+    from flask_cors import CORS
     CORS(app, 
          resources={r"/api/*": {"origins": "*"}},
-         allow_headers=["Content-Type", "Authorization"],
+         allow_headers=["Content-Type", "Authorization",
+                        "If-None-Match", "If-Modified-Since"],
+         expose_headers=["X-Next-Cursor", "Link", "ETag", "Last-Modified",
+                         "X-DB-Query-Count", "X-DB-Time-Ms"],
          methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
          supports_credentials=False)
 
-    # Initialize extensions with the app instance
-    bcrypt.init_app(app)  # Enable password hashing
-    jwt.init_app(app)  # Enable JWT authentication
-    db.init_app(app)  # Connect database ORM
+    # Per-route latency, SQL statement counts and /api/metrics, set up
+    # before the unit of work so request numbers include the commit
+    from app import metrics
+    metrics.init_app(app)
+
+    # Commit once per request instead of once per repository write
+    from app.persistence import unit_of_work
+    unit_of_work.init_app(app)
+
+    # gzip/deflate/br compression of large responses
+    from app import compression
+    compression.init_app(app)
 
     # Import API namespaces here to avoid circular imports
     # Each namespace handles a specific resource (users, places, etc.)
@@ -60,12 +103,33 @@ def create_app(config_class="config.DevelopmentConfig"):
     from app.api.v1.auth import api as auth_ns
 
     # Create Flask-RESTX API instance with documentation
+    # Swagger UI at /api/v1/ and spec at /swagger.json unless API_DOCS is
+    # off; flask-restx builds the spec on its first request only
+    from flask_restx import Api
+    docs = app.config.get('API_DOCS', True)
     api = Api(
-        app,
         version='1.0',
         title='HBnB API',
         description='HBnB Application API',
-        doc='/api/v1/')  # Swagger documentation available at /api/v1/
+        doc='/api/v1/' if docs else False)
+    # Api(app, add_specs=...) ignores add_specs, init_app() honours it
+    api.init_app(app, add_specs=docs)
+
+    # flask-restx turns every exception raised by a resource into a 500
+    # unless it has a handler for it. JWT errors are re-raised from theirs:
+    # flask-restx then falls back to Flask's error handling, where
+    # JWTManager answers them (401, or 422 for malformed tokens)
+    from flask_jwt_extended.exceptions import JWTExtendedException
+    from jwt.exceptions import PyJWTError
+
+    @api.errorhandler(JWTExtendedException)
+    @api.errorhandler(PyJWTError)
+    def handle_jwt_error(error):
+        raise error
+
+    # Encode JSON responses with orjson when it is installed
+    from app.api.v1.serializers import output_json
+    api.representation('application/json')(output_json)
 
     # Register all API namespaces with their URL prefixes
     # This creates the RESTful API structure
@@ -99,13 +163,14 @@ def create_app(config_class="config.DevelopmentConfig"):
         """
         return jsonify({
             'message': 'Welcome to HBnB API',
-            'documentation': '/api/v1/',
+            'documentation': '/api/v1/' if docs else None,
             'endpoints': {
                 'users': '/api/v1/users',
                 'places': '/api/v1/places',
                 'amenities': '/api/v1/amenities',
                 'reviews': '/api/v1/reviews',
-                'auth': '/api/v1/auth'
+                'auth': '/api/v1/auth',
+                'metrics': '/api/metrics'
             }
         })
     
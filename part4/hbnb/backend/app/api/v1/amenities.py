@@ -1,4 +1,10 @@
+from flask import request
 from app.services import facade
+from app.api.v1.batch import batch_errors_response, parse_batch
+from app.api.v1.conditional import (collection_etag, conditional_response,
+                                    make_etag)
+from app.api.v1.pagination import PAGE_PARAMS, page_headers, parse_page_args
+from app.api.v1.serializers import AMENITY, FIELDS_PARAMS, list_response
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt
 
@@ -22,6 +28,30 @@ update_response_model = api.model('UpdateResponse', {
 })
 
 
+def validate_new_amenity(amenity_data):
+    """Validate the payload of a new amenity.
+
+    Args:
+        amenity_data (dict): Amenity payload
+
+    Returns:
+        str: Error message, or None if the payload is valid
+    """
+    # Validate required field FIRST
+    if not amenity_data or 'name' not in amenity_data:
+        return 'Name is required'
+
+    # Validate name is string type
+    if not isinstance(amenity_data['name'], str):
+        return 'Name must be a string'
+
+    # Validate name format
+    if not amenity_data['name'].strip():
+        return 'Name cannot be empty'
+
+    return None
+
+
 @api.route('/')
 class AmenityList(Resource):
     @api.expect(amenity_model)
@@ -39,30 +69,19 @@ class AmenityList(Resource):
         amenity_data = api.payload
 
         try:
-            # Validate required field FIRST
-            if not amenity_data or 'name' not in amenity_data:
-                return {'error': 'Name is required'}, 400
-
-            # Validate name is string type
-            if not isinstance(amenity_data['name'], str):
-                return {'error': 'Name must be a string'}, 400
-
-            # Validate name format
-            name = amenity_data['name'].strip()
-            if not name:
-                return {'error': 'Name cannot be empty'}, 400
+            error = validate_new_amenity(amenity_data)
+            if error:
+                return {'error': error}, 400
 
             # Check for duplicate amenity
+            name = amenity_data['name'].strip()
             existing_amenity = facade.get_amenity_by_name(name)
             if existing_amenity:
                 return {'error': 'Amenity already exist'}, 400
 
             # Try to create the amenity (this will trigger validation)
             new_amenity = facade.create_amenity(amenity_data)
-            return {
-                'id': new_amenity.id,
-                'name': new_amenity.name
-            }, 201
+            return AMENITY.dump(new_amenity), 201
 
         except ValueError as e:
             # Handle validation errors from the model
@@ -71,32 +90,102 @@ class AmenityList(Resource):
             # Handle any other unexpected errors
             return {'error': 'Internal server error', 'message': str(e)}, 500
 
+    @api.doc(params={**PAGE_PARAMS, **FIELDS_PARAMS})
     @api.response(200, 'List of amenities retrieved successfully')
+    @api.response(304, 'List not modified')
+    @api.response(400, 'Invalid pagination or fields parameters')
     def get(self):
         """Retrieve a list of all amenities"""
         try:
-            amenities = facade.get_all_amenities()
-            return [{'id': amenity.id, 'name': amenity.name}
-                    for amenity in amenities], 200
+            limit, cursor = parse_page_args(request.args)
+            fields = AMENITY.request_fields()
+
+            def build():
+                headers = {}
+                if limit is None:
+                    amenities = facade.get_all_amenities()
+                else:
+                    amenities, next_cursor = facade.get_amenities_page(
+                        limit, cursor)
+                    headers = page_headers(request, next_cursor)
+                return (list_response(AMENITY.dump_many(amenities, fields)),
+                        headers)
+
+            version = facade.get_amenities_version()
+            return conditional_response(collection_etag(version), None,
+                                        build)
+        except ValueError as e:
+            return {'error': str(e)}, 400
         except Exception as e:
             return {'error': 'Internal server error', 'message': str(e)}, 500
 
 
+@api.route('/batch')
+class AmenityBatch(Resource):
+    @api.expect([amenity_model])
+    @api.response(201, 'Amenities successfully created')
+    @api.response(400, 'Invalid batch, errors are reported per item')
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    def post(self):
+        """Register several amenities at once"""
+        claims = get_jwt()
+        if not claims.get('is_admin', False):
+            return {'error': 'Admin privileges required'}, 403
+
+        try:
+            items = parse_batch(api.payload)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+
+        errors = []
+        names = {}
+        for index, item in enumerate(items):
+            error = validate_new_amenity(item)
+            if error:
+                errors.append((index, error))
+            else:
+                names[index] = item['name'].strip()
+
+        # Names must be unique within the batch and against stored amenities
+        taken = {amenity.name for amenity in
+                 facade.get_amenities_by_names(names.values())}
+        for index, name in names.items():
+            if name in taken:
+                errors.append((index, 'Amenity already exist'))
+            taken.add(name)
+        if errors:
+            return batch_errors_response(errors)
+
+        try:
+            amenities = facade.create_amenities(
+                [{'name': name} for name in names.values()])
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return AMENITY.dump_many(amenities), 201
+
+
 @api.route('/<amenity_id>')
 class AmenityResource(Resource):
+    @api.doc(params=FIELDS_PARAMS)
     @api.response(200, 'Amenity details retrieved successfully')
+    @api.response(304, 'Amenity not modified')
+    @api.response(400, 'Invalid fields parameter')
     @api.response(404, 'Amenity not found')
     def get(self, amenity_id):
         """Get amenity details by ID"""
         try:
+            fields = AMENITY.request_fields()
             amenity = facade.get_amenity(amenity_id)
             if not amenity:
                 return {'error': 'Amenity not found'}, 404
 
-            return {
-                'id': amenity.id,
-                'name': amenity.name
-            }, 200
+            return conditional_response(
+                make_etag(amenity.id, amenity.updated_at, fields),
+                amenity.updated_at,
+                lambda: AMENITY.dump(amenity, fields))
+        except ValueError as e:
+            return {'error': str(e)}, 400
         except Exception as e:
             return {'error': 'Internal server error', 'message': str(e)}, 500
 
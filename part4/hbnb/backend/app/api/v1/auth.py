@@ -1,11 +1,14 @@
+from flask import current_app
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import (
     create_access_token,
+    create_refresh_token,
     jwt_required,
     get_jwt_identity,
     get_jwt
 )
 from app.services import facade
+from app.services.password_pool import PasswordPoolBusy
 
 api = Namespace('auth', description='Authentication operations')
 
@@ -15,16 +18,43 @@ login_model = api.model('Login', {
 })
 
 token_model = api.model('Token', {
-    'access_token': fields.String(description='JWT access token')
+    'access_token': fields.String(description='JWT access token'),
+    'refresh_token': fields.String(
+        description='Single-use JWT refresh token, send it as Bearer '
+                    'token to /auth/refresh')
 })
 
 
+def issue_tokens(user_id, is_admin, refresh_token):
+    """Encode the access token and the recorded refresh token.
+
+    Args:
+        user_id (str): Identity of both tokens
+        is_admin (bool): Admin claim of the access token
+        refresh_token (RefreshTokenModel): Recorded refresh token
+
+    Returns:
+        dict: access_token and refresh_token
+    """
+    return {
+        'access_token': create_access_token(
+            identity=str(user_id),
+            additional_claims={"is_admin": is_admin}),
+        # jti and expiry must match the recorded token
+        'refresh_token': create_refresh_token(
+            identity=str(user_id),
+            additional_claims={"jti": refresh_token.jti,
+                               "exp": refresh_token.expires_at})
+    }
+
+
 @api.route('/login')
 class Login(Resource):
     @api.expect(login_model)
     @api.response(200, 'Success', token_model)
     @api.response(400, 'Missing credentials')
     @api.response(401, 'Invalid credentials')
+    @api.response(503, 'Password hashing pool saturated')
     def post(self):
         """Authenticate user and return a JWT token"""
         credentials = api.payload
@@ -33,19 +63,39 @@ class Login(Resource):
                 'password' not in credentials):
             return {'error': 'Email and password are required.'}, 400
 
-        user = facade.get_user_by_email(credentials['email'])
-        if not user or not user.verify_password(credentials['password']):
+        try:
+            user = facade.authenticate_user(credentials['email'],
+                                            credentials['password'])
+        except PasswordPoolBusy as e:
+            # Shed load quickly instead of queueing more bcrypt work
+            return ({'error': 'Server busy, please retry later'}, 503,
+                    {'Retry-After': str(e.retry_after)})
+        if not user:
             return {'error': 'Invalid credentials'}, 401
 
-        access_token = create_access_token(
-            identity=str(user.id),
-            additional_claims={"is_admin": user.is_admin}
-        )
+        facade.prune_refresh_tokens()
+        refresh_token = facade.create_refresh_token(
+            user.id, current_app.config['JWT_REFRESH_TOKEN_EXPIRES'])
+        tokens = issue_tokens(user.id, user.is_admin, refresh_token)
 
-        return {
-            'message': 'Login successful',
-            'access_token': access_token
-        }, 200
+        return {'message': 'Login successful', **tokens}, 200
+
+
+@api.route('/refresh')
+class Refresh(Resource):
+    @api.response(200, 'Success', token_model)
+    @api.response(401, 'Invalid, expired or already used refresh token')
+    @jwt_required(refresh=True)
+    def post(self):
+        """Exchange a refresh token for new access and refresh tokens"""
+        rotated = facade.rotate_refresh_token(
+            get_jwt()['jti'], current_app.config['JWT_REFRESH_TOKEN_EXPIRES'])
+        if rotated is None:
+            return {'error': 'Invalid refresh token'}, 401
+
+        refresh_token, is_admin = rotated
+        return issue_tokens(refresh_token.user_id, is_admin,
+                            refresh_token), 200
 
 
 @api.route('/protected')
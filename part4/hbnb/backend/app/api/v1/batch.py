@@ -0,0 +1,48 @@
+"""Helpers shared by the batch create endpoints.
+
+A batch is a JSON list of items, each shaped like the body of the matching
+single-item POST. Batches are all-or-nothing: every item is validated
+first, and if any of them is invalid nothing is created and the response
+lists the errors by item index.
+"""
+from flask import current_app
+
+
+def parse_batch(payload):
+    """Check the shape and size of a batch payload.
+
+    Args:
+        payload: Decoded JSON request body
+
+    Returns:
+        list: The batch items
+
+    Raises:
+        ValueError: If the payload is not a non-empty list of objects or
+            has more than BATCH_MAX_ITEMS items
+    """
+    if not isinstance(payload, list) or not payload:
+        raise ValueError('Batch must be a non-empty list of items')
+    max_items = current_app.config.get('BATCH_MAX_ITEMS', 500)
+    if len(payload) > max_items:
+        raise ValueError(
+            'Batch cannot contain more than {} items'.format(max_items))
+    if not all(isinstance(item, dict) for item in payload):
+        raise ValueError('Every batch item must be an object')
+    return payload
+
+
+def batch_errors_response(errors):
+    """Build the 400 response of a rejected batch.
+
+    Args:
+        errors (list[tuple]): (item index, error message) pairs
+
+    Returns:
+        tuple: (payload, 400)
+    """
+    return {
+        'error': 'Batch rejected, no item was created',
+        'errors': [{'index': index, 'error': error}
+                   for index, error in sorted(errors)]
+    }, 400
@@ -0,0 +1,100 @@
+"""Conditional GET helpers (ETag / Last-Modified).
+
+Handlers compute a cheap version of the resource (ids, updated_at
+timestamps, row counts) and hand it to conditional_response() together
+with a callable building the body. When the client already holds that
+version the callable is never invoked and a bodyless 304 is returned.
+
+Collections are validated by their ETag only: deleting an item does not
+move the latest updated_at, so a Last-Modified date would let clients
+keep deleted items through If-Modified-Since.
+"""
+import hashlib
+from datetime import timezone
+
+from flask import current_app, request
+from werkzeug.http import http_date
+
+from app.compression import base_etag
+
+
+def to_utc(moment):
+    """Return an aware UTC datetime (SQLite hands back naive UTC values)."""
+    if moment is None:
+        return None
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+def latest(*moments):
+    """Return the most recent of the given datetimes, ignoring None."""
+    moments = [to_utc(moment) for moment in moments if moment is not None]
+    return max(moments) if moments else None
+
+
+def make_etag(*parts):
+    """Build a strong ETag from the parts identifying a representation.
+
+    Datetimes are normalised to UTC so naive and aware values of the same
+    instant produce the same tag.
+    """
+    normalised = [to_utc(part).isoformat() if hasattr(part, 'tzinfo')
+                  else str(part) for part in parts]
+    digest = hashlib.sha1('|'.join(normalised).encode('utf-8')).hexdigest()
+    return '"{}"'.format(digest[:32])
+
+
+def _is_not_modified(etag, last_modified):
+    # If-None-Match takes precedence over If-Modified-Since (RFC 9110)
+    # Tags of compressed responses carry an encoding suffix
+    if request.if_none_match:
+        return (request.if_none_match.star_tag or
+                etag.strip('"') in {base_etag(tag) for tag in
+                                    request.if_none_match.as_set(True)})
+    if request.if_modified_since and last_modified is not None:
+        # HTTP dates have one-second resolution
+        return (to_utc(last_modified).replace(microsecond=0) <=
+                to_utc(request.if_modified_since))
+    return False
+
+
+def conditional_response(etag, last_modified, build):
+    """Return a 304 or the built body with validator headers.
+
+    Args:
+        etag (str): Strong ETag of the current representation
+        last_modified (datetime): Last modification time, None for
+            collections (no Last-Modified, If-Modified-Since ignored)
+        build (callable): Returns the response payload (or a streamed
+            Response), or a (payload, extra headers) tuple; only called
+            when the client copy is stale
+
+    Returns:
+        Response or tuple: 304 response, streamed response, or
+            (payload, 200, headers)
+    """
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+    if last_modified is not None:
+        headers['Last-Modified'] = http_date(to_utc(last_modified))
+    if _is_not_modified(etag, last_modified):
+        return current_app.response_class(status=304, headers=headers)
+    body = build()
+    if isinstance(body, tuple):
+        body, extra_headers = body
+        headers.update(extra_headers)
+    if isinstance(body, current_app.response_class):
+        body.headers.update(headers)
+        return body
+    return body, 200, headers
+
+
+def collection_etag(version, *extra):
+    """Build the ETag of a list from its (count, latest updated_at) version.
+
+    The query string is always part of the tag so filtered, paginated and
+    full lists of the same table get different tags.
+    """
+    count, updated_at = version
+    return make_etag(count, updated_at, request.query_string.decode(),
+                     *extra)
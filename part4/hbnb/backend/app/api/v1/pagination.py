@@ -0,0 +1,73 @@
+"""Keyset pagination helpers shared by the list endpoints.
+
+List endpoints stay backward compatible: without ``limit`` or ``cursor``
+they return the whole collection. With either parameter they return one
+page as a plain list and advertise the next page through the
+``X-Next-Cursor`` and ``Link`` response headers.
+"""
+from urllib.parse import urlencode
+
+# Page size used when only a cursor is given
+DEFAULT_PAGE_LIMIT = 50
+
+# Upper bound on the page size a client can request
+MAX_PAGE_LIMIT = 500
+
+# Query parameters documented on every paginated endpoint
+PAGE_PARAMS = {
+    'limit': 'Maximum number of items per page (max {})'.format(
+        MAX_PAGE_LIMIT),
+    'cursor': 'Opaque cursor from the X-Next-Cursor header of the '
+              'previous page'
+}
+
+
+def parse_page_args(args):
+    """Read limit and cursor from the query string.
+
+    Args:
+        args (MultiDict): Request query parameters
+
+    Returns:
+        tuple: (limit, cursor), or (None, None) when pagination was not
+            requested
+
+    Raises:
+        ValueError: If limit is not an integer between 1 and MAX_PAGE_LIMIT
+    """
+    raw_limit = args.get('limit')
+    cursor = args.get('cursor') or None
+    if raw_limit is None and cursor is None:
+        return None, None
+
+    if raw_limit is None:
+        return DEFAULT_PAGE_LIMIT, cursor
+    try:
+        limit = int(raw_limit)
+    except ValueError:
+        raise ValueError('limit must be an integer')
+    if not 1 <= limit <= MAX_PAGE_LIMIT:
+        raise ValueError(
+            'limit must be between 1 and {}'.format(MAX_PAGE_LIMIT))
+    return limit, cursor
+
+
+def page_headers(request, next_cursor):
+    """Build the response headers pointing at the next page.
+
+    Args:
+        request (Request): Current request, used to rebuild the URL
+        next_cursor (str): Cursor of the next page, or None on the last page
+
+    Returns:
+        dict: Headers to attach to the response
+    """
+    if not next_cursor:
+        return {}
+    args = request.args.to_dict()
+    args['cursor'] = next_cursor
+    next_url = '{}?{}'.format(request.base_url, urlencode(args))
+    return {
+        'X-Next-Cursor': next_cursor,
+        'Link': '<{}>; rel="next"'.format(next_url)
+    }
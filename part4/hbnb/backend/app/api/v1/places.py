@@ -1,5 +1,13 @@
+from flask import request
 from flask_restx import Namespace, Resource, fields
 from app.services import facade
+from app.api.v1.batch import batch_errors_response, parse_batch
+from app.api.v1.conditional import (collection_etag, conditional_response,
+                                    latest, make_etag)
+from app.api.v1.pagination import PAGE_PARAMS, page_headers, parse_page_args
+from app.api.v1.serializers import (AMENITY, FIELDS_PARAMS, PLACE,
+                                    PLACE_CARD, PLACE_DETAIL, PLACE_REVIEW,
+                                    list_response)
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 
 
@@ -45,6 +53,131 @@ place_model = api.model('Place', {
 })
 
 
+def place_detail_validators(place):
+    """Return the (ETag, Last-Modified) pair of a place detail payload.
+
+    Every row embedded in the payload contributes its id and updated_at,
+    so editing the owner, an amenity or any review changes the ETag.
+    """
+    rows = [place, place.owner] + list(place.amenities) + list(place.reviews)
+    etag = make_etag(*[part for row in rows
+                       for part in (row.id, row.updated_at)])
+    return etag, latest(*[row.updated_at for row in rows])
+
+
+def validate_new_place(place_data):
+    """Validate the payload of a new place, converting numeric strings.
+
+    Args:
+        place_data (dict): Place payload, updated in place
+
+    Returns:
+        str: Error message, or None if the payload is valid
+    """
+    # Check for required fields
+    required_fields = ['title', 'price', 'latitude', 'longitude']
+    for field in required_fields:
+        if field not in place_data:
+            return f'Missing required field: {field}'
+
+    # Validate title is string and not empty
+    if (not isinstance(place_data['title'], str) or
+            not place_data['title'].strip()):
+        return 'Title must be a non-empty string'
+
+    # Validate price is numeric (convert string to float if needed)
+    if isinstance(place_data['price'], str):
+        try:
+            place_data['price'] = float(place_data['price'])
+        except ValueError:
+            return 'Price must be a valid number'
+    elif not isinstance(place_data['price'], (int, float)):
+        return 'Price must be a number'
+
+    if place_data['price'] <= 0:
+        return 'Price must be positive'
+
+    # Validate latitude is numeric and in valid range
+    if isinstance(place_data['latitude'], str):
+        try:
+            place_data['latitude'] = float(place_data['latitude'])
+        except ValueError:
+            return 'Latitude must be a valid number'
+    elif not isinstance(place_data['latitude'], (int, float)):
+        return 'Latitude must be a number'
+
+    if not -90 <= place_data['latitude'] <= 90:
+        return 'Latitude must be between -90 and 90'
+
+    # Validate longitude is numeric and in valid range
+    if isinstance(place_data['longitude'], str):
+        try:
+            place_data['longitude'] = float(place_data['longitude'])
+        except ValueError:
+            return 'Longitude must be a valid number'
+    elif not isinstance(place_data['longitude'], (int, float)):
+        return 'Longitude must be a number'
+
+    if not -180 <= place_data['longitude'] <= 180:
+        return 'Longitude must be between -180 and 180'
+
+    return None
+
+
+# Numeric query parameters filtering the place list
+PLACE_RANGE_PARAMS = {
+    'min_price': 'Lowest price per night, inclusive',
+    'max_price': 'Highest price per night, inclusive',
+    'min_rating': 'Lowest average rating (1-5), places without reviews '
+                  'are left out'
+}
+
+# Most amenities a place list can be filtered by at once
+MAX_AMENITY_FILTERS = 20
+
+PLACE_FILTER_PARAMS = {
+    **PLACE_RANGE_PARAMS,
+    'amenities': 'Comma-separated amenity IDs, places must offer all of '
+                 'them (max {})'.format(MAX_AMENITY_FILTERS)
+}
+
+
+def parse_place_filters(args):
+    """Read the place list filters from the query string.
+
+    Returns:
+        dict: The filters that were given, numeric ones as floats and
+            amenities as the list amenity_ids
+
+    Raises:
+        ValueError: If a filter is not a number or the bounds are invalid
+    """
+    filters = {}
+    amenity_ids = [amenity_id.strip() for amenity_id
+                   in args.get('amenities', '').split(',')
+                   if amenity_id.strip()]
+    if len(set(amenity_ids)) > MAX_AMENITY_FILTERS:
+        raise ValueError('Filter by at most {} amenities'.format(
+            MAX_AMENITY_FILTERS))
+    if amenity_ids:
+        filters['amenity_ids'] = amenity_ids
+    for name in PLACE_RANGE_PARAMS:
+        value = args.get(name)
+        if value is None or value.strip() == '':
+            continue
+        try:
+            filters[name] = float(value)
+        except ValueError:
+            raise ValueError(f'{name} must be a valid number')
+    if filters.get('min_price', 0) < 0 or filters.get('max_price', 0) < 0:
+        raise ValueError('Prices cannot be negative')
+    if filters.get('min_price', 0) > filters.get('max_price', float('inf')):
+        raise ValueError('min_price cannot be greater than max_price')
+    if not 1 <= filters.get('min_rating', 1) <= 5:
+        raise ValueError('min_rating must be between 1 and 5')
+    return filters
+
+
 @api.route('/')
 class PlaceList(Resource):
     @api.expect(place_model)
@@ -62,115 +195,282 @@ class PlaceList(Resource):
         place_data['owner_id'] = current_user_id
         # Validate input data types and required fields
         try:
-            # Check for required fields
-            required_fields = ['title', 'price', 'latitude', 'longitude']
-            for field in required_fields:
-                if field not in place_data:
-                    return {'error': f'Missing required field: {field}'}, 400
-
-            # Validate title is string and not empty
-            if (not isinstance(place_data['title'], str) or
-                    not place_data['title'].strip()):
-                return {'error': 'Title must be a non-empty string'}, 400
-
-            # Validate price is numeric (convert string to float if needed)
-            if isinstance(place_data['price'], str):
-                try:
-                    place_data['price'] = float(place_data['price'])
-                except ValueError:
-                    return {'error': 'Price must be a valid number'}, 400
-            elif not isinstance(place_data['price'], (int, float)):
-                return {'error': 'Price must be a number'}, 400
-
-            if place_data['price'] <= 0:
-                return {'error': 'Price must be positive'}, 400
-
-            # Validate latitude is numeric and in valid range
-            if isinstance(place_data['latitude'], str):
-                try:
-                    place_data['latitude'] = float(place_data['latitude'])
-                except ValueError:
-                    return {'error': 'Latitude must be a valid number'}, 400
-            elif not isinstance(place_data['latitude'], (int, float)):
-                return {'error': 'Latitude must be a number'}, 400
-
-            if not -90 <= place_data['latitude'] <= 90:
-                return {'error': 'Latitude must be between -90 and 90'}, 400
-
-            # Validate longitude is numeric and in valid range
-            if isinstance(place_data['longitude'], str):
-                try:
-                    place_data['longitude'] = float(place_data['longitude'])
-                except ValueError:
-                    return {'error': 'Longitude must be a valid number'}, 400
-            elif not isinstance(place_data['longitude'], (int, float)):
-                return {'error': 'Longitude must be a number'}, 400
-
-            if not -180 <= place_data['longitude'] <= 180:
-                return {'error': 'Longitude must be between -180 and 180'}, 400
+            error = validate_new_place(place_data)
+            if error:
+                return {'error': error}, 400
 
             existing_place = facade.get_place_by_title(place_data['title'])
             if existing_place:
                 return {'error': 'Place already registered'}, 400
             new_place = facade.create_place(place_data)
-            return {'id': new_place.id, 'title': new_place.title,
-                    'price': new_place.price, 'latitude': new_place.latitude,
-                    'longitude': new_place.longitude,
-                    'owner_id': new_place.owner.id,
-                    'description': new_place.description}, 201
+            return PLACE.dump(new_place), 201
         except ValueError as e:
             return {'message': str(e)}, 400
         except Exception as e:
             return {'error': 'Internal server error', 'message': str(e)}, 500
 
+    @api.doc(params={**PAGE_PARAMS, **PLACE_FILTER_PARAMS, **FIELDS_PARAMS})
     @api.response(200, 'List of places retrieved successfully')
+    @api.response(304, 'List not modified')
+    @api.response(400, 'Invalid pagination, filter or fields parameters')
     def get(self):
         """Retrieve a list of all places"""
-        places = facade.get_all_places()
-        result = []
-        for place in places:
-            place_dict = {
-                'id': place.id,
-                'title': place.title,
-                'price': place.price,
-                'latitude': place.latitude,
-                'longitude': place.longitude}
-            result.append(place_dict)
-        return result, 200
+        try:
+            limit, cursor = parse_page_args(request.args)
+            filters = parse_place_filters(request.args)
+            fields = PLACE_CARD.request_fields()
+
+            def build():
+                headers = {}
+                if limit is None:
+                    places = facade.get_all_places(profile='card',
+                                                   filters=filters)
+                else:
+                    places, next_cursor = facade.get_places_page(
+                        limit, cursor, profile='card', filters=filters)
+                    headers = page_headers(request, next_cursor)
+                return (list_response(PLACE_CARD.dump_many(places, fields)),
+                        headers)
+
+            version = facade.get_places_version()
+            return conditional_response(collection_etag(version), None,
+                                        build)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+
+
+# Place fields a batch item may set, the owner is always the caller
+PLACE_BATCH_FIELDS = ('title', 'description', 'price', 'latitude',
+                      'longitude')
+
+
+@api.route('/facets')
+class PlaceFacets(Resource):
+    @api.doc(params=PLACE_FILTER_PARAMS)
+    @api.response(200, 'Amenity counts retrieved successfully')
+    @api.response(304, 'Counts not modified')
+    @api.response(400, 'Invalid filter parameters')
+    def get(self):
+        """Count the places matching the filters for each amenity"""
+        try:
+            filters = parse_place_filters(request.args)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+
+        def build():
+            total, facets = facade.get_place_amenity_facets(filters)
+            return {'total': total,
+                    'amenities': [{'id': amenity_id, 'name': name,
+                                   'count': count}
+                                  for amenity_id, name, count in facets]}, {}
+
+        # Amenity names are part of the payload
+        places_version = facade.get_places_version()
+        amenities_version = facade.get_amenities_version()
+        return conditional_response(
+            collection_etag(places_version, *amenities_version), None, build)
+
+
+@api.route('/batch')
+class PlaceBatch(Resource):
+    @api.expect([place_model])
+    @api.response(201, 'Places successfully created')
+    @api.response(400, 'Invalid batch, errors are reported per item')
+    @api.response(401, 'Unauthorized')
+    @jwt_required()
+    def post(self):
+        """Register several places owned by the current user at once"""
+        current_user_id = get_jwt_identity()
+        try:
+            items = parse_batch(api.payload)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+
+        errors = []
+        places_data = []
+        for index, item in enumerate(items):
+            place_data = {field: item[field] for field in PLACE_BATCH_FIELDS
+                          if field in item}
+            error = validate_new_place(place_data)
+            if error:
+                errors.append((index, error))
+            places_data.append(place_data)
+
+        # Titles must be unique within the batch and against stored places
+        invalid = {index for index, _ in errors}
+        valid = [(index, data) for index, data in enumerate(places_data)
+                 if index not in invalid]
+        taken = {place.title for place in facade.get_places_by_titles(
+            data['title'] for _, data in valid)}
+        for index, data in valid:
+            if data['title'] in taken:
+                errors.append((index, 'Place already registered'))
+            taken.add(data['title'])
+        if errors:
+            return batch_errors_response(errors)
+
+        try:
+            places = facade.create_places(places_data, current_user_id)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return PLACE.dump_many(places), 201
+
+
+def _parse_float(args, name):
+    """Read a required float query parameter, raising ValueError."""
+    value = args.get(name)
+    if value is None or value.strip() == '':
+        raise ValueError(f'Missing required parameter: {name}')
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f'{name} must be a valid number')
+
+
+# Fields of the places found around a point or in a bounding box
+NEARBY_FIELDS = ('id', 'title', 'price', 'latitude', 'longitude')
+
+# Places returned without an explicit limit, the maximum, and the largest
+# search radius: both bound the rows a map view can load
+NEARBY_DEFAULT_LIMIT = 100
+NEARBY_MAX_LIMIT = 500
+NEARBY_MAX_RADIUS_KM = 100
+
+
+@api.route('/nearby')
+class PlaceNearby(Resource):
+    @api.doc(params={
+        'lat': 'Latitude of the search center',
+        'lng': 'Longitude of the search center',
+        'radius_km': 'Search radius in kilometers (max {})'.format(
+            NEARBY_MAX_RADIUS_KM),
+        'bbox': 'Bounding box as min_lng,min_lat,max_lng,max_lat '
+                '(replaces lat/lng/radius_km)',
+        'limit': 'Maximum number of places to return (default {}, max '
+                 '{})'.format(NEARBY_DEFAULT_LIMIT, NEARBY_MAX_LIMIT)
+    })
+    @api.response(200, 'Places retrieved successfully')
+    @api.response(400, 'Invalid search parameters')
+    def get(self):
+        """Find places near a point or inside a bounding box"""
+        args = request.args
+        try:
+            try:
+                limit = int(args.get('limit', NEARBY_DEFAULT_LIMIT))
+            except ValueError:
+                return {'error': 'limit must be an integer'}, 400
+            if not 1 <= limit <= NEARBY_MAX_LIMIT:
+                return {'error': 'limit must be between 1 and {}'.format(
+                    NEARBY_MAX_LIMIT)}, 400
+
+            if 'bbox' in args:
+                parts = args['bbox'].split(',')
+                if len(parts) != 4:
+                    return {'error': 'bbox must be min_lng,min_lat,'
+                                     'max_lng,max_lat'}, 400
+                try:
+                    min_lng, min_lat, max_lng, max_lat = map(float, parts)
+                except ValueError:
+                    return {'error': 'bbox values must be numbers'}, 400
+                if not (-90 <= min_lat <= max_lat <= 90):
+                    return {'error': 'bbox latitudes must be between -90 '
+                                     'and 90, south first'}, 400
+                if not (-180 <= min_lng <= 180 and -180 <= max_lng <= 180):
+                    return {'error': 'bbox longitudes must be between -180 '
+                                     'and 180'}, 400
+                places = facade.get_places_in_bbox(min_lat, min_lng,
+                                                   max_lat, max_lng, limit)
+                return PLACE_CARD.dump_many(places, NEARBY_FIELDS), 200
+
+            lat = _parse_float(args, 'lat')
+            lng = _parse_float(args, 'lng')
+            radius_km = _parse_float(args, 'radius_km')
+            if not -90 <= lat <= 90:
+                return {'error': 'Latitude must be between -90 and 90'}, 400
+            if not -180 <= lng <= 180:
+                return {'error': 'Longitude must be between -180 and 180'}, 400
+            if not 0 < radius_km <= NEARBY_MAX_RADIUS_KM:
+                return {'error': 'radius_km must be positive and at most '
+                                 '{}'.format(NEARBY_MAX_RADIUS_KM)}, 400
+
+            nearby = facade.get_places_nearby(lat, lng, radius_km, limit)
+            dump = PLACE_CARD.function(NEARBY_FIELDS)
+            return [{**dump(place), 'distance_km': round(distance, 3)}
+                    for place, distance in nearby], 200
+        except ValueError as e:
+            return {'error': str(e)}, 400
+
+
+# Results returned by a search without an explicit limit, and the maximum
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+
+
+@api.route('/search')
+class PlaceSearch(Resource):
+    @api.doc(params={
+        'q': 'Words to find in titles, descriptions and reviews',
+        'limit': 'Maximum number of places to return (max {})'.format(
+            SEARCH_MAX_LIMIT),
+        **FIELDS_PARAMS
+    })
+    @api.response(200, 'Matching places, most relevant first')
+    @api.response(400, 'Invalid search parameters')
+    def get(self):
+        """Full-text search over places and their reviews"""
+        query = request.args.get('q', '').strip()
+        if not query:
+            return {'error': 'Missing required parameter: q'}, 400
+        try:
+            fields = PLACE_CARD.request_fields()
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        try:
+            limit = int(request.args.get('limit', SEARCH_DEFAULT_LIMIT))
+        except ValueError:
+            return {'error': 'limit must be an integer'}, 400
+        if not 1 <= limit <= SEARCH_MAX_LIMIT:
+            return {'error': 'limit must be between 1 and {}'.format(
+                SEARCH_MAX_LIMIT)}, 400
+
+        places = facade.search_places(query, limit)
+        return PLACE_CARD.dump_many(places, fields), 200
 
 
 @api.route('/<place_id>')
 class PlaceResource(Resource):
+    @api.doc(params=FIELDS_PARAMS)
     @api.response(200, 'Place details retrieved successfully')
-    @api.response(400, 'Invalid place ID')
+    @api.response(304, 'Place not modified')
+    @api.response(400, 'Invalid place ID or fields parameter')
     @api.response(404, 'Place not found')
     def get(self, place_id):
         """Get place details by ID"""
         if not place_id or place_id.strip() == '':
             return {'error': 'Invalid place ID'}, 400
-
-        place = facade.get_place(place_id)
-        if not place:
-            return {'error': 'Place not found'}, 404
-        return {
-            'id': place.id,
-            'title': place.title,
-            'latitude': place.latitude,
-            'longitude': place.longitude,
-            'price': place.price,
-            'description': place.description,
-            'owner': {
-                'id': place.owner.id,
-                'first_name': place.owner.first_name,
-                'last_name': place.owner.last_name,
-                'email': place.owner.email
-            },
-            'amenities': [{'id': amenity.id, 'name': amenity.name}
-                          for amenity in place.amenities],
-            'reviews': [{'id': review.id, 'text': review.text,
-                         'rating': review.rating, 'user_id': review.user.id}
-                        for review in place.reviews]
-        }, 200
+        try:
+            fields = PLACE_DETAIL.request_fields()
+        except ValueError as e:
+            return {'error': str(e)}, 400
+
+        # Serve the cached payload when the place has not changed since
+        # it was built; the version token guards against caching data
+        # read before a concurrent write invalidated the entry
+        version = facade.place_cache.version(place_id)
+        entry = facade.place_cache.get(place_id)
+        if entry is None:
+            place = facade.get_place(place_id, profile='detail')
+            if not place:
+                return {'error': 'Place not found'}, 404
+            entry = ((PLACE_DETAIL.dump(place),) +
+                     place_detail_validators(place))
+            facade.place_cache.set(place_id, entry, version)
+        # The full payload is cached, sparse fieldsets are cut from it
+        payload, etag, last_modified = entry
+        if fields is not None:
+            etag = make_etag(etag, *fields)
+        return conditional_response(
+            etag, last_modified, lambda: PLACE_DETAIL.project(payload, fields))
 
     @api.expect(place_model)
     @api.response(200, 'Place updated successfully')
@@ -191,7 +491,8 @@ class PlaceResource(Resource):
 
         try:
             # Check if place exists first
-            place = facade.get_place(place_id)
+            # (loaded with everything the response serializes)
+            place = facade.get_place(place_id, profile='detail')
             if not place:
                 return {'error': 'Place not found'}, 404
 
@@ -258,26 +559,7 @@ class PlaceResource(Resource):
                     return {'error': 'title already exist'}, 400
 
             updated_place = facade.update_place(place_id, place_data)
-            return {
-                'id': updated_place.id,
-                'title': updated_place.title,
-                'price': updated_place.price,
-                'latitude': updated_place.latitude,
-                'longitude': updated_place.longitude,
-                'owner': {
-                    'id': updated_place.owner.id,
-                    'first_name': updated_place.owner.first_name,
-                    'last_name': updated_place.owner.last_name,
-                    'email': updated_place.owner.email
-                },
-                'description': updated_place.description,
-                'amenities': [{'id': amenity.id, 'name': amenity.name}
-                              for amenity in updated_place.amenities],
-                'reviews': [{'id': review.id, 'text': review.text,
-                             'rating': review.rating,
-                             'user_id': review.user.id}
-                            for review in updated_place.reviews]
-            }, 200
+            return PLACE_DETAIL.dump(updated_place), 200
         except ValueError as e:
             return {'message': str(e)}, 400
         except Exception as e:
@@ -286,19 +568,29 @@ class PlaceResource(Resource):
 
 @api.route('/<place_id>/amenities')
 class PlaceAmenities(Resource):
+    @api.doc(params=FIELDS_PARAMS)
     @api.response(200, 'Amenities retrieved successfully')
-    @api.response(400, 'Invalid place ID')
+    @api.response(304, 'Amenities not modified')
+    @api.response(400, 'Invalid place ID or fields parameter')
     @api.response(404, 'Place not found')
     def get(self, place_id):
         """Get all amenities for a place"""
         if not place_id or place_id.strip() == '':
             return {'error': 'Invalid place ID'}, 400
+        try:
+            fields = AMENITY.request_fields()
+        except ValueError as e:
+            return {'error': str(e)}, 400
 
         place = facade.get_place(place_id)
         if not place:
             return {'error': 'Place not found'}, 404
-        return [{'id': amenity.id, 'name': amenity.name}
-                for amenity in place.amenities], 200
+        amenities = place.amenities
+        etag = make_etag(place.id, fields,
+                         *[part for amenity in amenities
+                           for part in (amenity.id, amenity.updated_at)])
+        return conditional_response(
+            etag, None, lambda: AMENITY.dump_many(amenities, fields))
 
     @api.expect(api.model('PlaceAmenityAdd', {
         'amenity_id': fields.String(required=True)
@@ -344,22 +636,28 @@ class PlaceAmenities(Resource):
 
 @api.route('/<place_id>/reviews')
 class PlaceReviewsList(Resource):
+    @api.doc(params=FIELDS_PARAMS)
     @api.response(200, 'Reviews retrieved successfully')
-    @api.response(400, 'Invalid place ID')
+    @api.response(304, 'Reviews not modified')
+    @api.response(400, 'Invalid place ID or fields parameter')
     @api.response(404, 'Place not found')
     def get(self, place_id):
         """Get all reviews for a place"""
         if not place_id or place_id.strip() == '':
             return {'error': 'Invalid place ID'}, 400
+        try:
+            fields = PLACE_REVIEW.request_fields()
+        except ValueError as e:
+            return {'error': str(e)}, 400
 
         place = facade.get_place(place_id)
         if not place:
             return {'error': 'Place not found'}, 404
 
-        reviews = facade.get_reviews_by_place(place_id)
-        return [{'id': review.id, 
-                 'text': review.text, 
-                 'rating': review.rating,
-                 'user_id': review.user.id,
-                 'user_name': f"{review.user.first_name} {review.user.last_name}"
-                 } for review in reviews], 200
+        def build():
+            reviews = facade.get_reviews_by_place(place_id)
+            return list_response(PLACE_REVIEW.dump_many(reviews, fields))
+
+        version = facade.get_place_reviews_version(place_id)
+        return conditional_response(make_etag(place_id, fields, *version),
+                                    None, build)
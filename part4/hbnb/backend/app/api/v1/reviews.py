@@ -1,6 +1,12 @@
+from flask import request
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from app.services import facade
+from app.api.v1.batch import batch_errors_response, parse_batch
+from app.api.v1.conditional import (collection_etag, conditional_response,
+                                    make_etag)
+from app.api.v1.pagination import PAGE_PARAMS, page_headers, parse_page_args
+from app.api.v1.serializers import FIELDS_PARAMS, REVIEW, list_response
 
 api = Namespace('reviews', description='Review operations')
 
@@ -15,6 +21,43 @@ review_model = api.model('Review', {
 })
 
 
+def validate_new_review(review_data):
+    """Validate the fields of a new review payload.
+
+    Checks types and ranges only; the place, ownership and duplicate
+    checks need the database and are done by the caller.
+
+    Args:
+        review_data (dict): Review payload
+
+    Returns:
+        str: Error message, or None if the payload is valid
+    """
+    # Validate required fields
+    required_fields = ['text', 'rating', 'place_id']
+    for field in required_fields:
+        if field not in review_data:
+            return f'Missing required field: {field}'
+
+    # Validate text is string and not empty
+    if not isinstance(review_data['text'], str):
+        return 'Text must be a string'
+    if not review_data['text'].strip():
+        return 'Text cannot be empty'
+
+    # Validate rating is integer and in range
+    if not isinstance(review_data['rating'], int):
+        return 'Rating must be an integer'
+    if not 1 <= review_data['rating'] <= 5:
+        return 'Rating must be between 1 and 5'
+
+    # Validate place_id is string
+    if not isinstance(review_data['place_id'], str):
+        return 'place_id must be a string'
+
+    return None
+
+
 @api.route('/')
 class ReviewList(Resource):
     @api.expect(review_model)
@@ -33,27 +76,9 @@ class ReviewList(Resource):
 
         review_data = api.payload
         try:
-            # Validate required fields
-            required_fields = ['text', 'rating', 'place_id']
-            for field in required_fields:
-                if field not in review_data:
-                    return {'error': f'Missing required field: {field}'}, 400
-
-            # Validate text is string and not empty
-            if not isinstance(review_data['text'], str):
-                return {'error': 'Text must be a string'}, 400
-            if not review_data['text'].strip():
-                return {'error': 'Text cannot be empty'}, 400
-
-            # Validate rating is integer and in range
-            if not isinstance(review_data['rating'], int):
-                return {'error': 'Rating must be an integer'}, 400
-            if not 1 <= review_data['rating'] <= 5:
-                return {'error': 'Rating must be between 1 and 5'}, 400
-
-            # Validate place_id is string
-            if not isinstance(review_data['place_id'], str):
-                return {'error': 'place_id must be a string'}, 400
+            error = validate_new_review(review_data)
+            if error:
+                return {'error': error}, 400
 
             # Add the authenticated user_id to the review data
             review_data['user_id'] = current_user_id
@@ -77,62 +102,127 @@ class ReviewList(Resource):
                 review_data['place_id']
             )
             for review in existing_reviews:
-                if review.user.id == current_user_id:
+                if review.user_id == current_user_id:
                     msg = 'You have already reviewed this place.'
                     return {'error': msg}, 400
 
             new_review = facade.create_review(review_data)
-            return {
-                'message': 'Review successfully created',
-                'id': new_review.id,
-                'text': new_review.text,
-                'rating': new_review.rating,
-                'user_id': new_review.user.id,
-                'place_id': new_review.place.id
-            }, 201
+            return {'message': 'Review successfully created',
+                    **REVIEW.dump(new_review)}, 201
 
         except ValueError as e:
             return {'error': str(e)}, 400
         except Exception as e:
             return {'error': 'Failed to create review', 'details': str(e)}, 500
 
+    @api.doc(params={**PAGE_PARAMS, **FIELDS_PARAMS})
     @api.response(200, 'List of reviews retrieved successfully')
+    @api.response(304, 'List not modified')
+    @api.response(400, 'Invalid pagination or fields parameters')
     def get(self):
         """Retrieve a list of all reviews"""
-        # Placeholder for logic to return a list of all reviews
         try:
-            reviews = facade.get_all_reviews()
-            return [{'id': review.id,
-                     'text': review.text,
-                     'rating': review.rating,
-                     'user_id': review.user.id,
-                     'place_id': review.place.id
-                     }
-                    for review in reviews], 200
+            limit, cursor = parse_page_args(request.args)
+            fields = REVIEW.request_fields()
+
+            def build():
+                headers = {}
+                if limit is None:
+                    reviews = facade.get_all_reviews()
+                else:
+                    reviews, next_cursor = facade.get_reviews_page(limit,
+                                                                   cursor)
+                    headers = page_headers(request, next_cursor)
+                return (list_response(REVIEW.dump_many(reviews, fields)),
+                        headers)
+
+            version = facade.get_reviews_version()
+            return conditional_response(collection_etag(version), None,
+                                        build)
+        except ValueError as e:
+            return {'error': str(e)}, 400
         except Exception as e:
             return {'error': 'Internal server error', 'details': str(e)}, 500
 
 
+@api.route('/batch')
+class ReviewBatch(Resource):
+    @api.expect([review_model])
+    @api.response(201, 'Reviews successfully created')
+    @api.response(400, 'Invalid batch, errors are reported per item')
+    @api.response(401, 'Unauthorized')
+    @api.response(404, 'User not found')
+    @jwt_required()
+    def post(self):
+        """Register several reviews by the current user at once"""
+        current_user_id = get_jwt_identity()
+        try:
+            items = parse_batch(api.payload)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+
+        if not facade.get_user(current_user_id):
+            return {'error': 'User not found'}, 404
+
+        errors = []
+        valid = {}
+        for index, item in enumerate(items):
+            error = validate_new_review(item)
+            if error:
+                errors.append((index, error))
+            else:
+                valid[index] = item
+
+        # Load every referenced place and the user's existing reviews of
+        # them in two queries instead of two per item
+        place_ids = {item['place_id'] for item in valid.values()}
+        places = facade.get_places_by_ids(place_ids)
+        reviewed = facade.get_reviewed_place_ids(current_user_id, place_ids)
+        for index, item in valid.items():
+            place = places.get(item['place_id'])
+            if not place:
+                errors.append((index, 'Place not found'))
+            elif place.owner_id == current_user_id:
+                errors.append((index, 'You cannot review your own place.'))
+            elif item['place_id'] in reviewed:
+                errors.append((index, 'You have already reviewed this place.'))
+            reviewed.add(item['place_id'])
+        if errors:
+            return batch_errors_response(errors)
+
+        try:
+            reviews = facade.create_reviews(
+                [{'text': item['text'], 'rating': item['rating'],
+                  'place_id': item['place_id']} for item in valid.values()],
+                current_user_id)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return REVIEW.dump_many(reviews), 201
+
+
 @api.route('/<review_id>')
 class ReviewResource(Resource):
+    @api.doc(params=FIELDS_PARAMS)
     @api.response(200, 'Review details retrieved successfully')
+    @api.response(304, 'Review not modified')
+    @api.response(400, 'Invalid review ID or fields parameter')
     @api.response(404, 'Review not found')
     def get(self, review_id):
         """Get review details by ID"""
         # Validate review_id is not empty
         if not review_id or not review_id.strip():
             return {'error': 'Invalid review ID'}, 400
+        try:
+            fields = REVIEW.request_fields()
+        except ValueError as e:
+            return {'error': str(e)}, 400
         # Placeholder for the logic to retrieve a review by ID
         review = facade.get_review(review_id)
         if not review:
             return {'error': 'Review not found'}, 404
-        return {
-            'id': review.id,
-            'text': review.text,
-            'rating': review.rating,
-            'user_id': review.user.id,
-            'place_id': review.place.id
-        }, 200
+        return conditional_response(
+            make_etag(review.id, review.updated_at, fields),
+            review.updated_at, lambda: REVIEW.dump(review, fields))
 
     @api.expect(review_model)
     @api.response(200, 'Review updated successfully')
@@ -159,17 +249,14 @@ class ReviewResource(Resource):
 
             # Check if the current user is the owner of the review
             # (admins can bypass)
-            if not is_admin and review.user.id != current_user_id:
+            if not is_admin and review.user_id != current_user_id:
                 return {'error': 'Unauthorized action.'}, 403
 
             review_data = api.payload
             updated_review = facade.update_review(review_id, review_data)
-            return {
-                'message': 'Review updated successfully',
-                'id': updated_review.id,
-                'text': updated_review.text,
-                'rating': updated_review.rating
-            }, 200
+            return {'message': 'Review updated successfully',
+                    **REVIEW.dump(updated_review, ('id', 'text', 'rating'))
+                    }, 200
         except ValueError as e:
             return {'error': str(e)}, 400
         except Exception as e:
@@ -198,7 +285,7 @@ class ReviewResource(Resource):
 
             # Check if the current user is the owner of the review
             # (admins can bypass)
-            if not is_admin and review.user.id != current_user_id:
+            if not is_admin and review.user_id != current_user_id:
                 return {'error': 'Unauthorized action.'}, 403
 
             if facade.delete_review(review_id):
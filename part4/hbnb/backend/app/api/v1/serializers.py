@@ -0,0 +1,262 @@
+"""Response serializers and JSON representation.
+
+Each serializer is declared once from a field spec (response key ->
+attribute path or callable) and compiled into plain functions building
+the response dicts, so serializing a list is a single comprehension with
+one dict literal per row instead of a loop over the spec. Clients may ask
+for a subset of the fields with ``?fields=id,title``; each subset is
+compiled on first use and kept for the next requests.
+
+Responses are encoded with orjson when it is installed, and with
+Flask-RESTX's default JSON encoder otherwise. Long lists are encoded and
+sent in chunks (see list_response).
+"""
+import json
+import re
+
+from flask import current_app, make_response, request
+from flask_restx.representations import output_json as restx_output_json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Field subsets compiled per serializer; further subsets still work but
+# are compiled on each request instead of being kept
+MAX_COMPILED_SUBSETS = 64
+
+# Items encoded at once when a list is streamed
+STREAM_CHUNK_ITEMS = 500
+
+FIELDS_PARAMS = {
+    'fields': 'Comma-separated list of the fields to return (default: all)'
+}
+
+_ATTRIBUTE_PATH = re.compile(r'^[A-Za-z_]\w*(\.[A-Za-z_]\w*)*$')
+
+
+class Serializer:
+    """Turns model objects into response dicts from a field spec.
+
+    Args:
+        spec (dict): Response key -> dotted attribute path (such as
+            'owner.id') or callable taking the object, in output order
+    """
+
+    def __init__(self, spec):
+        self.spec = dict(spec)
+        self.field_names = tuple(self.spec)
+        for name, source in self.spec.items():
+            if not callable(source) and not _ATTRIBUTE_PATH.match(source):
+                raise ValueError('Invalid source for field {}: {!r}'.format(
+                    name, source))
+        self._compiled = {}
+        self._all = self._compile(self.field_names)
+
+    def _compile(self, names):
+        """Return the (dump, dump_many) functions of a field subset."""
+        namespace = {}
+        items = []
+        for index, name in enumerate(names):
+            source = self.spec[name]
+            if callable(source):
+                namespace['field_{}'.format(index)] = source
+                expression = 'field_{}(obj)'.format(index)
+            else:
+                expression = 'obj.' + source
+            items.append('{!r}: {}'.format(name, expression))
+        row = '{{{}}}'.format(', '.join(items))
+        exec('def dump(obj):\n'
+             '    return {row}\n'
+             'def dump_many(objs):\n'
+             '    return [{row} for obj in objs]\n'.format(row=row),
+             namespace)
+        return namespace['dump'], namespace['dump_many']
+
+    def _functions(self, fields):
+        if fields is None:
+            return self._all
+        functions = self._compiled.get(fields)
+        if functions is None:
+            functions = self._compile(fields)
+            if len(self._compiled) < MAX_COMPILED_SUBSETS:
+                self._compiled[fields] = functions
+        return functions
+
+    def function(self, fields=None):
+        """Return the compiled function serializing one object.
+
+        Args:
+            fields (tuple, optional): Field names as returned by
+                parse_fields, None for every field
+        """
+        return self._functions(fields)[0]
+
+    def dump(self, obj, fields=None):
+        """Serialize one object."""
+        return self._functions(fields)[0](obj)
+
+    def dump_many(self, objs, fields=None):
+        """Serialize an iterable of objects into a list."""
+        return self._functions(fields)[1](objs)
+
+    def project(self, payload, fields=None):
+        """Keep only the requested fields of an already built payload."""
+        if fields is None:
+            return payload
+        return {name: payload[name] for name in fields}
+
+    def parse_fields(self, value):
+        """Turn a ``fields`` parameter into a tuple of field names.
+
+        Names are returned in spec order without duplicates, so equivalent
+        requests share one compiled function.
+
+        Returns:
+            tuple: Requested field names, or None when value is empty
+
+        Raises:
+            ValueError: If a requested field does not exist
+        """
+        if value is None:
+            return None
+        requested = {name.strip() for name in value.split(',')
+                     if name.strip()}
+        if not requested:
+            return None
+        unknown = requested.difference(self.spec)
+        if unknown:
+            raise ValueError('Unknown fields: {}. Available fields: {}'.format(
+                ', '.join(sorted(unknown)), ', '.join(self.field_names)))
+        return tuple(name for name in self.field_names if name in requested)
+
+    def request_fields(self):
+        """Return the fields requested by the current request's ?fields=.
+
+        Raises:
+            ValueError: If a requested field does not exist
+        """
+        return self.parse_fields(request.args.get('fields'))
+
+
+def output_json(data, code, headers=None):
+    """Flask-RESTX JSON representation, encoded with orjson if available.
+
+    Falls back to Flask-RESTX's encoder when orjson is not installed or
+    when RESTX_JSON settings are configured, since they only apply to it.
+    """
+    if orjson is None or current_app.config.get('RESTX_JSON'):
+        return restx_output_json(data, code, headers)
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+    if current_app.debug:
+        option |= orjson.OPT_INDENT_2
+    response = make_response(orjson.dumps(data, option=option), code)
+    response.headers.extend(headers or {})
+    return response
+
+
+def _encode(data):
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+
+def _stream_list(items):
+    for start in range(0, len(items), STREAM_CHUNK_ITEMS):
+        # Each chunk is encoded as a list, its brackets are dropped
+        chunk = _encode(items[start:start + STREAM_CHUNK_ITEMS])[1:-1]
+        yield (b'[' if start == 0 else b',') + chunk
+    yield b']\n'
+
+
+def list_response(items):
+    """Return a serialized list, streamed if it is long.
+
+    Lists of more than JSON_STREAM_MIN_ITEMS items are returned as a
+    streamed JSON response encoded STREAM_CHUNK_ITEMS at a time, so the
+    compression hook can compress each chunk while the next one is being
+    encoded instead of holding the whole document and its compressed copy.
+    Shorter lists are returned as-is for the JSON representation.
+
+    Args:
+        items (list): Serialized items, from Serializer.dump_many
+    """
+    if not items or len(items) <= current_app.config.get(
+            'JSON_STREAM_MIN_ITEMS', 1000):
+        return items
+    return current_app.response_class(_stream_list(items),
+                                      mimetype='application/json')
+
+
+USER = Serializer({
+    'id': 'id',
+    'first_name': 'first_name',
+    'last_name': 'last_name',
+    'email': 'email'
+})
+
+AMENITY = Serializer({
+    'id': 'id',
+    'name': 'name'
+})
+
+REVIEW = Serializer({
+    'id': 'id',
+    'text': 'text',
+    'rating': 'rating',
+    'user_id': 'user_id',
+    'place_id': 'place_id'
+})
+
+# Reviews listed under a place, with their author's name
+PLACE_REVIEW = Serializer({
+    'id': 'id',
+    'text': 'text',
+    'rating': 'rating',
+    'user_id': 'user_id',
+    'user_name': lambda review: '{} {}'.format(review.user.first_name,
+                                               review.user.last_name)
+})
+
+# Place cards of lists and searches (columns of the 'card' loader profile)
+PLACE_CARD = Serializer({
+    'id': 'id',
+    'title': 'title',
+    'price': 'price',
+    'latitude': 'latitude',
+    'longitude': 'longitude',
+    'average_rating': 'average_rating',
+    'review_count': 'review_count'
+})
+
+# Place as returned after creation
+PLACE = Serializer({
+    'id': 'id',
+    'title': 'title',
+    'price': 'price',
+    'latitude': 'latitude',
+    'longitude': 'longitude',
+    'owner_id': 'owner_id',
+    'description': 'description'
+})
+
+# Place page; load the place with the 'detail' profile first
+_PLACE_OWNER = USER.function()
+_PLACE_DETAIL_REVIEW = REVIEW.function(('id', 'text', 'rating', 'user_id'))
+
+PLACE_DETAIL = Serializer({
+    'id': 'id',
+    'title': 'title',
+    'latitude': 'latitude',
+    'longitude': 'longitude',
+    'price': 'price',
+    'description': 'description',
+    'average_rating': 'average_rating',
+    'review_count': 'review_count',
+    'rating_distribution': 'rating_distribution',
+    'owner': lambda place: _PLACE_OWNER(place.owner),
+    'amenities': lambda place: AMENITY.dump_many(place.amenities),
+    'reviews': lambda place: [_PLACE_DETAIL_REVIEW(review)
+                              for review in place.reviews]
+})
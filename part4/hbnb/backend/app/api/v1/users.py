@@ -1,5 +1,11 @@
+from flask import request
 from app.models.user import UserModel
 from app.services import facade
+from app.services.password_pool import PasswordPoolBusy
+from app.api.v1.conditional import (collection_etag, conditional_response,
+                                    make_etag)
+from app.api.v1.pagination import PAGE_PARAMS, page_headers, parse_page_args
+from app.api.v1.serializers import FIELDS_PARAMS, USER, list_response
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import (
     jwt_required,
@@ -43,14 +49,31 @@ user_update_model = api.model('UserUpdate', {
 
 @api.route('/')
 class UserList(Resource):
+    @api.doc(params={**PAGE_PARAMS, **FIELDS_PARAMS})
     @api.response(200, 'List of users retrieved successfully')
+    @api.response(304, 'List not modified')
+    @api.response(400, 'Invalid pagination or fields parameters')
     def get(self):
         """Retrieve all users"""
         try:
-            users = facade.get_all_users()
-            return [{'id': user.id, 'first_name': user.first_name,
-                     'last_name': user.last_name, 'email': user.email}
-                    for user in users], 200
+            limit, cursor = parse_page_args(request.args)
+            fields = USER.request_fields()
+
+            def build():
+                headers = {}
+                if limit is None:
+                    users = facade.get_all_users()
+                else:
+                    users, next_cursor = facade.get_users_page(limit, cursor)
+                    headers = page_headers(request, next_cursor)
+                return (list_response(USER.dump_many(users, fields)),
+                        headers)
+
+            version = facade.get_users_version()
+            return conditional_response(collection_etag(version), None,
+                                        build)
+        except ValueError as e:
+            return {'error': str(e)}, 400
         except Exception as e:
             return {'error': 'Internal server error', 'message': str(e)}, 500
 
@@ -59,6 +82,7 @@ class UserList(Resource):
     @api.response(400, 'Email already registered')
     @api.response(400, 'Invalid input data')
     @api.response(403, 'Unauthorized action')
+    @api.response(503, 'Password hashing pool saturated')
     def post(self):
         """Register a new user (public) or create a user (admin only)"""
         user_data = api.payload
@@ -104,6 +128,9 @@ class UserList(Resource):
                 'message': 'User successfully created'
             }, 201
 
+        except PasswordPoolBusy as e:
+            return ({'error': 'Server busy, please retry later'}, 503,
+                    {'Retry-After': str(e.retry_after)})
         except ValueError as e:
             # Handle validation errors from the model
             return {'message': str(e)}, 400
@@ -114,15 +141,23 @@ class UserList(Resource):
 
 @api.route('/<user_id>')
 class UserResource(Resource):
+    @api.doc(params=FIELDS_PARAMS)
     @api.response(200, 'User details retrieved successfully')
+    @api.response(304, 'User not modified')
+    @api.response(400, 'Invalid fields parameter')
     @api.response(404, 'User not found')
     def get(self, user_id):
         """Get user details by ID"""
+        try:
+            fields = USER.request_fields()
+        except ValueError as e:
+            return {'error': str(e)}, 400
         user = facade.get_user(user_id)
         if not user:
             return {'error': 'User not found'}, 404
-        return {'id': user.id, 'first_name': user.first_name,
-                'last_name': user.last_name, 'email': user.email}, 200
+        return conditional_response(
+            make_etag(user.id, user.updated_at, fields), user.updated_at,
+            lambda: USER.dump(user, fields))
 
     @jwt_required()
     @api.expect(user_update_model, validate=True)
@@ -133,6 +168,7 @@ class UserResource(Resource):
     )
     @api.response(400, 'Invalid input data')
     @api.response(404, 'User not found')
+    @api.response(503, 'Password hashing pool saturated')
     def put(self, user_id):
         try:
             user_data = api.payload
@@ -164,20 +200,17 @@ class UserResource(Resource):
 
             # Handle password hashing for admins
             if is_admin and 'password' in filtered_data:
-                user = facade.get_user(user_id)
-                if user:
-                    user.hash_password(filtered_data['password'])
-                    # Use the hashed password
-                    filtered_data['password'] = user.password
+                filtered_data['password'] = facade.hash_password(
+                    filtered_data['password'])
 
             user = facade.get_user(user_id)
             if not user:
                 return {'error': 'User not found'}, 404
             updated_user = facade.update_user(user_id, filtered_data)
-            return {'id': updated_user.id,
-                    'first_name': updated_user.first_name,
-                    'last_name': updated_user.last_name,
-                    'email': updated_user.email}, 200
+            return USER.dump(updated_user), 200
+        except PasswordPoolBusy as e:
+            return ({'error': 'Server busy, please retry later'}, 503,
+                    {'Retry-After': str(e.retry_after)})
         except ValueError as e:
             return {'message': str(e)}, 400
         except Exception as e:
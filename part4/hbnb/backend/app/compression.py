@@ -0,0 +1,136 @@
+"""Negotiated compression of API responses (br, gzip, deflate).
+
+An after_request hook compresses JSON and text responses whose client
+sent a matching Accept-Encoding: brotli when the brotli package is
+installed, otherwise gzip or deflate from the standard library. Bodies
+below COMPRESS_MIN_SIZE are sent as-is since compressing them costs more
+than it saves. Streamed responses are compressed chunk by chunk as they
+are sent, whatever their size.
+
+A compressed representation is a different representation, so its
+strong ETag gets an encoding suffix ('"abc-gzip"'); conditional requests
+strip it again before comparing (see base_etag).
+"""
+import zlib
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Encodings in order of preference when the client accepts several with
+# the same quality
+ENCODINGS = (('br',) if brotli is not None else ()) + ('gzip', 'deflate')
+
+
+def base_etag(tag):
+    """Return an entity tag without the suffix added when compressing."""
+    for encoding in ENCODINGS:
+        suffix = '-' + encoding
+        if tag.endswith(suffix):
+            return tag[:-len(suffix)]
+    return tag
+
+
+def _compressor(encoding, level):
+    """Return an object with compress() and flush() for an encoding."""
+    if encoding == 'br':
+        return _BrotliCompressor(level)
+    # wbits 31 writes a gzip header and trailer, 15 a zlib stream
+    wbits = 31 if encoding == 'gzip' else 15
+    return zlib.compressobj(level, zlib.DEFLATED, wbits)
+
+
+class _BrotliCompressor:
+    """brotli.Compressor with the compress()/flush() API of zlib."""
+
+    def __init__(self, level):
+        # Brotli qualities go up to 11, zlib levels up to 9
+        self._compressor = brotli.Compressor(quality=min(level, 11),
+                                             mode=brotli.MODE_TEXT)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.finish()
+
+
+def compress(data, encoding, level):
+    """Compress a whole body."""
+    compressor = _compressor(encoding, level)
+    return compressor.compress(data) + compressor.flush()
+
+
+def compress_stream(chunks, encoding, level):
+    """Compress an iterable of body chunks lazily.
+
+    Empty outputs are skipped: the compressor buffers small inputs and
+    only yields once it has a block to write.
+    """
+    compressor = _compressor(encoding, level)
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def _is_compressible(response, mimetypes):
+    if response.status_code < 200 or response.status_code in (204, 304):
+        return False
+    if 'Content-Encoding' in response.headers:
+        return False
+    if 'no-transform' in response.headers.get('Cache-Control', ''):
+        return False
+    return response.mimetype in mimetypes
+
+
+def compress_response(response, config):
+    """Compress a response in place if the client accepts it.
+
+    Args:
+        response (Response): Response about to be sent
+        config (Config): Application config with the COMPRESS_* settings
+    """
+    if not _is_compressible(response, config['COMPRESS_MIMETYPES']):
+        return response
+    # The body depends on Accept-Encoding even when sent uncompressed
+    response.vary.add('Accept-Encoding')
+
+    encoding = request.accept_encodings.best_match(ENCODINGS)
+    if encoding is None:
+        return response
+    level = config['COMPRESS_LEVEL']
+    if response.is_streamed:
+        response.response = compress_stream(response.response, encoding,
+                                            level)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < config['COMPRESS_MIN_SIZE']:
+            return response
+        response.set_data(compress(data, encoding, level))
+    response.headers['Content-Encoding'] = encoding
+
+    tag, weak = response.get_etag()
+    if tag and not weak:
+        response.set_etag('{}-{}'.format(tag, encoding))
+    return response
+
+
+def init_app(app):
+    """Register the compression hook unless COMPRESS_ENABLED is off.
+
+    Turn it off when a reverse proxy already compresses responses.
+    """
+    if not app.config.get('COMPRESS_ENABLED', True):
+        return
+
+    @app.after_request
+    def compress_after_request(response):
+        return compress_response(response, app.config)
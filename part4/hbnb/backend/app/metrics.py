@@ -0,0 +1,320 @@
+"""Request and SQL metrics, exposed in the Prometheus text format.
+
+Cursor events on every engine of the app count the SQL statements of the
+running request and add up their execution time; request hooks time the
+request and record, per method and route, the latency, the number of
+statements and the database time as histograms. A route whose statement
+count grows with the size of its response is N+1-bound.
+
+Requests slower than SLOW_REQUEST_MS and statements slower than
+SLOW_QUERY_MS are logged on the 'app.metrics' logger, statements with
+their SQL but never their parameters (they hold emails and password
+hashes). GET /api/metrics renders the histograms, the counters and the
+place cache and password pool statistics.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from flask import g, jsonify, request
+from flask_jwt_extended import get_jwt, verify_jwt_in_request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds, in seconds and in statements
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+                   5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+
+# Longest SQL text written to the slow statement log
+MAX_LOGGED_SQL = 2000
+
+# Statistics of the running request, if any
+_current = ContextVar('request_stats', default=None)
+
+
+class RequestStats:
+    """SQL statements run by one request and their total duration."""
+
+    __slots__ = ('started', 'queries', 'db_time')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+
+
+def current():
+    """Return the statistics of the running request, or None."""
+    return _current.get()
+
+
+class Histogram:
+    """Bucketed observations with their sum, Prometheus style."""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        # One count per bucket plus the +Inf bucket, not cumulative
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """Yield (upper bound label, cumulative count) pairs."""
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),),
+                                self.counts):
+            total += count
+            yield ('+Inf' if bound == float('inf') else _number(bound),
+                   total)
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _labels(**labels):
+    escaped = ('{}="{}"'.format(name, str(value).replace('\\', '\\\\')
+                                .replace('"', '\\"').replace('\n', '\\n'))
+               for name, value in labels.items())
+    return '{' + ','.join(escaped) + '}'
+
+
+# Place cache and password pool statistics: stats() key -> (metric
+# suffix, type, help)
+PLACE_CACHE_METRICS = {
+    'size': ('entries', 'gauge', 'Place detail payloads cached'),
+    'maxsize': ('max_entries', 'gauge', 'Place detail cache capacity'),
+    'hits': ('hits_total', 'counter', 'Place detail cache hits'),
+    'misses': ('misses_total', 'counter', 'Place detail cache misses'),
+    'evictions': ('evictions_total', 'counter',
+                  'Entries evicted from the full place detail cache'),
+    'invalidations': ('invalidations_total', 'counter',
+                      'Place detail cache invalidations')
+}
+
+PASSWORD_POOL_METRICS = {
+    'workers': ('workers', 'gauge', 'Password hashing threads'),
+    'active': ('active', 'gauge', 'Password jobs running'),
+    'queued': ('queued', 'gauge', 'Password jobs waiting for a thread'),
+    'peak_queued': ('peak_queued', 'gauge',
+                    'Most password jobs ever waiting at once'),
+    'completed': ('completed_total', 'counter', 'Password jobs completed'),
+    'rejected': ('rejected_total', 'counter',
+                 'Password jobs rejected with a 503')
+}
+
+
+class MetricsRegistry:
+    """Thread-safe request and SQL metrics of one application."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = {}
+        self.latency = {}
+        self.query_count = {}
+        self.db_time = {}
+        self.slow_requests = 0
+        self.slow_queries = 0
+
+    def observe_request(self, method, route, status, latency, stats):
+        """Record one finished request.
+
+        Args:
+            method (str): HTTP method
+            route (str): URL rule of the endpoint, such as
+                '/api/v1/places/<place_id>'
+            status (int): Response status code
+            latency (float): Seconds spent handling the request
+            stats (RequestStats): SQL statistics of the request
+        """
+        key = (method, route)
+        with self._lock:
+            self.requests[key + (status,)] = (
+                self.requests.get(key + (status,), 0) + 1)
+            if key not in self.latency:
+                self.latency[key] = Histogram(LATENCY_BUCKETS)
+                self.query_count[key] = Histogram(QUERY_COUNT_BUCKETS)
+                self.db_time[key] = Histogram(LATENCY_BUCKETS)
+            self.latency[key].observe(latency)
+            self.query_count[key].observe(stats.queries)
+            self.db_time[key].observe(stats.db_time)
+
+    def count_slow_request(self):
+        with self._lock:
+            self.slow_requests += 1
+
+    def count_slow_query(self):
+        with self._lock:
+            self.slow_queries += 1
+
+    def render(self, place_cache_stats=None, password_pool_stats=None):
+        """Return every metric in the Prometheus text exposition format."""
+        lines = []
+
+        def header(name, kind, help_text):
+            lines.append('# HELP {} {}'.format(name, help_text))
+            lines.append('# TYPE {} {}'.format(name, kind))
+
+        def histograms(name, help_text, series):
+            header(name, 'histogram', help_text)
+            for (method, route), histogram in sorted(series.items()):
+                for bound, count in histogram.cumulative():
+                    lines.append('{}_bucket{} {}'.format(
+                        name, _labels(method=method, route=route, le=bound),
+                        count))
+                labels = _labels(method=method, route=route)
+                lines.append('{}_sum{} {}'.format(name, labels,
+                                                  _number(histogram.sum)))
+                lines.append('{}_count{} {}'.format(name, labels,
+                                                    histogram.count))
+
+        def stats_metrics(prefix, stats, metrics):
+            for key, (suffix, kind, help_text) in metrics.items():
+                name = '{}_{}'.format(prefix, suffix)
+                header(name, kind, help_text)
+                lines.append('{} {}'.format(name, stats[key]))
+
+        with self._lock:
+            header('hbnb_http_requests_total', 'counter',
+                   'HTTP requests by method, route and status')
+            for (method, route, status), count in sorted(
+                    self.requests.items()):
+                lines.append('hbnb_http_requests_total{} {}'.format(
+                    _labels(method=method, route=route, status=status),
+                    count))
+            histograms('hbnb_http_request_duration_seconds',
+                       'Time spent handling requests', self.latency)
+            histograms('hbnb_db_queries_per_request',
+                       'SQL statements run by each request',
+                       self.query_count)
+            histograms('hbnb_db_time_per_request_seconds',
+                       'Time spent in SQL statements by each request',
+                       self.db_time)
+            header('hbnb_slow_requests_total', 'counter',
+                   'Requests slower than SLOW_REQUEST_MS')
+            lines.append('hbnb_slow_requests_total {}'.format(
+                self.slow_requests))
+            header('hbnb_slow_queries_total', 'counter',
+                   'SQL statements slower than SLOW_QUERY_MS')
+            lines.append('hbnb_slow_queries_total {}'.format(
+                self.slow_queries))
+
+        if place_cache_stats is not None:
+            stats_metrics('hbnb_place_cache', place_cache_stats,
+                          PLACE_CACHE_METRICS)
+        if password_pool_stats is not None:
+            stats_metrics('hbnb_password_pool', password_pool_stats,
+                          PASSWORD_POOL_METRICS)
+        return '\n'.join(lines) + '\n'
+
+
+def register_engine(engine, registry, slow_query_seconds):
+    """Count and time the statements of an engine.
+
+    Statements run outside a request (scripts, the password pool) are
+    only checked against the slow statement threshold. The start time is
+    kept on the statement's execution context, which is discarded with it
+    when the statement fails.
+    """
+    @event.listens_for(engine, 'before_cursor_execute')
+    def start_statement_timer(conn, cursor, statement, parameters, context,
+                              executemany):
+        context.metrics_started = time.perf_counter()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def stop_statement_timer(conn, cursor, statement, parameters, context,
+                             executemany):
+        elapsed = time.perf_counter() - context.metrics_started
+        stats = _current.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_time += elapsed
+        if elapsed >= slow_query_seconds:
+            registry.count_slow_query()
+            logger.warning('Slow SQL statement (%.1f ms): %s',
+                           elapsed * 1000, statement[:MAX_LOGGED_SQL])
+
+
+def init_app(app):
+    """Collect request and SQL metrics when METRICS_ENABLED is on.
+
+    Must run after db.init_app(app) and routing.init_app(app), so every
+    engine (including the read replica) is instrumented, and before the
+    unit of work hooks so the request's commit is part of its numbers.
+    The registry is stored in app.extensions['metrics'].
+    """
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+    from app import db
+
+    registry = MetricsRegistry()
+    app.extensions['metrics'] = registry
+    slow_request = app.config.get('SLOW_REQUEST_MS', 500) / 1000
+    query_header = app.config.get('METRICS_QUERY_HEADER', False)
+    with app.app_context():
+        for engine in db.engines.values():
+            register_engine(engine, registry,
+                            app.config.get('SLOW_QUERY_MS', 100) / 1000)
+
+    @app.before_request
+    def start_request_stats():
+        g.request_stats_token = _current.set(RequestStats())
+
+    # Registered before the unit of work and compression hooks, so it runs
+    # after them and includes the commit
+    @app.after_request
+    def record_request_stats(response):
+        stats = _current.get()
+        if stats is None:
+            return response
+        latency = time.perf_counter() - stats.started
+        route = (request.url_rule.rule if request.url_rule is not None
+                 else '<unmatched>')
+        registry.observe_request(request.method, route,
+                                 response.status_code, latency, stats)
+        if latency >= slow_request:
+            registry.count_slow_request()
+            logger.warning('Slow request %s %s -> %s (%.1f ms, %d queries, '
+                           '%.1f ms in SQL)', request.method, request.path,
+                           response.status_code, latency * 1000,
+                           stats.queries, stats.db_time * 1000)
+        if query_header:
+            response.headers['X-DB-Query-Count'] = str(stats.queries)
+            response.headers['X-DB-Time-Ms'] = '{:.2f}'.format(
+                stats.db_time * 1000)
+        return response
+
+    @app.teardown_request
+    def discard_request_stats(exc):
+        token = g.pop('request_stats_token', None)
+        if token is not None:
+            _current.reset(token)
+
+    public = app.config.get('METRICS_PUBLIC', False)
+
+    @app.route('/api/metrics')
+    def metrics():
+        """Metrics in the Prometheus text exposition format.
+
+        Admins only, unless METRICS_PUBLIC is set.
+        """
+        if not public:
+            verify_jwt_in_request()
+            if not get_jwt().get('is_admin', False):
+                return jsonify({'error': 'Admin privileges required'}), 403
+        from app.services import facade
+        return app.response_class(
+            registry.render(facade.place_cache.stats(),
+                            facade.password_pool.stats()),
+            mimetype='text/plain; version=0.0.4')
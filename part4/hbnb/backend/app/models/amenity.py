@@ -21,6 +21,11 @@ class AmenityModel(BaseModel):
     """
     __tablename__ = 'amenities'
 
+    # List pages are ordered and resumed by (created_at, id)
+    __table_args__ = (
+        db.Index('ix_amenities_created_at_id', 'created_at', 'id'),
+    )
+
     # Amenity name - must be unique across all amenities
     # Examples: "WiFi", "Swimming Pool", "Air Conditioning"
     name = db.Column(db.String(50), nullable=False, unique=True)
@@ -31,6 +31,7 @@ class BaseModel(db.Model):
     
     # Automatic timestamp for record creation
     # Uses UTC timezone to avoid ambiguity across different servers
+    # Each model indexes (created_at, id), the order of list pages
     created_at = db.Column(
         db.DateTime,
         default=lambda: datetime.now(timezone.utc)
@@ -38,10 +39,12 @@ class BaseModel(db.Model):
     
     # Automatic timestamp for last update
     # Updated automatically on each modification via onupdate
+    # Indexed so MAX(updated_at), used to validate cached lists, is a seek
     updated_at = db.Column(
         db.DateTime,
         default=lambda: datetime.now(timezone.utc),
-        onupdate=lambda: datetime.now(timezone.utc)
+        onupdate=lambda: datetime.now(timezone.utc),
+        index=True
     )
 
     def __init__(self, *args, **kwargs):
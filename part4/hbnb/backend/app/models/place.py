@@ -26,9 +26,20 @@ place_amenity = db.Table(
         db.String(36),
         db.ForeignKey('amenities.id'),
         primary_key=True
-    )
+    ),
+    # The primary key starts with place_id, amenity filters and facet
+    # counts look rows up by amenity first
+    db.Index('idx_place_amenity_amenity_id', 'amenity_id', 'place_id')
 )
 
+# Star values a review can have, one histogram column per value
+RATING_VALUES = range(1, 6)
+
+
+def rating_count_column(stars):
+    """Return the name of the histogram column for a star value."""
+    return 'rating_{}_count'.format(stars)
+
 
 class PlaceModel(BaseModel):
     """Place model class.
@@ -43,12 +54,24 @@ class PlaceModel(BaseModel):
         price (float): Price per night (must be positive)
         latitude (float): Geographic latitude (-90 to 90)
         longitude (float): Geographic longitude (-180 to 180)
+        review_count (int): Number of reviews, maintained incrementally
+        rating_sum (int): Sum of all review ratings
+        rating_N_count (int): Number of N-star reviews, for N in 1..5
+        rating_avg (float): Average rating, None while there are no reviews
         owner (relationship): User who owns this place
         reviews (relationship): Reviews for this place
         amenities (relationship): Amenities available at this place
     """
     __tablename__ = 'places'
 
+    # Composite B-tree index used by radius and bounding-box searches
+    # The latitude range is scanned first, longitude is checked in the index
+    __table_args__ = (
+        db.Index('idx_places_lat_lng', 'latitude', 'longitude'),
+        # List pages are ordered and resumed by (created_at, id)
+        db.Index('ix_places_created_at_id', 'created_at', 'id'),
+    )
+
     # Foreign key to users table with CASCADE delete
     # When a user is deleted, their places are also deleted
     owner_id = db.Column(db.String(36), db.ForeignKey('users.id', ondelete='CASCADE'))
@@ -60,7 +83,8 @@ class PlaceModel(BaseModel):
     description = db.Column(db.String, nullable=True)
     
     # Price per night - required, must be positive
-    price = db.Column(db.Float, nullable=False)
+    # Indexed for price range filters on the place list
+    price = db.Column(db.Float, nullable=False, index=True)
     
     # GPS coordinates for location
     # Latitude: -90 (South Pole) to +90 (North Pole)
@@ -69,6 +93,21 @@ class PlaceModel(BaseModel):
     # Longitude: -180 (International Date Line West) to +180 (East)
     longitude = db.Column(db.Float, nullable=False)
 
+    # Rating aggregates, kept up to date by the facade on every review write
+    # so listings never have to load place.reviews to show ratings
+    review_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum = db.Column(db.Integer, nullable=False, default=0)
+
+    # Histogram of ratings: one counter per star value
+    rating_1_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_2_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_3_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_4_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_5_count = db.Column(db.Integer, nullable=False, default=0)
+
+    # Average rating stored (and indexed) for sorting and filtering
+    rating_avg = db.Column(db.Float, nullable=True, index=True)
+
     # Many-to-one relationship: many places belong to one owner
     owner = db.relationship("UserModel", back_populates="places")
     
@@ -187,6 +226,23 @@ class PlaceModel(BaseModel):
         else:
             raise ValueError("The owner doesn't exist")
 
+    @property
+    def average_rating(self):
+        """Average rating rounded to two decimals, or None without reviews."""
+        if self.rating_avg is None:
+            return None
+        return round(self.rating_avg, 2)
+
+    @property
+    def rating_distribution(self):
+        """Number of reviews per star value.
+        
+        Returns:
+            dict: Mapping of '1'..'5' to review counts
+        """
+        return {str(stars): getattr(self, rating_count_column(stars)) or 0
+                for stars in RATING_VALUES}
+
     def add_review(self, review):
         """Add a review to this place.
         
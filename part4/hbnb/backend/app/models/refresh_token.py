@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""Refresh token model module.
+
+This module defines the RefreshTokenModel class which records the refresh
+tokens issued to users, so they can be rotated, revoked and pruned.
+"""
+from app import db
+
+
+class RefreshTokenModel(db.Model):
+    """Refresh token model class.
+    
+    One row per issued refresh token, identified by the token's jti claim.
+    The row is deliberately small and does not inherit BaseModel: it is
+    looked up by primary key on every refresh and deleted once expired.
+    
+    Every token issued by rotating another one shares its family_id, so
+    replaying an already rotated token revokes the whole family (the
+    session it was stolen from) without logging out the user's other
+    devices.
+    
+    Attributes:
+        jti (str): Unique token identifier (the JWT jti claim)
+        family_id (str): jti of the token issued at login
+        user_id (str): Foreign key to the token owner
+        expires_at (datetime): Expiry time, in UTC
+        used (bool): Whether the token was already rotated
+    """
+    __tablename__ = 'refresh_tokens'
+
+    # Token identifier, looked up by primary key on every refresh
+    jti = db.Column(db.String(36), primary_key=True)
+
+    # Login session the token belongs to, used to revoke it as a whole
+    family_id = db.Column(db.String(36), nullable=False, index=True)
+
+    # Foreign key to users table with CASCADE delete
+    user_id = db.Column(db.String(36),
+                        db.ForeignKey('users.id', ondelete='CASCADE'),
+                        nullable=False)
+
+    # Indexed so expired tokens can be pruned with a range delete
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    # Rotated tokens are kept until they expire to detect replays
+    used = db.Column(db.Boolean, nullable=False, default=False)
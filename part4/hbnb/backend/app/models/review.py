@@ -31,6 +31,8 @@ class ReviewModel(BaseModel):
     # Prevents duplicate reviews from the same user for the same place
     __table_args__ = (
         db.UniqueConstraint('user_id', 'place_id', name='unique_user_place'),
+        # List pages are ordered and resumed by (created_at, id)
+        db.Index('ix_reviews_created_at_id', 'created_at', 'id'),
     )
 
     # Review text - required field for the review content
@@ -41,7 +43,9 @@ class ReviewModel(BaseModel):
     
     # Foreign key to places table with CASCADE delete
     # When a place is deleted, its reviews are also deleted
-    place_id = db.Column(db.String(36), db.ForeignKey('places.id', ondelete='CASCADE'))
+    # Indexed because reviews are listed per place on every place page
+    place_id = db.Column(db.String(36), db.ForeignKey('places.id', ondelete='CASCADE'),
+                         index=True)
     
     # Foreign key to users table with CASCADE delete
     # When a user is deleted, their reviews are also deleted
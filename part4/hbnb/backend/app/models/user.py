@@ -11,6 +11,21 @@ from sqlalchemy.orm import validates
 import re
 
 
+def normalize_email(email):
+    """Return the canonical form of an email address used for lookups.
+    
+    Surrounding whitespace is dropped and the address is lowercased, so
+    A@x.io and a@x.io are the same account.
+    
+    Args:
+        email (str): Email address as entered
+        
+    Returns:
+        str: Normalized email address
+    """
+    return email.strip().lower()
+
+
 class UserModel(BaseModel):
     """User model class.
     
@@ -21,6 +36,7 @@ class UserModel(BaseModel):
         first_name (str): User's first name (max 50 chars)
         last_name (str): User's last name (max 50 chars)
         email (str): User's email address (must be unique and valid format)
+        email_normalized (str): Lowercased email, unique, used for lookups
         password (str): Hashed password (max 128 chars)
         is_admin (bool): Whether the user has admin privileges
         places (relationship): Places owned by this user
@@ -28,6 +44,11 @@ class UserModel(BaseModel):
     """
     __tablename__ = 'users'
 
+    # List pages are ordered and resumed by (created_at, id)
+    __table_args__ = (
+        db.Index('ix_users_created_at_id', 'created_at', 'id'),
+    )
+
     # User's first name - required field with max length
     first_name = db.Column(db.String(50), nullable=False)
     
@@ -36,6 +57,12 @@ class UserModel(BaseModel):
     
     # Email address - must be unique across all users
     email = db.Column(db.String(120), nullable=False, unique=True)
+
+    # Normalized email (see normalize_email) kept in sync by validate_email
+    # Its unique index serves every lookup by email and rejects addresses
+    # differing only by case
+    email_normalized = db.Column(db.String(120), nullable=False, unique=True,
+                                 index=True)
     
     # Hashed password - never store plain text passwords
     password = db.Column(db.String(128), nullable=False)
@@ -97,7 +124,8 @@ class UserModel(BaseModel):
     def validate_email(self, key, email):
         """Validate email field.
         
-        Ensures email is provided and matches a valid email format.
+        Ensures email is provided and matches a valid email format,
+        and updates email_normalized to match.
         
         Args:
             key (str): Name of the field being validated
@@ -111,6 +139,7 @@ class UserModel(BaseModel):
         """
         if not email or not self.is_valid_email(email):
             raise ValueError("Valid email is required")
+        self.email_normalized = normalize_email(email)
         return email
 
     def is_valid_email(self, email):
@@ -139,9 +168,23 @@ class UserModel(BaseModel):
         Args:
             password (str): Plain text password to hash
         """
+        self.password = self.make_password_hash(password)
+
+    @staticmethod
+    def make_password_hash(password):
+        """Return the bcrypt hash of a password.
+        
+        Touches no model state, so it can run on a worker thread.
+        
+        Args:
+            password (str): Plain text password to hash
+            
+        Returns:
+            str: bcrypt hash as a UTF-8 string
+        """
         # Generate bcrypt hash and store as UTF-8 string
         # bcrypt automatically handles salt generation
-        self.password = bcrypt.generate_password_hash(password).decode('utf-8')
+        return bcrypt.generate_password_hash(password).decode('utf-8')
 
     def verify_password(self, password):
         """Verify a password against the stored hash.
@@ -151,9 +194,24 @@ class UserModel(BaseModel):
         Args:
             password (str): Plain text password to verify
             
+        Returns:
+            bool: True if password matches the hash, False otherwise
+        """
+        return self.check_password_hash(self.password, password)
+
+    @staticmethod
+    def check_password_hash(password_hash, password):
+        """Check a password against a bcrypt hash.
+        
+        Touches no model state, so it can run on a worker thread.
+        
+        Args:
+            password_hash (str): Stored bcrypt hash
+            password (str): Plain text password to verify
+            
         Returns:
             bool: True if password matches the hash, False otherwise
         """
         # bcrypt handles the comparison securely
         # Returns True if password matches, False otherwise
-        return bcrypt.check_password_hash(self.password, password)
+        return bcrypt.check_password_hash(password_hash, password)
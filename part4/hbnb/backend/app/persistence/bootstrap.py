@@ -0,0 +1,277 @@
+import hashlib
+import os
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import (Column, DateTime, MetaData, String, Table, delete,
+                        func, insert, inspect, literal, select)
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from app import db
+from app.models.user import UserModel
+from app.persistence.unit_of_work import unit_of_work
+
+# Directory of the schema reference files and of the seed data
+SQL_DIR = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__)))), 'sql')
+
+# Seed files applied to empty databases, in order
+SEED_FILES = ('insert_data.sql',)
+
+# Checksum name of the schema generated from the models
+SCHEMA_STEP = 'schema'
+
+# What the bootstrap already applied, outside the models' metadata so
+# db.create_all() and db.drop_all() never touch it
+bootstrap_checksums = Table(
+    'bootstrap_checksums', MetaData(),
+    Column('name', String(100), primary_key=True),
+    Column('checksum', String(64), nullable=False),
+    Column('applied_at', DateTime, nullable=False))
+
+
+class BootstrapError(Exception):
+    """The database cannot be brought up to date automatically."""
+
+
+def checksum(text):
+    """Return the SHA-256 hex digest of a text."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def schema_statements(dialect):
+    """Return the DDL creating every table and index of the models.
+
+    Tables come in dependency order, each followed by its indexes sorted
+    by name, compiled for the given dialect.
+    """
+    statements = []
+    for table in db.metadata.sorted_tables:
+        statements.append(str(CreateTable(table).compile(
+            dialect=dialect)).strip())
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            statements.append(str(CreateIndex(index).compile(
+                dialect=dialect)).strip())
+    return statements
+
+
+def split_statements(script):
+    """Split a SQL script into statements.
+
+    Drops '--' comments and splits on semicolons, except inside quoted
+    strings (where a doubled quote is an escaped quote).
+    """
+    statements = []
+    current = []
+    quote = None
+    index = 0
+    while index < len(script):
+        char = script[index]
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in '\'"':
+            quote = char
+        elif script.startswith('--', index):
+            end = script.find('\n', index)
+            index = len(script) if end == -1 else end
+            continue
+        elif char == ';':
+            statements.append(''.join(current).strip())
+            current = []
+            index += 1
+            continue
+        current.append(char)
+        index += 1
+    statements.append(''.join(current).strip())
+    return [statement for statement in statements if statement]
+
+
+def _begin(connection):
+    # pysqlite only opens a transaction before DML, so DDL would
+    # autocommit statement by statement
+    if connection.dialect.name == 'sqlite':
+        dbapi_connection = connection.connection.driver_connection
+        if not dbapi_connection.in_transaction:
+            connection.exec_driver_sql('BEGIN')
+
+
+def add_missing_columns(connection, table):
+    """Add the columns of a model table missing from the database.
+
+    Each column is added with its server default, or else its scalar
+    Python default, and is NOT NULL only when it has one of them: most
+    databases (SQLite included) cannot add a NOT NULL column without a
+    default to a filled table. Constraints and indexes are left to the
+    caller.
+
+    Args:
+        connection: Connection of the current transaction
+        table (Table): Table of the models' metadata
+
+    Returns:
+        list: Names of the columns added
+    """
+    existing = {column['name'] for column in
+                inspect(connection).get_columns(table.name)}
+    added = []
+    for column in table.columns:
+        if column.name in existing:
+            continue
+        definition = '{} {}'.format(
+            column.name, column.type.compile(dialect=connection.dialect))
+        default = None
+        if column.server_default is not None:
+            default = str(column.server_default.arg.compile(
+                dialect=connection.dialect))
+        elif column.default is not None and column.default.is_scalar:
+            default = str(literal(column.default.arg, column.type).compile(
+                dialect=connection.dialect,
+                compile_kwargs={'literal_binds': True}))
+        if default is not None:
+            definition += ' DEFAULT {}'.format(default)
+            if not column.nullable:
+                definition += ' NOT NULL'
+        connection.exec_driver_sql('ALTER TABLE {} ADD COLUMN {}'.format(
+            table.name, definition))
+        added.append(column.name)
+    return added
+
+
+def _create_schema(connection):
+    """Create missing tables, columns and indexes, return added columns."""
+    db.metadata.create_all(connection)
+    # create_all() skips existing tables, including columns and indexes
+    # declared on them after they were created
+    added = []
+    for table in db.metadata.sorted_tables:
+        added += ['{}.{}'.format(table.name, name)
+                  for name in add_missing_columns(connection, table)]
+    # Unique indexes may fail on existing rows, the normalized email
+    # backfill creates them when it can
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            if not index.unique:
+                index.create(connection, checkfirst=True)
+    return added
+
+
+def bootstrap(sql_dir=SQL_DIR, seed_files=SEED_FILES):
+    """Create or upgrade the schema and load the seed data, once.
+
+    Everything runs in one transaction: a failure leaves the database as
+    it was. The checksum of each step is recorded in the
+    bootstrap_checksums table and a step whose checksum did not change
+    is skipped. Running it again on an up-to-date database only opens
+    the transaction, checks that bootstrap_checksums exists, reads the
+    recorded checksums and commits; the seed files are read and hashed
+    locally.
+
+    The schema step creates missing tables, columns and indexes from the
+    models, then backfills the normalized email column of existing users
+    and, when columns were added, recomputes the rating aggregates; its
+    checksum is not recorded while emails conflict, so the next run
+    tries again. Seed files are only applied to a database without
+    users, otherwise they are recorded as skipped. Rating aggregates and
+    the search index are rebuilt when seed data was loaded.
+
+    Args:
+        sql_dir (str): Directory holding the seed files
+        seed_files (tuple): Seed file names, applied in order
+
+    Returns:
+        tuple: (list of (step, outcome, seconds), {normalized email:
+            [user ids]} for emails shared by several users)
+
+    Raises:
+        BootstrapError: If an applied seed file has changed since
+    """
+    from app.services import get_facade
+    facade = get_facade()
+
+    steps = []
+    conflicts = {}
+    with unit_of_work():
+        connection = db.session.connection()
+        _begin(connection)
+        bootstrap_checksums.create(connection, checkfirst=True)
+        applied = dict(connection.execute(select(
+            bootstrap_checksums.c.name,
+            bootstrap_checksums.c.checksum)).all())
+        recorded = {}
+
+        started = time.perf_counter()
+        schema_checksum = checksum('\n'.join(
+            schema_statements(connection.dialect)))
+        schema_changed = applied.get(SCHEMA_STEP) != schema_checksum
+        if not schema_changed:
+            outcome = 'unchanged'
+        else:
+            added = _create_schema(connection)
+            updated, conflicts = facade.backfill_normalized_emails()
+            outcome = 'applied, {} columns added, {} emails normalized'
+            outcome = outcome.format(len(added), updated)
+            if conflicts:
+                outcome += ', {} conflicts'.format(len(conflicts))
+            else:
+                recorded[SCHEMA_STEP] = schema_checksum
+        steps.append((SCHEMA_STEP, outcome, time.perf_counter() - started))
+
+        seeded = False
+        for name in seed_files:
+            started = time.perf_counter()
+            with open(os.path.join(sql_dir, name), encoding='utf-8') as file:
+                script = file.read()
+            file_checksum = checksum(script)
+            if applied.get(name) == file_checksum:
+                outcome = 'unchanged'
+            elif name in applied:
+                raise BootstrapError(
+                    '{} changed since it was applied, load the changes by '
+                    'hand or recreate the database'.format(name))
+            elif db.session.scalar(select(func.count()).select_from(
+                    UserModel.__table__)):
+                outcome = 'skipped, the database already has users'
+            else:
+                statements = split_statements(script)
+                for statement in statements:
+                    connection.exec_driver_sql(statement)
+                seeded = True
+                outcome = 'applied, {} statements'.format(len(statements))
+            if applied.get(name) != file_checksum:
+                recorded[name] = file_checksum
+            steps.append((name, outcome, time.perf_counter() - started))
+
+        if seeded:
+            started = time.perf_counter()
+            # Seed files write rows directly, derived data is computed here
+            places = facade.rebuild_rating_aggregates()
+            indexed = facade.rebuild_search_index()
+            outcome = '{} places rated'.format(places)
+            if indexed is not None:
+                outcome += ', {} indexed'.format(indexed)
+            steps.append(('derived data', outcome,
+                          time.perf_counter() - started))
+        elif schema_changed:
+            # Existing places get the search index when it is created, and
+            # their aggregates when the rating columns were just added
+            started = time.perf_counter()
+            outcomes = []
+            if added:
+                outcomes.append('{} places rated'.format(
+                    facade.rebuild_rating_aggregates()))
+            indexed = facade.rebuild_search_index()
+            if indexed is not None:
+                outcomes.append('{} indexed'.format(indexed))
+            if outcomes:
+                steps.append(('derived data', ', '.join(outcomes),
+                              time.perf_counter() - started))
+
+        if recorded:
+            now = datetime.now(timezone.utc)
+            connection.execute(delete(bootstrap_checksums).where(
+                bootstrap_checksums.c.name.in_(list(recorded))))
+            connection.execute(insert(bootstrap_checksums), [
+                {'name': name, 'checksum': value, 'applied_at': now}
+                for name, value in recorded.items()])
+    return steps, conflicts
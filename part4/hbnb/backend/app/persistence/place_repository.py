@@ -0,0 +1,275 @@
+import math
+from collections import Counter
+
+from app import db
+from app.models.amenity import AmenityModel
+from app.models.place import (PlaceModel, RATING_VALUES, place_amenity,
+                              rating_count_column)
+from app.models.review import ReviewModel
+from app.persistence.bootstrap import add_missing_columns
+from app.persistence.repository import SQLAlchemyRepository
+from app.persistence.unit_of_work import save_changes
+from sqlalchemy import Float, case, cast, func, or_, select, update
+from sqlalchemy.orm import joinedload, load_only, selectinload
+
+# Place attributes derived from its reviews
+RATING_ATTRIBUTES = (['review_count', 'rating_sum', 'rating_avg'] +
+                     [rating_count_column(stars) for stars in RATING_VALUES])
+
+# Mean Earth radius in kilometers (IUGG value)
+EARTH_RADIUS_KM = 6371.0088
+
+# Rows loaded per requested result by radius searches: they are picked
+# by an approximate distance, the margin absorbs its ranking errors
+NEARBY_CANDIDATES_PER_RESULT = 2
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Return the great-circle distance between two points in kilometers."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = math.radians(lat2 - lat1)
+    d_lambda = math.radians(lng2 - lng1)
+    a = (math.sin(d_phi / 2) ** 2 +
+         math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(lat, lng, radius_km):
+    """Return the (min_lat, min_lng, max_lat, max_lng) box around a circle.
+
+    The box is a superset of the circle, so it can be used as an indexed
+    pre-filter before the exact haversine check. When the circle crosses
+    the antimeridian, min_lng is greater than max_lng.
+    """
+    angular = radius_km / EARTH_RADIUS_KM
+    d_lat = math.degrees(angular)
+    min_lat, max_lat = lat - d_lat, lat + d_lat
+
+    # Near the poles every longitude can be inside the circle
+    if min_lat <= -90.0 or max_lat >= 90.0:
+        return max(min_lat, -90.0), -180.0, min(max_lat, 90.0), 180.0
+
+    d_lng = math.degrees(math.asin(math.sin(angular) /
+                                   math.cos(math.radians(lat))))
+    min_lng, max_lng = lng - d_lng, lng + d_lng
+    if min_lng < -180.0:
+        min_lng += 360.0
+    if max_lng > 180.0:
+        max_lng -= 360.0
+    return min_lat, min_lng, max_lat, max_lng
+
+
+class PlaceRepository(SQLAlchemyRepository):
+    loader_profiles = {
+        # Map/list cards: scalar columns only, no relationship is touched
+        'card': (
+            load_only(PlaceModel.id, PlaceModel.title, PlaceModel.price,
+                      PlaceModel.latitude, PlaceModel.longitude,
+                      PlaceModel.review_count, PlaceModel.rating_avg),
+        ),
+        # Listings showing the owner and amenities of each place
+        'list': (
+            joinedload(PlaceModel.owner),
+            selectinload(PlaceModel.amenities),
+        ),
+        # Place page: owner, amenities, reviews and their authors in three
+        # queries whatever the number of reviews
+        'detail': (
+            joinedload(PlaceModel.owner),
+            selectinload(PlaceModel.amenities),
+            selectinload(PlaceModel.reviews).joinedload(ReviewModel.user),
+        ),
+    }
+
+    def __init__(self):
+        super().__init__(PlaceModel)
+
+    def filter_criteria(self, min_price=None, max_price=None,
+                        min_rating=None, amenity_ids=None):
+        """Return filter expressions for the place list.
+
+        Price bounds are inclusive and use the places.price index; a
+        minimum rating uses the rating_avg index and leaves out places
+        without reviews. With amenity_ids only places offering all of
+        them are kept.
+        """
+        criteria = []
+        if amenity_ids:
+            amenity_ids = set(amenity_ids)
+            # One grouped scan of place_amenity by amenity_id: a place
+            # qualifies when it has a row for every requested amenity
+            criteria.append(self.model.id.in_(
+                select(place_amenity.c.place_id)
+                .where(place_amenity.c.amenity_id.in_(amenity_ids))
+                .group_by(place_amenity.c.place_id)
+                .having(func.count() == len(amenity_ids))))
+        if min_price is not None:
+            criteria.append(self.model.price >= min_price)
+        if max_price is not None:
+            criteria.append(self.model.price <= max_price)
+        if min_rating is not None:
+            criteria.append(self.model.rating_avg >= min_rating)
+        return criteria
+
+    def get_amenity_facets(self, criteria=()):
+        """Count the places offering each amenity among those matching.
+
+        Args:
+            criteria (iterable): Filter expressions on places, as returned
+                by filter_criteria
+
+        Returns:
+            tuple: (number of matching places, list of (amenity id,
+                amenity name, place count) by decreasing count)
+        """
+        criteria = list(criteria)
+        total = db.session.scalar(
+            select(func.count(self.model.id)).where(*criteria))
+        place_count = func.count(place_amenity.c.place_id)
+        query = (select(AmenityModel.id, AmenityModel.name, place_count)
+                 .join(place_amenity,
+                       place_amenity.c.amenity_id == AmenityModel.id)
+                 .group_by(AmenityModel.id, AmenityModel.name)
+                 .order_by(place_count.desc(), AmenityModel.name))
+        if criteria:
+            query = query.join(
+                self.model, self.model.id == place_amenity.c.place_id
+            ).where(*criteria)
+        return total, [tuple(row) for row in db.session.execute(query)]
+
+    def get_place_ids_by_owner(self, owner_id):
+        """Return the ids of the places owned by a user."""
+        return list(db.session.scalars(
+            select(self.model.id).where(self.model.owner_id == owner_id)))
+
+    def get_place_ids_by_amenity(self, amenity_id):
+        """Return the ids of the places offering an amenity."""
+        return list(db.session.scalars(
+            select(place_amenity.c.place_id)
+            .where(place_amenity.c.amenity_id == amenity_id)))
+
+    def _bbox_query(self, min_lat, min_lng, max_lat, max_lng):
+        query = self._read_query().filter(
+            self.model.latitude.between(min_lat, max_lat))
+        if min_lng <= max_lng:
+            return query.filter(
+                self.model.longitude.between(min_lng, max_lng))
+        return query.filter(or_(self.model.longitude >= min_lng,
+                                self.model.longitude <= max_lng))
+
+    def get_places_in_bbox(self, min_lat, min_lng, max_lat, max_lng, limit):
+        """Return at most limit places inside a bounding box.
+
+        Uses the (latitude, longitude) index; the most reviewed places
+        come first and the limit is applied in SQL. A box with min_lng
+        greater than max_lng is treated as crossing the antimeridian.
+        """
+        return (self._bbox_query(min_lat, min_lng, max_lat, max_lng)
+                .order_by(self.model.review_count.desc(), self.model.id)
+                .limit(limit)
+                .all())
+
+    def get_places_nearby(self, lat, lng, radius_km, limit):
+        """Return (place, distance_km) pairs within radius, nearest first.
+
+        The rows of the bounding box are ordered in SQL by an
+        equirectangular approximation of the distance and only
+        NEARBY_CANDIDATES_PER_RESULT times limit of them are loaded, then
+        checked and sorted with the exact haversine distance.
+        """
+        d_lng = self.model.longitude - lng
+        # Longitude differences across the antimeridian
+        d_lng = case((d_lng > 180, d_lng - 360), (d_lng < -180, d_lng + 360),
+                     else_=d_lng)
+        d_x = d_lng * math.cos(math.radians(lat))
+        d_y = self.model.latitude - lat
+        candidates = (self._bbox_query(*bounding_box(lat, lng, radius_km))
+                      .order_by(d_x * d_x + d_y * d_y)
+                      .limit(limit * NEARBY_CANDIDATES_PER_RESULT)
+                      .all())
+        results = []
+        for place in candidates:
+            distance = haversine_km(lat, lng, place.latitude, place.longitude)
+            if distance <= radius_km:
+                results.append((place, distance))
+        results.sort(key=lambda item: item[1])
+        return results[:limit]
+
+    def adjust_rating_aggregates(self, place, added=(), removed=()):
+        """Apply review rating changes to a place's aggregates.
+
+        The change is a single UPDATE with relative increments executed in
+        the current transaction, so concurrent review writes cannot lose
+        each other's updates and nothing is committed here.
+
+        Args:
+            place (PlaceModel): Place whose reviews changed
+            added (iterable[int]): Ratings of reviews added or updated to
+            removed (iterable[int]): Ratings of reviews removed or updated from
+        """
+        added, removed = list(added), list(removed)
+        buckets = Counter(added)
+        buckets.subtract(removed)
+        count = self.model.review_count + (len(added) - len(removed))
+        total = self.model.rating_sum + (sum(added) - sum(removed))
+        values = {
+            'review_count': count,
+            'rating_sum': total,
+            'rating_avg': case((count > 0, cast(total, Float) / count),
+                               else_=None)
+        }
+        for stars, delta in buckets.items():
+            if delta:
+                column = rating_count_column(stars)
+                values[column] = getattr(self.model, column) + delta
+
+        # Only rating columns change, so pending objects (such as the
+        # review being added) do not need to be flushed first
+        with db.session.no_autoflush:
+            db.session.execute(
+                update(self.model)
+                .where(self.model.id == place.id)
+                .values(**values)
+                .execution_options(synchronize_session=False))
+        # Reload the new values on next access instead of using stale ones
+        db.session.expire(place, RATING_ATTRIBUTES)
+
+    def rebuild_rating_aggregates(self):
+        """Recompute every place's rating aggregates from its reviews.
+
+        Used to initialise the aggregates on existing data or to repair
+        them. The aggregate columns are first added to databases created
+        before them (counts NOT NULL DEFAULT 0, rating_avg nullable). Each
+        place is recomputed with correlated subqueries that use the
+        reviews.place_id index.
+
+        Returns:
+            int: Number of places updated
+        """
+        add_missing_columns(db.session.connection(), self.model.__table__)
+
+        def reviews_of_place(*columns):
+            return (select(*columns)
+                    .where(ReviewModel.place_id == self.model.id)
+                    .scalar_subquery())
+
+        values = {
+            'review_count': reviews_of_place(func.count(ReviewModel.id)),
+            'rating_sum': reviews_of_place(
+                func.coalesce(func.sum(ReviewModel.rating), 0)),
+            'rating_avg': reviews_of_place(
+                func.avg(cast(ReviewModel.rating, Float)))
+        }
+        for stars in RATING_VALUES:
+            values[rating_count_column(stars)] = (
+                select(func.count(ReviewModel.id))
+                .where(ReviewModel.place_id == self.model.id,
+                       ReviewModel.rating == stars)
+                .scalar_subquery())
+
+        result = db.session.execute(
+            update(self.model)
+            .values(**values)
+            .execution_options(synchronize_session=False))
+        save_changes()
+        return result.rowcount
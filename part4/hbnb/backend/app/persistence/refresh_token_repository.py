@@ -0,0 +1,50 @@
+from app import db
+from app.models.refresh_token import RefreshTokenModel
+from app.models.user import UserModel
+from app.persistence.repository import SQLAlchemyRepository
+from app.persistence.unit_of_work import save_changes
+from sqlalchemy import delete, select, update
+
+
+class RefreshTokenRepository(SQLAlchemyRepository):
+    def __init__(self):
+        super().__init__(RefreshTokenModel)
+
+    def get_with_admin_flag(self, jti):
+        """Return (token, owner is_admin) in one primary key lookup."""
+        row = db.session.execute(
+            select(self.model, UserModel.is_admin)
+            .join(UserModel, UserModel.id == self.model.user_id)
+            .where(self.model.jti == jti)).first()
+        return tuple(row) if row else None
+
+    def mark_used(self, jti):
+        """Flag a token as rotated.
+
+        Returns:
+            bool: False if it was already used, e.g. by a concurrent refresh
+        """
+        result = db.session.execute(
+            update(self.model)
+            .where(self.model.jti == jti, self.model.used.is_(False))
+            .values(used=True)
+            .execution_options(synchronize_session=False))
+        save_changes()
+        return result.rowcount == 1
+
+    def revoke_family(self, family_id):
+        """Delete every token of a login session."""
+        db.session.execute(
+            delete(self.model)
+            .where(self.model.family_id == family_id)
+            .execution_options(synchronize_session=False))
+        save_changes()
+
+    def prune_expired(self, now):
+        """Delete tokens expired before now and return how many."""
+        result = db.session.execute(
+            delete(self.model)
+            .where(self.model.expires_at < now)
+            .execution_options(synchronize_session=False))
+        save_changes()
+        return result.rowcount
@@ -1,5 +1,42 @@
+import base64
+import binascii
 from abc import ABC, abstractmethod
+from datetime import datetime, timezone
 from app import db
+from app.persistence.routing import REPLICA_OPTION
+from app.persistence.unit_of_work import save_changes
+from sqlalchemy import String, func, select, tuple_, type_coerce
+
+
+def encode_cursor(created_at, obj_id):
+    """Build an opaque page cursor from a row's (created_at, id).
+
+    created_at is either a datetime or the timestamp text as stored.
+    """
+    if isinstance(created_at, datetime):
+        if created_at.tzinfo is not None:
+            # Stored timestamps are naive UTC, keep cursors comparable to them
+            created_at = created_at.astimezone(timezone.utc).replace(
+                tzinfo=None)
+        created_at = created_at.isoformat()
+    raw = '{}|{}'.format(created_at, obj_id)
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """Return the (created_at text, id) pair stored in a page cursor.
+
+    Raises:
+        ValueError: If the cursor was not produced by encode_cursor
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        created_at, obj_id = raw.split('|', 1)
+        if not created_at:
+            raise ValueError("Empty timestamp")
+        return created_at, obj_id
+    except (ValueError, UnicodeError, binascii.Error):
+        raise ValueError("Invalid cursor")
 
 
 class Repository(ABC):
@@ -8,11 +45,19 @@ class Repository(ABC):
         pass
 
     @abstractmethod
-    def get(self, obj_id):
+    def add_many(self, objs):
         pass
 
     @abstractmethod
-    def get_all(self):
+    def get(self, obj_id, profile=None):
+        pass
+
+    @abstractmethod
+    def get_all(self, profile=None):
+        pass
+
+    @abstractmethod
+    def get_page(self, limit, cursor=None, profile=None):
         pass
 
     @abstractmethod
@@ -29,34 +74,152 @@ class Repository(ABC):
 
 
 class SQLAlchemyRepository(Repository):
-    def __init__(self, model):
+    # Named eager-loading profiles: profile name -> tuple of loader options.
+    # Endpoints pick the profile matching what they serialize, so related
+    # objects are fetched in a fixed number of queries instead of one
+    # lazy load per row.
+    loader_profiles = {}
+
+    def __init__(self, model, loader_profiles=None):
         self.model = model
+        if loader_profiles is not None:
+            self.loader_profiles = loader_profiles
+
+    def _loader_options(self, profile):
+        if profile is None:
+            return ()
+        try:
+            return self.loader_profiles[profile]
+        except KeyError:
+            raise ValueError("Unknown loader profile for {}: {}".format(
+                self.model.__name__, profile))
+
+    # Writes go through save_changes(): they commit immediately unless a
+    # unit of work (one per API request) is active, in which case they are
+    # only flushed and the request commits once at the end.
 
     def add(self, obj):
         db.session.add(obj)
         db.session.flush()  # Generate ID before commit
-        db.session.commit()
-        # Ensure the object has all database-generated values
-        db.session.refresh(obj)
+        if save_changes():
+            # Ensure the object has all database-generated values
+            db.session.refresh(obj)
+
+    def add_many(self, objs):
+        """Insert several objects in a single transaction.
+
+        The rows are flushed together, which SQLAlchemy sends as batched
+        multi-row INSERTs, and committed once. After a commit the objects
+        are reloaded with one SELECT instead of one refresh per object.
+        """
+        objs = list(objs)
+        if not objs:
+            return objs
+        db.session.add_all(objs)
+        db.session.flush()
+        if save_changes():
+            self.get_by_attribute_values('id', [obj.id for obj in objs])
+        return objs
+
+    def save(self, obj):
+        """Persist changes made directly on an object of this repository."""
+        db.session.add(obj)
+        save_changes()
+
+    # Reads below are served by the read replica when one is configured,
+    # until the session writes and never in requests that write (see
+    # RoutingSession). update() and delete() load the object they change
+    # from the primary.
 
-    def get(self, obj_id):
-        return db.session.get(self.model, obj_id)
+    def _read_query(self):
+        return self.model.query.execution_options(**{REPLICA_OPTION: True})
 
-    def get_all(self):
-        return self.model.query.all()
+    def get(self, obj_id, profile=None):
+        return db.session.get(self.model, obj_id,
+                              options=self._loader_options(profile),
+                              bind_arguments={REPLICA_OPTION: True})
+
+    def get_all(self, profile=None, criteria=()):
+        return (self._read_query()
+                .options(*self._loader_options(profile))
+                .filter(*criteria)
+                .all())
+
+    def get_page(self, limit, cursor=None, profile=None, criteria=()):
+        """Return up to limit objects after cursor and the next cursor.
+
+        Objects are ordered by (created_at, id) and the cursor points at the
+        last object already returned. The row-value comparison on the
+        model's (created_at, id) index makes each page an index range scan,
+        without a sort, no matter how deep the client has paged. criteria
+        are extra filter expressions; the cursor stays valid as long as
+        they do not change (filters on other columns may still sort).
+        """
+        created_at = self.model.created_at
+        if db.engine.dialect.name == 'sqlite':
+            # SQLite keeps timestamps as text in the format of whoever wrote
+            # them ('... 12:00:00' from CURRENT_TIMESTAMP, '... 12:00:00.000000'
+            # from SQLAlchemy) and compares them as text. The cursor carries
+            # the stored text and binds it back as is, otherwise rows sharing
+            # the last row's second would be skipped. type_coerce() only
+            # changes how the value is read, the SQL still uses the index.
+            created_at = type_coerce(created_at, String)
+        query = (self._read_query()
+                 .options(*self._loader_options(profile))
+                 .add_columns(created_at)
+                 .filter(*criteria)
+                 .order_by(self.model.created_at, self.model.id))
+        if cursor:
+            last_created_at, last_id = decode_cursor(cursor)
+            if created_at is self.model.created_at:
+                last_created_at = datetime.fromisoformat(last_created_at)
+            query = query.filter(tuple_(created_at, self.model.id) >
+                                 tuple_(last_created_at, last_id))
+        # Fetch one extra row to know whether another page exists
+        rows = query.limit(limit + 1).all()
+        items = [item for item, _ in rows[:limit]]
+        if len(rows) > limit:
+            last_item, last_created_at = rows[limit - 1]
+            return items, encode_cursor(last_created_at, last_item.id)
+        return items, None
+
+    def get_version(self):
+        """Return (row count, latest updated_at) of the whole table.
+
+        Any insert, update or delete changes this pair, which makes it a
+        cheap validator for list responses. Read from the same bind as
+        the lists it validates.
+        """
+        count, updated_at = db.session.execute(
+            select(func.count(self.model.id),
+                   func.max(self.model.updated_at))
+            .execution_options(**{REPLICA_OPTION: True})).one()
+        return count, updated_at
 
     def update(self, obj_id, data):
-        obj = self.get(obj_id)
+        obj = db.session.get(self.model, obj_id)
         if obj:
             for key, value in data.items():
                 setattr(obj, key, value)
-            db.session.commit()
+            save_changes()
 
     def delete(self, obj_id):
-        obj = self.get(obj_id)
+        obj = db.session.get(self.model, obj_id)
         if obj:
             db.session.delete(obj)
-            db.session.commit()
+            save_changes()
 
     def get_by_attribute(self, attr_name, attr_value):
-        return self.model.query.filter_by(**{attr_name: attr_value}).first()
+        return (self._read_query()
+                .filter_by(**{attr_name: attr_value})
+                .first())
+
+    def get_by_attribute_values(self, attr_name, values, profile=None):
+        """Return every object whose attribute is one of values."""
+        values = list(values)
+        if not values:
+            return []
+        return (self._read_query()
+                .options(*self._loader_options(profile))
+                .filter(getattr(self.model, attr_name).in_(values))
+                .all())
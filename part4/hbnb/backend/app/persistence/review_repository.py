@@ -0,0 +1,45 @@
+from app import db
+from app.models.review import ReviewModel
+from app.models.user import UserModel
+from app.persistence.repository import SQLAlchemyRepository
+from app.persistence.routing import REPLICA_OPTION
+from sqlalchemy import func, select
+from sqlalchemy.orm import joinedload
+
+
+class ReviewRepository(SQLAlchemyRepository):
+    def __init__(self):
+        super().__init__(ReviewModel)
+
+    def get_reviews_by_place(self, place_id):
+        # Uses the reviews.place_id index and loads authors in the same query,
+        # oldest review first
+        return (self._read_query()
+                .filter_by(place_id=place_id)
+                .options(joinedload(self.model.user))
+                .order_by(self.model.created_at, self.model.id)
+                .all())
+
+    def get_place_reviews_version(self, place_id):
+        """Return (count, latest review update, latest author update).
+
+        Author names are part of a place's review list, so their changes
+        must also change the version.
+        """
+        return tuple(db.session.execute(
+            select(func.count(self.model.id),
+                   func.max(self.model.updated_at),
+                   func.max(UserModel.updated_at))
+            .join(UserModel, UserModel.id == self.model.user_id)
+            .where(self.model.place_id == place_id)
+            .execution_options(**{REPLICA_OPTION: True})).one())
+
+    def get_reviewed_place_ids(self, user_id, place_ids):
+        """Return the subset of place_ids the user has already reviewed."""
+        place_ids = list(place_ids)
+        if not place_ids:
+            return set()
+        return set(db.session.scalars(
+            select(self.model.place_id)
+            .where(self.model.user_id == user_id,
+                   self.model.place_id.in_(place_ids))))
@@ -0,0 +1,90 @@
+import os
+
+from flask import request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+
+# Bind key of the optional read replica (SQLALCHEMY_READ_REPLICA_URI)
+REPLICA_BIND = 'replica'
+
+# Statement execution option / bind argument asking for the replica
+REPLICA_OPTION = 'replica'
+
+
+def init_app(app):
+    """Create the read replica engine from SQLALCHEMY_READ_REPLICA_URI.
+
+    Must run after db.init_app(app). The engine is added to the app's
+    engines under REPLICA_BIND but not declared in SQLALCHEMY_BINDS, so
+    no model is bound to it and db.create_all() never touches it: the
+    replica only has to hold a copy of the primary's tables. It uses the
+    same SQLALCHEMY_ENGINE_OPTIONS as the primary, and relative SQLite
+    paths are resolved in the instance folder like the primary's.
+    """
+    uri = app.config.get('SQLALCHEMY_READ_REPLICA_URI')
+    if not uri:
+        return
+    url = make_url(uri)
+    if (url.drivername.startswith('sqlite') and url.database and
+            url.database != ':memory:' and not os.path.isabs(url.database)):
+        os.makedirs(app.instance_path, exist_ok=True)
+        url = url.set(database=os.path.join(app.instance_path, url.database))
+
+    from app import db
+    with app.app_context():
+        db.engines[REPLICA_BIND] = create_engine(
+            url, **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+
+    @app.before_request
+    def _route_request():
+        # Only safe requests read from the replica: a request that writes
+        # must load what it changes (and check uniqueness) on the primary
+        if request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            db.session().stick_to_primary()
+
+
+class RoutingSession(Session):
+    """Session sending marked reads to the read replica.
+
+    SELECTs executed with the 'replica' execution option (or bind
+    argument) go to the replica bind when one is configured. Everything
+    else goes to the primary, and so does every read once the session has
+    written anything: after a flush or a DML statement, the rest of the
+    request reads its own writes from the primary. Sessions of requests
+    other than GET, HEAD and OPTIONS read from the primary from the start.
+    """
+
+    def __init__(self, db, **kwargs):
+        super().__init__(db, **kwargs)
+        self.on_primary = False
+
+    def stick_to_primary(self):
+        """Serve every further read of this session from the primary."""
+        self.on_primary = True
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self.on_primary:
+            if clause is not None and clause.is_dml:
+                self.on_primary = True
+            elif self._wants_replica(clause, kwargs):
+                engine = self._db.engines.get(REPLICA_BIND)
+                if engine is not None:
+                    return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind,
+                                **kwargs)
+
+    @staticmethod
+    def _wants_replica(clause, kwargs):
+        if clause is None or not clause.is_select:
+            return False
+        if getattr(clause, '_for_update_arg', None) is not None:
+            return False
+        # Session.get() passes bind arguments, queries execution options
+        return bool(kwargs.get(REPLICA_OPTION) or
+                    clause.get_execution_options().get(REPLICA_OPTION))
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _stay_on_primary(session, flush_context):
+    session.stick_to_primary()
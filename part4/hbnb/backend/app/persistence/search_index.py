@@ -0,0 +1,241 @@
+import re
+import weakref
+
+from app import db
+from app.models.place import PlaceModel
+from app.models.review import ReviewModel
+from app.persistence.unit_of_work import save_changes
+from sqlalchemy import (DDL, case, column, event, exists, func, insert,
+                        or_, select, table, text)
+
+# SQLite FTS5 table holding one document per place: its title, its
+# description and the text of all its reviews concatenated. place_id is
+# indexed too, so a place's document can be found without a full scan
+# when it has to be replaced; searches only look at the other columns.
+FTS_TABLE = 'places_fts'
+
+# Relative weight of each column in the BM25 score, in table order
+BM25_WEIGHTS = {'place_id': 0.0, 'title': 10.0, 'description': 4.0,
+                'reviews': 1.0}
+
+# Search terms kept from a query, extra terms are ignored
+MAX_TERMS = 8
+
+_TERM = re.compile(r'\w+', re.UNICODE)
+
+_CREATE_FTS = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS {} USING fts5("
+    "place_id, title, description, reviews, "
+    "tokenize='unicode61 remove_diacritics 2')".format(FTS_TABLE))
+
+places_fts = table(FTS_TABLE, *(column(name) for name in BM25_WEIGHTS))
+
+event.listen(PlaceModel.__table__, 'after_create',
+             DDL(_CREATE_FTS).execute_if(dialect='sqlite'))
+event.listen(PlaceModel.__table__, 'before_drop', DDL(
+    'DROP TABLE IF EXISTS {}'.format(FTS_TABLE)
+).execute_if(dialect='sqlite'))
+
+# Engine -> whether its database has the FTS5 table, looked up once and
+# forgotten whenever the places table (and so the index) is created or
+# dropped through SQLAlchemy
+_availability = weakref.WeakKeyDictionary()
+
+
+def _forget_availability(target, connection, **kw):
+    _availability.pop(connection.engine, None)
+
+
+event.listen(PlaceModel.__table__, 'after_create', _forget_availability)
+event.listen(PlaceModel.__table__, 'after_drop', _forget_availability)
+
+
+def search_terms(query):
+    """Return the words of a free-text query, at most MAX_TERMS."""
+    return _TERM.findall(query or '')[:MAX_TERMS]
+
+
+def match_expression(terms):
+    """Build an FTS5 MATCH expression requiring every term.
+
+    Terms are quoted so user input can never be read as FTS5 syntax, and
+    the last one is a prefix so results follow the user while typing.
+    """
+    quoted = ['"{}"'.format(term) for term in terms]
+    quoted[-1] += '*'
+    return '{{title description reviews}} : ({})'.format(' AND '.join(quoted))
+
+
+def _place_id_match(place_id):
+    # Phrase query on the place_id column, served by the FTS index
+    return 'place_id : "{}"'.format(place_id.replace('"', ''))
+
+
+def _in_document(place_id):
+    # WHERE clause selecting the document of one place
+    return text('rowid IN (SELECT rowid FROM {0} WHERE {0} MATCH :match)'
+                .format(FTS_TABLE)).bindparams(match=_place_id_match(place_id))
+
+
+class PlaceSearchIndex:
+    """Full-text index of places, their descriptions and review texts.
+
+    Backed by an FTS5 virtual table on SQLite, created and dropped with
+    the places table. The facade resynchronises a place's document in the
+    same transaction as every write that changes its text, rewriting only
+    the columns that write changed. On other databases, or on a SQLite
+    database created before the index existed and not yet rebuilt,
+    searches fall back to unranked LIKE filters.
+    """
+
+    def available(self):
+        """Return True if the FTS5 table exists in the current database.
+
+        The answer is cached per engine: an index created by another
+        process is only used after a restart.
+        """
+        connection = db.session.connection()
+        if connection.dialect.name != 'sqlite':
+            return False
+        available = _availability.get(connection.engine)
+        if available is None:
+            available = connection.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' "
+                     "AND name = :name"),
+                {'name': FTS_TABLE}).first() is not None
+            _availability[connection.engine] = available
+        return available
+
+    def _fields(self):
+        # Indexed column -> expression computing it for a row of places
+        review_text = (select(func.group_concat(ReviewModel.text, ' '))
+                       .where(ReviewModel.place_id == PlaceModel.id)
+                       .scalar_subquery())
+        return {'title': PlaceModel.title,
+                'description': func.coalesce(PlaceModel.description, ''),
+                'reviews': func.coalesce(review_text, '')}
+
+    def _documents(self):
+        # SELECT producing the indexed document of each place
+        return select(PlaceModel.id, *self._fields().values())
+
+    def _insert(self, documents):
+        db.session.execute(insert(places_fts).from_select(
+            list(BM25_WEIGHTS), documents))
+
+    def _replace(self, place_ids):
+        for place_id in place_ids:
+            db.session.execute(places_fts.delete().where(
+                _in_document(place_id)))
+        self._insert(self._documents().where(PlaceModel.id.in_(place_ids)))
+
+    def sync(self, place_ids, fields=None):
+        """Refresh the documents of the given places from their current text.
+
+        Pending changes are flushed first. fields names the columns to
+        refresh ('title', 'description' and/or 'reviews'), the others are
+        left as indexed; by default the whole document is replaced. Places
+        without a document get a complete one, places that no longer
+        exist are simply removed from the index.
+        """
+        place_ids = list(dict.fromkeys(place_ids))
+        if not place_ids or not self.available():
+            return
+        db.session.flush()
+        if fields is not None:
+            expressions = self._fields()
+            missing = []
+            for place_id in place_ids:
+                values = {name: select(expressions[name])
+                          .where(PlaceModel.id == place_id).scalar_subquery()
+                          for name in fields}
+                result = db.session.execute(places_fts.update()
+                                            .where(_in_document(place_id))
+                                            .values(values))
+                if not result.rowcount:
+                    missing.append(place_id)
+            place_ids = missing
+        if place_ids:
+            self._replace(place_ids)
+        save_changes()
+
+    def add_reviews(self, texts_by_place):
+        """Append the text of new reviews to their places' documents.
+
+        Unlike sync(), the other reviews of the places are not read again.
+
+        Args:
+            texts_by_place (dict): Place id -> texts of its new reviews
+        """
+        if not texts_by_place or not self.available():
+            return
+        db.session.flush()
+        missing = []
+        reviews = places_fts.c.reviews
+        for place_id, texts in texts_by_place.items():
+            added = ' '.join(texts)
+            result = db.session.execute(
+                places_fts.update().where(_in_document(place_id)).values(
+                    reviews=case((reviews == '', added),
+                                 else_=reviews.op('||')(' ' + added))))
+            if not result.rowcount:
+                missing.append(place_id)
+        if missing:
+            self._replace(missing)
+        save_changes()
+
+    def rebuild(self):
+        """Create the index if needed and refill it from every place.
+
+        Returns:
+            int: Number of places indexed, None if FTS5 is not usable
+        """
+        connection = db.session.connection()
+        if connection.dialect.name != 'sqlite':
+            return None
+        db.session.execute(text(_CREATE_FTS))
+        db.session.execute(places_fts.delete())
+        self._insert(self._documents())
+        count = db.session.scalar(
+            select(func.count()).select_from(places_fts))
+        save_changes()
+        _availability.pop(connection.engine, None)
+        return count
+
+    def search(self, query, limit):
+        """Return the ids of the places best matching query, best first.
+
+        Every word of the query must appear in the title, the description
+        or the reviews of a place; the last word may be a prefix.
+
+        Args:
+            query (str): Free text typed by the user
+            limit (int): Maximum number of ids to return
+
+        Returns:
+            list[str]: Place ids ordered by relevance
+        """
+        terms = search_terms(query)
+        if not terms:
+            return []
+        if not self.available():
+            return self._search_like(terms, limit)
+        weights = ', '.join(str(weight) for weight in BM25_WEIGHTS.values())
+        return list(db.session.scalars(
+            text('SELECT place_id FROM {0} WHERE {0} MATCH :match '
+                 'ORDER BY bm25({0}, {1}) LIMIT :limit'
+                 .format(FTS_TABLE, weights)),
+            {'match': match_expression(terms), 'limit': limit}))
+
+    def _search_like(self, terms, limit):
+        # Unranked fallback: every term must appear somewhere, titles first
+        query = select(PlaceModel.id)
+        for term in terms:
+            pattern = '%{}%'.format(term)
+            query = query.where(or_(
+                PlaceModel.title.ilike(pattern),
+                PlaceModel.description.ilike(pattern),
+                exists().where(ReviewModel.place_id == PlaceModel.id,
+                               ReviewModel.text.ilike(pattern))))
+        return list(db.session.scalars(
+            query.order_by(PlaceModel.title).limit(limit)))
@@ -0,0 +1,307 @@
+import random
+import time
+import uuid
+from array import array
+from bisect import bisect
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+
+from sqlalchemy import insert
+
+from app import db
+from app.models.amenity import AmenityModel
+from app.models.place import (PlaceModel, RATING_VALUES, place_amenity,
+                              rating_count_column)
+from app.models.review import ReviewModel
+from app.models.user import UserModel
+
+# Rows sent per executemany() and committed together
+DEFAULT_BATCH_SIZE = 50000
+
+# Timestamps are spread over two years from a fixed date, so the dataset
+# does not depend on the day it is generated
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+PERIOD_SECONDS = 2 * 365 * 24 * 3600
+
+# (name, latitude, longitude, weight, typical price per night)
+CITIES = (
+    ('Paris', 48.8566, 2.3522, 14, 140),
+    ('London', 51.5072, -0.1276, 13, 150),
+    ('New York', 40.7128, -74.0060, 12, 180),
+    ('Tokyo', 35.6762, 139.6503, 10, 120),
+    ('Barcelona', 41.3874, 2.1686, 8, 110),
+    ('Lisbon', 38.7223, -9.1393, 6, 90),
+    ('Rome', 41.9028, 12.4964, 7, 115),
+    ('Berlin', 52.5200, 13.4050, 6, 95),
+    ('Mexico City', 19.4326, -99.1332, 5, 60),
+    ('Cape Town', -33.9249, 18.4241, 3, 75),
+    ('Sydney', -33.8688, 151.2093, 5, 160),
+    ('Marrakesh', 31.6295, -7.9811, 3, 55),
+)
+
+# Standard deviation of coordinates around their city, in degrees (~5 km)
+CLUSTER_SPREAD = 0.05
+
+# Share of users owning places, the others only write reviews
+HOST_SHARE = 0.2
+
+FIRST_NAMES = ('Maria', 'Yuki', 'Amara', 'Liam', 'Sofia', 'Noah', 'Chen',
+               'Fatima', 'Lucas', 'Ines', 'Omar', 'Hana', 'Mateo', 'Zoe',
+               'Ravi', 'Elena', 'Kofi', 'Anna', 'Diego', 'Mei')
+LAST_NAMES = ('Garcia', 'Tanaka', 'Okafor', 'Smith', 'Rossi', 'Muller',
+              'Wang', 'Haddad', 'Silva', 'Dubois', 'Kim', 'Novak',
+              'Hernandez', 'Cohen', 'Patel', 'Ivanova', 'Mensah', 'Berg',
+              'Lopez', 'Sato')
+PLACE_ADJECTIVES = ('Cosy', 'Bright', 'Quiet', 'Historic', 'Modern',
+                    'Sunny', 'Charming', 'Spacious', 'Stylish', 'Rustic')
+PLACE_KINDS = ('studio', 'loft', 'apartment', 'house', 'cabin', 'villa',
+               'room', 'flat', 'cottage', 'townhouse')
+DESCRIPTION_WORDS = ('garden', 'balcony', 'view', 'metro', 'beach', 'park',
+                     'market', 'terrace', 'kitchen', 'family', 'quiet',
+                     'center', 'river', 'museum', 'nightlife', 'pool',
+                     'fireplace', 'rooftop', 'workspace', 'bakery')
+REVIEW_SENTENCES = ('Great location, close to everything.',
+                    'The host was very welcoming.',
+                    'Spotless and exactly like the photos.',
+                    'A bit noisy at night.',
+                    'Comfortable bed and fast wifi.',
+                    'Check-in was easy.',
+                    'Would definitely stay again.',
+                    'The kitchen was well equipped.',
+                    'Smaller than expected but cosy.',
+                    'Lovely neighbourhood with good cafes.')
+AMENITY_NAMES = ('WiFi', 'Kitchen', 'Washer', 'Dryer', 'Air conditioning',
+                 'Heating', 'Dedicated workspace', 'TV', 'Hair dryer',
+                 'Iron', 'Pool', 'Hot tub', 'Free parking', 'EV charger',
+                 'Crib', 'Gym', 'BBQ grill', 'Breakfast', 'Fireplace',
+                 'Smoking allowed', 'Beachfront', 'Waterfront',
+                 'Ski-in/ski-out', 'Elevator', 'Balcony', 'Garden',
+                 'Pets allowed', 'Self check-in', 'Smoke alarm',
+                 'First aid kit')
+
+# Rating values and their relative frequency, skewed to good reviews
+RATING_WEIGHTS = (4, 6, 14, 36, 40)
+
+# Most amenities linked to one place
+MAX_PLACE_AMENITIES = 8
+
+
+class DatasetSeeder:
+    """Deterministic generator of large synthetic datasets.
+
+    Every value (ids included) is drawn from one random.Random(seed), so
+    the same seed and sizes always produce the same rows. Rows are built
+    in batches and written with Core executemany() INSERTs, one
+    transaction per batch, bypassing the ORM unit of work: the derived
+    data the facade maintains on each write is computed here instead
+    (email_normalized, place rating aggregates) or rebuilt once at the
+    end (the full-text search index).
+
+    Users share one bcrypt hash, computed once, of the seeder password,
+    so any generated account can log in as 'user<n>@seed.example.com'.
+    Places are clustered around a few cities with a weighted popularity,
+    and reviews go mostly to popular places, one per user and place and
+    never by the place's owner.
+    """
+
+    def __init__(self, seed=0, password='seed-password',
+                 batch_size=DEFAULT_BATCH_SIZE):
+        """Create a seeder.
+
+        Args:
+            seed (int): Seed of the random generator
+            password (str): Password of every generated user
+            batch_size (int): Rows inserted and committed together
+        """
+        self.rng = random.Random(seed)
+        self.password = password
+        self.batch_size = batch_size
+
+    def _uuid(self):
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def _timestamp(self, after=None):
+        start = after or EPOCH
+        remaining = PERIOD_SECONDS - (start - EPOCH).total_seconds()
+        return start + timedelta(
+            seconds=self.rng.uniform(0, max(remaining, 0)))
+
+    def _insert(self, table, rows):
+        if rows:
+            db.session.execute(insert(table), rows)
+            db.session.commit()
+
+    def _insert_batches(self, table, make_row, count):
+        """Insert make_row(index) for index in range(count), in batches."""
+        for start in range(0, count, self.batch_size):
+            self._insert(table, [make_row(index) for index in
+                                 range(start, min(count, start +
+                                                  self.batch_size))])
+
+    def seed_users(self, count):
+        """Insert users; return their ids and creation times."""
+        password_hash = UserModel.make_password_hash(self.password)
+        ids = []
+        created = []
+
+        def make_row(index):
+            user_id = self._uuid()
+            created_at = self._timestamp()
+            ids.append(user_id)
+            created.append(created_at)
+            email = 'user{}@seed.example.com'.format(index)
+            return {'id': user_id,
+                    'first_name': self.rng.choice(FIRST_NAMES),
+                    'last_name': self.rng.choice(LAST_NAMES),
+                    'email': email, 'email_normalized': email,
+                    'password': password_hash, 'is_admin': index == 0,
+                    'created_at': created_at, 'updated_at': created_at}
+
+        self._insert_batches(UserModel.__table__, make_row, count)
+        return ids, created
+
+    def seed_amenities(self, count):
+        """Insert amenities; return their ids."""
+        names = [AMENITY_NAMES[index] if index < len(AMENITY_NAMES)
+                 else 'Amenity {}'.format(index) for index in range(count)]
+        rows = [{'id': self._uuid(), 'name': name, 'created_at': EPOCH,
+                 'updated_at': EPOCH} for name in names]
+        self._insert(AmenityModel.__table__, rows)
+        return [row['id'] for row in rows]
+
+    def plan_reviews(self, count, place_owners, user_count):
+        """Choose the place, author and rating of every review.
+
+        Returns:
+            tuple: (place indexes, user indexes, ratings) arrays
+        """
+        place_count = len(place_owners)
+        cum_weights = list(accumulate(self.rng.paretovariate(1.5)
+                                      for _ in range(place_count)))
+        total = cum_weights[-1] if cum_weights else 0
+        places = array('l')
+        users = array('l')
+        ratings = array('b')
+        taken = set()
+        rating_cum_weights = list(accumulate(RATING_WEIGHTS))
+        rating_total = rating_cum_weights[-1]
+        # Stop when most (user, place) pairs are taken instead of spinning
+        attempts = 20 * count
+        while len(places) < count and attempts:
+            attempts -= 1
+            # Same draw as choices(cum_weights=...), without its overhead
+            place = min(bisect(cum_weights, self.rng.random() * total),
+                        place_count - 1)
+            user = self.rng.randrange(user_count)
+            pair = user * place_count + place
+            if user == place_owners[place] or pair in taken:
+                continue
+            taken.add(pair)
+            places.append(place)
+            users.append(user)
+            ratings.append(RATING_VALUES[bisect(
+                rating_cum_weights, self.rng.random() * rating_total)])
+        return places, users, ratings
+
+    def seed(self, users, places, reviews, amenities=len(AMENITY_NAMES)):
+        """Generate and insert a whole dataset into empty tables.
+
+        Args:
+            users (int): Number of users, at least 2 if there are reviews
+            places (int): Number of places
+            reviews (int): Number of reviews; fewer are inserted when
+                there are not enough (user, place) pairs
+            amenities (int): Number of amenities
+
+        Returns:
+            dict: Rows inserted per table and the elapsed seconds
+        """
+        started = time.perf_counter()
+        user_ids, user_created = self.seed_users(users)
+        amenity_ids = self.seed_amenities(amenities)
+
+        host_count = max(1, int(users * HOST_SHARE))
+        place_owners = array('l', (self.rng.randrange(host_count)
+                                   for _ in range(places)))
+        review_places, review_users, review_ratings = self.plan_reviews(
+            reviews if users > 1 and places else 0, place_owners, users)
+
+        # Rating aggregates of each place, from the planned reviews
+        star_counts = {stars: array('l', bytes(8 * places))
+                       for stars in RATING_VALUES}
+        for place, rating in zip(review_places, review_ratings):
+            star_counts[rating][place] += 1
+
+        place_ids = []
+        place_created = []
+        city_cum_weights = list(accumulate(city[3] for city in CITIES))
+        links = []
+        link_count = 0
+
+        def make_place(index):
+            name, latitude, longitude, _, base_price = CITIES[bisect(
+                city_cum_weights, self.rng.random() * city_cum_weights[-1])]
+            place_id = self._uuid()
+            created_at = self._timestamp(user_created[place_owners[index]])
+            place_ids.append(place_id)
+            place_created.append(created_at)
+            counts = {stars: star_counts[stars][index]
+                      for stars in RATING_VALUES}
+            review_count = sum(counts.values())
+            rating_sum = sum(stars * count for stars, count in counts.items())
+            for amenity_id in self.rng.sample(
+                    amenity_ids, self.rng.randint(
+                        0, min(MAX_PLACE_AMENITIES, len(amenity_ids)))):
+                links.append({'place_id': place_id,
+                              'amenity_id': amenity_id})
+            row = {
+                'id': place_id,
+                'owner_id': user_ids[place_owners[index]],
+                'title': '{} {} in {} #{}'.format(
+                    self.rng.choice(PLACE_ADJECTIVES),
+                    self.rng.choice(PLACE_KINDS), name, index)[:50],
+                'description': ' '.join(self.rng.choices(DESCRIPTION_WORDS,
+                                                         k=12)),
+                'price': round(base_price *
+                               self.rng.lognormvariate(0, 0.4), 2),
+                'latitude': max(-90.0, min(90.0, self.rng.gauss(
+                    latitude, CLUSTER_SPREAD))),
+                'longitude': max(-180.0, min(180.0, self.rng.gauss(
+                    longitude, CLUSTER_SPREAD))),
+                'review_count': review_count,
+                'rating_sum': rating_sum,
+                'rating_avg': (rating_sum / review_count
+                               if review_count else None),
+                'created_at': created_at, 'updated_at': created_at
+            }
+            for stars, count in counts.items():
+                row[rating_count_column(stars)] = count
+            return row
+
+        for start in range(0, places, self.batch_size):
+            self._insert(PlaceModel.__table__, [
+                make_place(index) for index in
+                range(start, min(places, start + self.batch_size))])
+            self._insert(place_amenity, links)
+            link_count += len(links)
+            links.clear()
+
+        def make_review(index):
+            place = review_places[index]
+            created_at = self._timestamp(place_created[place])
+            return {'id': self._uuid(),
+                    'text': ' '.join(self.rng.sample(REVIEW_SENTENCES, 2)),
+                    'rating': review_ratings[index],
+                    'place_id': place_ids[place],
+                    'user_id': user_ids[review_users[index]],
+                    'created_at': created_at, 'updated_at': created_at}
+
+        self._insert_batches(ReviewModel.__table__, make_review,
+                             len(review_places))
+
+        from app.services import get_facade
+        get_facade().rebuild_search_index()
+        db.session.commit()
+        return {'users': users, 'amenities': amenities, 'places': places,
+                'place_amenities': link_count, 'reviews': len(review_places),
+                'seconds': time.perf_counter() - started}
@@ -0,0 +1,43 @@
+from app import db
+from sqlalchemy import event
+
+
+def apply_pragmas(dbapi_connection, pragmas):
+    """Run PRAGMA statements on a raw SQLite connection, in order."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute('PRAGMA {} = {}'.format(name, value))
+    finally:
+        cursor.close()
+
+
+def register_pragmas(engine, pragmas):
+    """Apply pragmas to every new connection of a SQLite engine.
+
+    Most pragmas (synchronous, busy_timeout, cache_size, mmap_size,
+    foreign_keys) only last for the connection that ran them, so they are
+    set each time the pool opens a connection. journal_mode=WAL is stored
+    in the database file by the first connection that sets it.
+    Engines of other databases are left untouched.
+    """
+    if not pragmas or engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        apply_pragmas(dbapi_connection, pragmas)
+
+
+def init_app(app):
+    """Register SQLITE_PRAGMAS on every engine of the application.
+
+    Must run after db.init_app(app), which creates the engines, and
+    before the first connection is opened.
+    """
+    pragmas = app.config.get('SQLITE_PRAGMAS')
+    if not pragmas:
+        return
+    with app.app_context():
+        for engine in db.engines.values():
+            register_pragmas(engine, pragmas)
@@ -0,0 +1,142 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from app import db
+from flask import g
+
+# Unit of work of the running request or unit_of_work() block, if any
+_current = ContextVar('unit_of_work', default=None)
+
+
+class UnitOfWork:
+    """Groups every repository write of a request into one transaction.
+
+    While a unit of work is active, repositories only flush their changes
+    (so ids, defaults and constraint errors are available immediately)
+    and the owner of the unit of work commits once at the end. Without
+    one, repositories keep committing each operation themselves, which is
+    what standalone scripts get by default.
+    """
+
+    def __init__(self):
+        self._after_commit = []
+        self.commit_on_error = False
+
+    def after_commit(self, callback):
+        """Run callback once the transaction has been committed."""
+        self._after_commit.append(callback)
+
+    def commit(self):
+        db.session.commit()
+        callbacks, self._after_commit = self._after_commit, []
+        for callback in callbacks:
+            callback()
+
+    def rollback(self):
+        self._after_commit = []
+        db.session.rollback()
+
+
+def current():
+    """Return the active unit of work, or None in autocommit mode."""
+    return _current.get()
+
+
+def save_changes():
+    """Make pending changes durable, or stage them in a unit of work.
+
+    Returns:
+        bool: True if the changes were committed
+    """
+    if _current.get() is None:
+        db.session.commit()
+        return True
+    db.session.flush()
+    return False
+
+
+def after_commit(callback):
+    """Run callback after the current transaction commits.
+
+    Side effects that other requests can observe, such as cache
+    invalidation, must not happen before the data they depend on is
+    committed. In autocommit mode callback runs immediately.
+    """
+    unit = _current.get()
+    if unit is None:
+        callback()
+    else:
+        unit.after_commit(callback)
+
+
+def commit_on_error():
+    """Keep the current request's writes even if it answers an error.
+
+    For writes that are the point of the error response, such as revoking
+    a replayed refresh token before answering 401. Has no effect outside
+    a unit of work, where writes are committed immediately anyway.
+    """
+    unit = _current.get()
+    if unit is not None:
+        unit.commit_on_error = True
+
+
+@contextmanager
+def unit_of_work():
+    """Run a block as one transaction, committed on success.
+
+    Lets scripts batch many repository writes into a single commit:
+
+        with unit_of_work():
+            for data in rows:
+                facade.create_place(data)
+    """
+    if _current.get() is not None:
+        # Already inside a unit of work, its owner commits
+        yield _current.get()
+        return
+    unit = UnitOfWork()
+    token = _current.set(unit)
+    try:
+        yield unit
+    except BaseException:
+        unit.rollback()
+        raise
+    else:
+        unit.commit()
+    finally:
+        _current.reset(token)
+
+
+def init_app(app):
+    """Wrap every request in a unit of work when UNIT_OF_WORK is enabled.
+
+    The request commits once if it ends with a status below 400 and rolls
+    back otherwise, including when the view raised.
+    """
+    if not app.config.get('UNIT_OF_WORK', True):
+        return
+
+    @app.before_request
+    def begin_unit_of_work():
+        g.unit_of_work_token = _current.set(UnitOfWork())
+
+    @app.after_request
+    def end_unit_of_work(response):
+        unit = _current.get()
+        if unit is not None:
+            if response.status_code < 400 or unit.commit_on_error:
+                unit.commit()
+            else:
+                unit.rollback()
+        return response
+
+    @app.teardown_request
+    def discard_unit_of_work(exc):
+        token = g.pop('unit_of_work_token', None)
+        if token is None:
+            return
+        unit = _current.get()
+        if exc is not None and unit is not None:
+            unit.rollback()
+        _current.reset(token)
@@ -1,6 +1,8 @@
-from app.models.user import UserModel
+from app.models.user import UserModel, normalize_email
 from app import db
 from app.persistence.repository import SQLAlchemyRepository
+from app.persistence.unit_of_work import save_changes
+from sqlalchemy import bindparam, inspect, select, text, update
 
 
 class UserRepository(SQLAlchemyRepository):
@@ -8,4 +10,54 @@ class UserRepository(SQLAlchemyRepository):
         super().__init__(UserModel)
 
     def get_user_by_email(self, email):
-        return self.model.query.filter_by(email=email).first()
+        # Served by the unique index on email_normalized
+        return self.model.query.filter_by(
+            email_normalized=normalize_email(email)).first()
+
+    def backfill_normalized_emails(self):
+        """Add and fill email_normalized on databases created before it.
+
+        Adds the column if missing, sets it on every row from email and
+        creates its unique index. If several users share a normalized
+        email the index cannot be created: their rows are still filled and
+        the conflicts are returned so they can be merged by hand.
+
+        Returns:
+            tuple: (number of rows updated, {normalized email: [user ids]}
+                for every conflict)
+        """
+        table = self.model.__table__
+        column = table.c.email_normalized
+        existing = {col['name'] for col in
+                    inspect(db.session.connection()).get_columns(table.name)}
+        if column.name not in existing:
+            # Added as nullable: most databases (SQLite included) cannot
+            # add a NOT NULL column without a default to a filled table
+            db.session.execute(text('ALTER TABLE {} ADD COLUMN {} {}'.format(
+                table.name, column.name,
+                column.type.compile(dialect=db.engine.dialect))))
+
+        rows = db.session.execute(
+            select(table.c.id, table.c.email, column)).all()
+        changes = []
+        owners = {}
+        for user_id, email, current in rows:
+            normalized = normalize_email(email)
+            owners.setdefault(normalized, []).append(user_id)
+            if current != normalized:
+                changes.append({'user_id': user_id, 'value': normalized})
+        if changes:
+            db.session.execute(
+                update(table)
+                .where(table.c.id == bindparam('user_id'))
+                .values({column.name: bindparam('value')}),
+                changes)
+
+        conflicts = {email: ids for email, ids in owners.items()
+                     if len(ids) > 1}
+        if not conflicts:
+            for index in table.indexes:
+                if list(index.columns) == [column]:
+                    index.create(db.session.connection(), checkfirst=True)
+        save_changes()
+        return len(changes), conflicts
@@ -1,3 +1,44 @@
-from app.services.facade import HBnBFacade
+import threading
 
-facade = HBnBFacade()
+# The facade singleton is built by get_facade() on first use, so lean
+# scripts (create_app(http=False)) only import the services they call.
+# create_app() calls init_app() before it exists; the configuration is
+# then applied when it is built. "from app.services import facade" also
+# builds it, for the API namespaces, which always need it.
+_lock = threading.Lock()
+_facade = None
+_pending_app = None
+
+
+def init_app(app):
+    """Configure the facade for app, now or when it is first used."""
+    global _pending_app
+    with _lock:
+        built = _facade
+        if built is None:
+            _pending_app = app
+    if built is not None:
+        built.init_app(app)
+
+
+def get_facade():
+    """Return the facade singleton, building it on first call."""
+    global _facade, _pending_app
+    with _lock:
+        if _facade is None:
+            from app.services.facade import HBnBFacade
+            _facade = HBnBFacade()
+            if _pending_app is not None:
+                _facade.init_app(_pending_app)
+                _pending_app = None
+        # Importing the app.services.facade module binds its name on this
+        # package: rebind it to the singleton, as later lookups expect
+        globals()['facade'] = _facade
+        return _facade
+
+
+def __getattr__(name):
+    if name != 'facade':
+        raise AttributeError('module {!r} has no attribute {!r}'.format(
+            __name__, name))
+    return get_facade()
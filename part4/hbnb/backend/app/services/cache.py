@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""In-process LRU cache module.
+
+This module defines a small thread-safe LRU cache used to keep serialized
+API payloads between requests. Entries are invalidated explicitly by the
+facade whenever the data they were built from changes.
+"""
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Size-bounded, thread-safe LRU cache with versioned writes.
+
+    Readers take a version token with version() before loading data from
+    the database and pass it back to set(). If the key was invalidated in
+    the meantime the write is dropped, so a slow reader can never put a
+    payload built from stale data back into the cache.
+
+    Attributes:
+        maxsize (int): Maximum number of entries kept
+        hits (int): Number of get() calls that found an entry
+        misses (int): Number of get() calls that found nothing
+        evictions (int): Entries dropped because the cache was full
+        invalidations (int): Number of invalidate() calls
+    """
+
+    def __init__(self, maxsize=1024):
+        """Create an empty cache.
+
+        Args:
+            maxsize (int): Maximum number of entries, 0 disables caching
+        """
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def version(self, key):
+        """Return the version token to pass to set() for this key."""
+        with self._lock:
+            return self._epoch, self._generations.get(key, 0)
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, version):
+        """Store value unless key was invalidated since version was taken.
+
+        Args:
+            key: Cache key
+            value: Value to store (must not be mutated afterwards)
+            version (tuple): Token returned by version() before loading
+
+        Returns:
+            bool: True if the value was stored
+        """
+        with self._lock:
+            current = (self._epoch, self._generations.get(key, 0))
+            if version != current or self.maxsize <= 0:
+                return False
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return True
+
+    def invalidate(self, key):
+        """Drop key and reject pending set() calls made with older tokens."""
+        with self._lock:
+            self._entries.pop(key, None)
+            self._generations[key] = self._generations.get(key, 0) + 1
+            self.invalidations += 1
+            # Keep the generation table bounded: starting a new epoch
+            # invalidates every outstanding token at once
+            if len(self._generations) > 4 * max(self.maxsize, 1):
+                self._generations.clear()
+                self._epoch += 1
+
+    def clear(self):
+        """Drop every entry and invalidate all outstanding tokens."""
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+            self._epoch += 1
+
+    def resize(self, maxsize):
+        """Change the maximum size, evicting least recently used entries."""
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._entries) > max(maxsize, 0):
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        """Return a snapshot of the cache counters.
+
+        Returns:
+            dict: size, maxsize, hits, misses, evictions and invalidations
+        """
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
@@ -8,12 +8,26 @@ all business logic and coordinates operations between different components.
 The facade acts as a single point of entry for all business operations,
 hiding the complexity of model interactions and repository management.
 """
+import uuid
+from datetime import datetime, timezone
+
 from app.models.amenity import AmenityModel
 from app.models.place import PlaceModel
+from app.models.refresh_token import RefreshTokenModel
 from app.models.review import ReviewModel
 from app.models.user import UserModel
+from app.persistence.place_repository import PlaceRepository
+from app.persistence.refresh_token_repository import RefreshTokenRepository
 from app.persistence.repository import SQLAlchemyRepository
+from app.persistence.review_repository import ReviewRepository
+from app.persistence.search_index import PlaceSearchIndex
+from app.persistence.unit_of_work import after_commit, commit_on_error
 from app.persistence.user_repository import UserRepository
+from app.services.cache import LRUCache
+from app.services.password_pool import PasswordPool
+
+# Fields of a user that are embedded in place detail payloads
+PLACE_OWNER_FIELDS = ('first_name', 'last_name', 'email')
 
 
 class HBnBFacade:
@@ -29,19 +43,59 @@ class HBnBFacade:
     Attributes:
         user_repo (UserRepository): Repository for user data operations
         amenity_repo (SQLAlchemyRepository): Repository for amenity operations
-        review_repo (SQLAlchemyRepository): Repository for review operations
-        place_repo (SQLAlchemyRepository): Repository for place operations
+        review_repo (ReviewRepository): Repository for review operations
+        place_repo (PlaceRepository): Repository for place operations
+        refresh_token_repo (RefreshTokenRepository): Issued refresh tokens
+        search_index (PlaceSearchIndex): Full-text index of places
+        place_cache (LRUCache): Serialized place detail payloads by place id
+        password_pool (PasswordPool): Worker pool running bcrypt
     """
     def __init__(self):
         """Initialize the facade with all necessary repositories.
         
         Creates repository instances for each model type.
-        UserRepository has custom methods, others use generic SQLAlchemy repo.
+        User, place and review repositories have custom methods,
+        others use generic SQLAlchemy repo.
         """
         self.user_repo = UserRepository()
         self.amenity_repo = SQLAlchemyRepository(AmenityModel)
-        self.review_repo = SQLAlchemyRepository(ReviewModel)
-        self.place_repo = SQLAlchemyRepository(PlaceModel)
+        self.review_repo = ReviewRepository()
+        self.place_repo = PlaceRepository()
+        self.refresh_token_repo = RefreshTokenRepository()
+        self.search_index = PlaceSearchIndex()
+        self.place_cache = LRUCache()
+        self.password_pool = PasswordPool()
+
+    def init_app(self, app):
+        """Configure the facade for an application instance.
+        
+        Sizes the place detail cache from PLACE_CACHE_SIZE and empties it,
+        so payloads cached for another app (and database) are never served.
+        Sizes the password pool from PASSWORD_POOL_WORKERS and
+        PASSWORD_POOL_MAX_QUEUE.
+        
+        Args:
+            app (Flask): Application being created
+        """
+        self.place_cache.resize(app.config.get('PLACE_CACHE_SIZE', 1024))
+        self.place_cache.clear()
+        self.password_pool.configure(
+            app.config.get('PASSWORD_POOL_WORKERS', 4),
+            app.config.get('PASSWORD_POOL_MAX_QUEUE', 32),
+            app.config.get('PASSWORD_POOL_RETRY_AFTER', 1))
+
+    def invalidate_place(self, place_id):
+        """Drop the cached detail payload of a place.
+        
+        Must be called by every write that changes data embedded in
+        GET /api/v1/places/<id>. Inside a unit of work the entry is only
+        dropped once the write is committed, so a concurrent reader cannot
+        cache the data it is about to replace.
+        
+        Args:
+            place_id (str): UUID of the place whose payload is stale
+        """
+        after_commit(lambda: self.place_cache.invalidate(place_id))
 
     # ==================== USER BUSINESS LOGIC ====================
 
@@ -58,15 +112,54 @@ class HBnBFacade:
                 
         Returns:
             UserModel: The created user instance
+            
+        Raises:
+            PasswordPoolBusy: If the password pool is saturated
         """
         # Create user instance from provided data
         user = UserModel(**user_data)
         # Hash password before storing (never store plain text passwords)
-        user.hash_password(user_data['password'])
+        user.password = self.hash_password(user_data['password'])
         # Persist to database
         self.user_repo.add(user)
         return user
 
+    def hash_password(self, password):
+        """Hash a password on the password pool.
+        
+        Args:
+            password (str): Plain text password
+            
+        Returns:
+            str: bcrypt hash to store on the user
+            
+        Raises:
+            PasswordPoolBusy: If the password pool is saturated
+        """
+        return self.password_pool.run(UserModel.make_password_hash, password)
+
+    def authenticate_user(self, email, password):
+        """Check login credentials, verifying the password on the pool.
+        
+        Args:
+            email (str): Email address of the account
+            password (str): Plain text password to verify
+            
+        Returns:
+            UserModel: The user if the credentials match, None otherwise
+            
+        Raises:
+            PasswordPoolBusy: If the password pool is saturated
+        """
+        user = self.get_user_by_email(email)
+        if not user:
+            return None
+        # Read the hash on this thread, the worker never touches the model
+        if not self.password_pool.run(UserModel.check_password_hash,
+                                      user.password, password):
+            return None
+        return user
+
     def get_user(self, user_id):
         """Retrieve a user by their unique ID.
         
@@ -91,6 +184,15 @@ class HBnBFacade:
         """
         return self.user_repo.get_user_by_email(email)
 
+    def backfill_normalized_emails(self):
+        """Fill the normalized email column of existing users.
+        
+        Returns:
+            tuple: (rows updated, {normalized email: [user ids]} for emails
+                shared by several users)
+        """
+        return self.user_repo.backfill_normalized_emails()
+
     def get_all_users(self):
         """Retrieve all users in the system.
         
@@ -99,6 +201,29 @@ class HBnBFacade:
         """
         return self.user_repo.get_all()
 
+    def get_users_page(self, limit, cursor=None):
+        """Retrieve one page of users in creation order.
+        
+        Args:
+            limit (int): Maximum number of users to return
+            cursor (str, optional): Cursor returned with the previous page
+            
+        Returns:
+            tuple: (list[UserModel], next cursor or None)
+            
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        return self.user_repo.get_page(limit, cursor)
+
+    def get_users_version(self):
+        """Return a cheap version of the users collection.
+        
+        Returns:
+            tuple: (number of users, latest updated_at)
+        """
+        return self.user_repo.get_version()
+
     def update_user(self, user_id, user_data):
         """Update an existing user's information.
         
@@ -111,9 +236,76 @@ class HBnBFacade:
         """
         # Update user data in repository
         self.user_repo.update(user_id, user_data)
+        # Owner details are embedded in the payload of each of their places
+        if any(field in user_data for field in PLACE_OWNER_FIELDS):
+            for place_id in self.place_repo.get_place_ids_by_owner(user_id):
+                self.invalidate_place(place_id)
         # Fetch and return updated user
         return self.user_repo.get(user_id)
 
+    # ================= REFRESH TOKEN BUSINESS LOGIC =================
+
+    def create_refresh_token(self, user_id, lifetime, family_id=None):
+        """Record a new refresh token for a user.
+        
+        Args:
+            user_id (str): UUID of the token owner
+            lifetime (timedelta): Time until the token expires
+            family_id (str, optional): Login session of the token; a new
+                session is started when omitted
+            
+        Returns:
+            RefreshTokenModel: The recorded token, whose jti and
+                expires_at must be embedded in the JWT
+        """
+        jti = str(uuid.uuid4())
+        token = RefreshTokenModel(
+            jti=jti, family_id=family_id or jti, user_id=user_id,
+            expires_at=datetime.now(timezone.utc) + lifetime, used=False)
+        self.refresh_token_repo.add(token)
+        return token
+
+    def rotate_refresh_token(self, jti, lifetime):
+        """Exchange a refresh token for a new one of the same session.
+        
+        Costs one primary key lookup (joined with the owner's admin flag)
+        and no password check. A token can only be rotated once; presenting
+        it again means it was copied, so its whole session is revoked.
+        
+        Args:
+            jti (str): jti claim of the presented refresh token
+            lifetime (timedelta): Lifetime of the new token
+            
+        Returns:
+            tuple: (new RefreshTokenModel, owner is_admin), or None if the
+                token is unknown, expired, or was already used
+        """
+        row = self.refresh_token_repo.get_with_admin_flag(jti)
+        if row is None:
+            return None
+        token, is_admin = row
+        expires_at = token.expires_at.replace(tzinfo=timezone.utc)
+        if expires_at <= datetime.now(timezone.utc):
+            return None
+        if token.used or not self.refresh_token_repo.mark_used(jti):
+            # Replayed token: keep the revocation although the caller is
+            # going to answer with an error
+            self.refresh_token_repo.revoke_family(token.family_id)
+            commit_on_error()
+            return None
+        new_token = self.create_refresh_token(token.user_id, lifetime,
+                                              token.family_id)
+        return new_token, is_admin
+
+    def prune_refresh_tokens(self):
+        """Delete expired refresh tokens.
+        
+        Returns:
+            int: Number of tokens deleted
+        """
+        return self.refresh_token_repo.prune_expired(
+            datetime.now(timezone.utc))
+
     # ==================== AMENITY BUSINESS LOGIC ====================
 
     def create_amenity(self, amenity_data):
@@ -130,6 +322,18 @@ class HBnBFacade:
         self.amenity_repo.add(amenity)
         return amenity
 
+    def create_amenities(self, amenities_data):
+        """Create several amenities in a single transaction.
+        
+        Args:
+            amenities_data (list[dict]): Validated amenity payloads
+            
+        Returns:
+            list[AmenityModel]: The created amenities, in input order
+        """
+        amenities = [AmenityModel(**data) for data in amenities_data]
+        return self.amenity_repo.add_many(amenities)
+
     def get_amenity(self, amenity_id):
         """Retrieve an amenity by its unique ID.
         
@@ -152,6 +356,17 @@ class HBnBFacade:
         """
         return self.amenity_repo.get_by_attribute('name', amenity_name)
 
+    def get_amenities_by_names(self, names):
+        """Retrieve the amenities whose name is in names, in one query.
+        
+        Args:
+            names (iterable[str]): Amenity names to look up
+            
+        Returns:
+            list[AmenityModel]: Matching amenities
+        """
+        return self.amenity_repo.get_by_attribute_values('name', names)
+
     def get_all_amenities(self):
         """Retrieve all amenities in the system.
         
@@ -160,6 +375,29 @@ class HBnBFacade:
         """
         return self.amenity_repo.get_all()
 
+    def get_amenities_page(self, limit, cursor=None):
+        """Retrieve one page of amenities in creation order.
+        
+        Args:
+            limit (int): Maximum number of amenities to return
+            cursor (str, optional): Cursor returned with the previous page
+            
+        Returns:
+            tuple: (list[AmenityModel], next cursor or None)
+            
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        return self.amenity_repo.get_page(limit, cursor)
+
+    def get_amenities_version(self):
+        """Return a cheap version of the amenities collection.
+        
+        Returns:
+            tuple: (number of amenities, latest updated_at)
+        """
+        return self.amenity_repo.get_version()
+
     def update_amenity(self, amenity_id, amenity_data):
         """Update an existing amenity.
         
@@ -176,6 +414,10 @@ class HBnBFacade:
         # Update amenity data and save changes
         amenity.update(amenity_data)
         amenity.save()
+        self.amenity_repo.save(amenity)
+        # Amenity names are embedded in the payload of every place using it
+        for place_id in self.place_repo.get_place_ids_by_amenity(amenity_id):
+            self.invalidate_place(place_id)
         return amenity
 
     # ==================== PLACE BUSINESS LOGIC ====================
@@ -213,18 +455,43 @@ class HBnBFacade:
         # Create and persist place
         place = PlaceModel(**place_data)
         self.place_repo.add(place)
+        self.search_index.sync([place.id])
         return place
 
-    def get_place(self, place_id):
+    def create_places(self, places_data, owner_id):
+        """Create several places for one owner in a single transaction.
+        
+        Args:
+            places_data (list[dict]): Validated place payloads, without
+                owner information
+            owner_id (str): UUID of the owner of every place
+            
+        Returns:
+            list[PlaceModel]: The created places, in input order
+            
+        Raises:
+            ValueError: If owner_id does not match any existing user
+        """
+        owner = self.get_user(owner_id)
+        if not owner:
+            raise ValueError("Owner with id {} not found".format(owner_id))
+        places = [PlaceModel(**data, owner=owner) for data in places_data]
+        self.place_repo.add_many(places)
+        self.search_index.sync(place.id for place in places)
+        return places
+
+    def get_place(self, place_id, profile=None):
         """Retrieve a place by its unique ID.
         
         Args:
             place_id (str): UUID of the place to retrieve
+            profile (str, optional): Loader profile ('card', 'list' or
+                'detail') deciding which relationships are eager-loaded
             
         Returns:
             PlaceModel: Place instance if found, None otherwise
         """
-        return self.place_repo.get(place_id)
+        return self.place_repo.get(place_id, profile)
 
     def get_place_by_title(self, title):
         """Retrieve a place by its title.
@@ -237,13 +504,143 @@ class HBnBFacade:
         """
         return self.place_repo.get_by_attribute('title', title)
 
-    def get_all_places(self):
+    def get_places_by_titles(self, titles):
+        """Retrieve the places whose title is in titles, in one query.
+        
+        Args:
+            titles (iterable[str]): Place titles to look up
+            
+        Returns:
+            list[PlaceModel]: Matching places
+        """
+        return self.place_repo.get_by_attribute_values('title', titles)
+
+    def get_places_by_ids(self, place_ids):
+        """Retrieve several places by id in one query.
+        
+        Args:
+            place_ids (iterable[str]): UUIDs of the places
+            
+        Returns:
+            dict: Place instances keyed by id, missing ids are left out
+        """
+        return {place.id: place for place in
+                self.place_repo.get_by_attribute_values('id', place_ids)}
+
+    def get_all_places(self, profile=None, filters=None):
         """Retrieve all places in the system.
         
+        Args:
+            profile (str, optional): Loader profile to eager-load with
+            filters (dict, optional): min_price, max_price, min_rating
+                and/or amenity_ids (all required) applied in the query
+            
+        Returns:
+            list[PlaceModel]: List of all matching place instances
+        """
+        return self.place_repo.get_all(
+            profile, self.place_repo.filter_criteria(**(filters or {})))
+
+    def get_places_page(self, limit, cursor=None, profile=None, filters=None):
+        """Retrieve one page of places in creation order.
+        
+        Args:
+            limit (int): Maximum number of places to return
+            cursor (str, optional): Cursor returned with the previous page
+            profile (str, optional): Loader profile to eager-load with
+            filters (dict, optional): min_price, max_price, min_rating
+                and/or amenity_ids (all required) applied in the query
+            
+        Returns:
+            tuple: (list[PlaceModel], next cursor or None)
+            
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        return self.place_repo.get_page(
+            limit, cursor, profile,
+            self.place_repo.filter_criteria(**(filters or {})))
+
+    def get_place_amenity_facets(self, filters=None):
+        """Count matching places per amenity.
+        
+        Args:
+            filters (dict, optional): Place list filters (min_price,
+                max_price, min_rating, amenity_ids)
+            
+        Returns:
+            tuple: (number of matching places, list of (amenity id, name,
+                place count) by decreasing count)
+        """
+        return self.place_repo.get_amenity_facets(
+            self.place_repo.filter_criteria(**(filters or {})))
+
+    def get_places_version(self):
+        """Return a cheap version of the places collection.
+        
+        Returns:
+            tuple: (number of places, latest updated_at)
+        """
+        return self.place_repo.get_version()
+
+    def get_places_nearby(self, latitude, longitude, radius_km, limit):
+        """Retrieve places within a radius of a point, nearest first.
+        
+        Args:
+            latitude (float): Latitude of the search center
+            longitude (float): Longitude of the search center
+            radius_km (float): Search radius in kilometers
+            limit (int): Maximum number of places to return
+            
+        Returns:
+            list[tuple[PlaceModel, float]]: Places with their distance in km
+        """
+        return self.place_repo.get_places_nearby(latitude, longitude,
+                                                 radius_km, limit)
+
+    def search_places(self, query, limit):
+        """Full-text search over place titles, descriptions and reviews.
+        
+        Args:
+            query (str): Free text, every word must match
+            limit (int): Maximum number of places to return
+            
+        Returns:
+            list[PlaceModel]: Matching places loaded with the 'card'
+                profile, most relevant first
+        """
+        place_ids = self.search_index.search(query, limit)
+        places = {place.id: place for place in
+                  self.place_repo.get_by_attribute_values(
+                      'id', place_ids, profile='card')}
+        return [places[place_id] for place_id in place_ids
+                if place_id in places]
+
+    def rebuild_search_index(self):
+        """Create the full-text index if needed and refill it.
+        
+        Returns:
+            int: Number of places indexed, None if the database has no
+                full-text support
+        """
+        return self.search_index.rebuild()
+
+    def get_places_in_bbox(self, min_lat, min_lng, max_lat, max_lng, limit):
+        """Retrieve the most reviewed places inside a bounding box.
+        
+        Args:
+            min_lat (float): Southern edge
+            min_lng (float): Western edge (may exceed max_lng across
+                the antimeridian)
+            max_lat (float): Northern edge
+            max_lng (float): Eastern edge
+            limit (int): Maximum number of places to return
+            
         Returns:
-            list[PlaceModel]: List of all place instances
+            list[PlaceModel]: Places inside the box
         """
-        return self.place_repo.get_all()
+        return self.place_repo.get_places_in_bbox(min_lat, min_lng,
+                                                  max_lat, max_lng, limit)
 
     def update_place(self, place_id, place_data):
         """Update an existing place.
@@ -277,6 +674,12 @@ class HBnBFacade:
         # Update place data and save changes
         place.update(place_data)
         place.save()
+        self.place_repo.save(place)
+        indexed = [field for field in ('title', 'description')
+                   if field in place_data]
+        if indexed:
+            self.search_index.sync([place_id], indexed)
+        self.invalidate_place(place_id)
         return place
 
     def add_amenity_to_place(self, place_id, amenity_id):
@@ -303,8 +706,18 @@ class HBnBFacade:
         if amenity not in place.amenities:
             place.amenities.append(amenity)
             place.save()
+            self.place_repo.save(place)
+            self.invalidate_place(place_id)
         return True
 
+    def rebuild_rating_aggregates(self):
+        """Recompute rating aggregates of every place from its reviews.
+        
+        Returns:
+            int: Number of places updated
+        """
+        return self.place_repo.rebuild_rating_aggregates()
+
     # ==================== REVIEW BUSINESS LOGIC ====================
 
     def create_review(self, review_data):
@@ -333,14 +746,63 @@ class HBnBFacade:
         place = self.place_repo.get(place_id)
 
         # Create review with relationships
+        # (back_populates also adds it to place.reviews)
         review = ReviewModel(text=text, rating=rating, place=place, user=user)
-        self.review_repo.add(review)
 
-        # Add review to place's reviews list
-        place.reviews.append(review)
-        place.save()
+        # Update the place's rating aggregates in the same transaction
+        self.place_repo.adjust_rating_aggregates(place, added=[rating])
+        self.review_repo.add(review)
+        self.search_index.add_reviews({place.id: [review.text]})
+        self.invalidate_place(place.id)
         return review
 
+    def create_reviews(self, reviews_data, user_id):
+        """Create several reviews by one user in a single transaction.
+        
+        The rating aggregates of every reviewed place are updated in the
+        same transaction, with one UPDATE per place.
+        
+        Args:
+            reviews_data (list[dict]): Validated review payloads with
+                place_id, text and rating; every place must exist
+            user_id (str): UUID of the reviewer
+            
+        Returns:
+            list[ReviewModel]: The created reviews, in input order
+        """
+        places = self.get_places_by_ids(data['place_id']
+                                        for data in reviews_data)
+        reviews = [ReviewModel(text=data['text'], rating=data['rating'],
+                               place_id=data['place_id'], user_id=user_id)
+                   for data in reviews_data]
+
+        ratings_by_place = {}
+        texts_by_place = {}
+        for review in reviews:
+            ratings_by_place.setdefault(review.place_id, []).append(
+                review.rating)
+            texts_by_place.setdefault(review.place_id, []).append(review.text)
+        for place_id, ratings in ratings_by_place.items():
+            self.place_repo.adjust_rating_aggregates(places[place_id],
+                                                     added=ratings)
+        self.review_repo.add_many(reviews)
+        self.search_index.add_reviews(texts_by_place)
+        for place_id in ratings_by_place:
+            self.invalidate_place(place_id)
+        return reviews
+
+    def get_reviewed_place_ids(self, user_id, place_ids):
+        """Return which of the given places a user has already reviewed.
+        
+        Args:
+            user_id (str): UUID of the reviewer
+            place_ids (iterable[str]): UUIDs of the places to check
+            
+        Returns:
+            set[str]: Ids of the places the user has reviewed
+        """
+        return self.review_repo.get_reviewed_place_ids(user_id, place_ids)
+
     def get_review(self, review_id):
         """Retrieve a review by its unique ID.
         
@@ -360,6 +822,29 @@ class HBnBFacade:
         """
         return self.review_repo.get_all()
 
+    def get_reviews_page(self, limit, cursor=None):
+        """Retrieve one page of reviews in creation order.
+        
+        Args:
+            limit (int): Maximum number of reviews to return
+            cursor (str, optional): Cursor returned with the previous page
+            
+        Returns:
+            tuple: (list[ReviewModel], next cursor or None)
+            
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        return self.review_repo.get_page(limit, cursor)
+
+    def get_reviews_version(self):
+        """Return a cheap version of the reviews collection.
+        
+        Returns:
+            tuple: (number of reviews, latest updated_at)
+        """
+        return self.review_repo.get_version()
+
     def get_reviews_by_place(self, place_id):
         """Retrieve all reviews for a specific place.
         
@@ -367,12 +852,21 @@ class HBnBFacade:
             place_id (str): UUID of the place
             
         Returns:
-            list[ReviewModel]: List of reviews for the specified place
+            list[ReviewModel]: Reviews for the specified place, oldest
+                first, with their authors loaded
+        """
+        return self.review_repo.get_reviews_by_place(place_id)
+
+    def get_place_reviews_version(self, place_id):
+        """Return a cheap version of the reviews list of a place.
+        
+        Args:
+            place_id (str): UUID of the place
+            
+        Returns:
+            tuple: (review count, latest review update, latest author update)
         """
-        # Fetch all reviews and filter by place_id
-        all_reviews = self.review_repo.get_all()
-        return [review for review in all_reviews
-                if review.place.id == place_id]
+        return self.review_repo.get_place_reviews_version(place_id)
 
     def update_review(self, review_id, review_data):
         """Update an existing review.
@@ -387,9 +881,22 @@ class HBnBFacade:
         review = self.review_repo.get(review_id)
         if not review:
             return None
+        old_rating = review.rating
+        # A review's place and author are fixed once it exists, moving it
+        # would also invalidate both places' rating aggregates
+        review_data = {key: value for key, value in review_data.items()
+                       if key not in ('place_id', 'user_id')}
         # Update review data and save changes
         review.update(review_data)
         review.save()
+        # Move the review between histogram buckets if its rating changed
+        if review.rating != old_rating:
+            self.place_repo.adjust_rating_aggregates(
+                review.place, added=[review.rating], removed=[old_rating])
+        self.review_repo.save(review)
+        if 'text' in review_data:
+            self.search_index.sync([review.place_id], ['reviews'])
+        self.invalidate_place(review.place_id)
         return review
 
     def delete_review(self, review_id):
@@ -403,6 +910,12 @@ class HBnBFacade:
         """
         review = self.review_repo.get(review_id)
         if review:
+            # Remove the rating from the place aggregates before committing
+            place_id = review.place_id
+            self.place_repo.adjust_rating_aggregates(
+                review.place, removed=[review.rating])
             self.review_repo.delete(review_id)
+            self.search_index.sync([place_id], ['reviews'])
+            self.invalidate_place(place_id)
             return True
         return False
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Password hashing worker pool module.
+
+bcrypt is deliberately slow (about 250 ms per hash at the default cost).
+Running it on request threads lets a burst of logins occupy every worker
+and starve all other endpoints. This module runs password work on a small
+dedicated thread pool instead, with a bounded queue: when the queue is
+full, callers are rejected immediately so the API can answer 503 instead
+of piling up requests. bcrypt releases the GIL while hashing, so the pool
+threads run in parallel with request threads.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class PasswordPoolBusy(Exception):
+    """Raised when the password pool queue is full.
+
+    Attributes:
+        retry_after (int): Suggested delay in seconds before retrying
+    """
+
+    def __init__(self, retry_after=1):
+        super().__init__('Password pool is saturated')
+        self.retry_after = retry_after
+
+
+class PasswordPool:
+    """Bounded executor for bcrypt hashing and verification.
+
+    At most workers + max_queue jobs are accepted at a time; further
+    submissions raise PasswordPoolBusy without waiting. With workers set
+    to 0 jobs run inline on the calling thread (no pool).
+
+    Attributes:
+        workers (int): Number of worker threads
+        max_queue (int): Jobs allowed to wait for a free worker
+        retry_after (int): Retry-After hint, in seconds, for rejected jobs
+        completed (int): Jobs finished, successfully or not
+        rejected (int): Jobs refused because the queue was full
+        peak_queued (int): Highest number of waiting jobs seen
+    """
+
+    def __init__(self, workers=4, max_queue=32, retry_after=1):
+        """Create a pool; threads are only started on first use.
+
+        Args:
+            workers (int): Number of worker threads, 0 to run inline
+            max_queue (int): Jobs allowed to wait for a free worker
+            retry_after (int): Retry-After hint for rejected jobs
+        """
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pending = 0
+        self._active = 0
+        self.completed = 0
+        self.rejected = 0
+        self.peak_queued = 0
+        self.configure(workers, max_queue, retry_after)
+
+    def configure(self, workers, max_queue, retry_after=1):
+        """Resize the pool; running jobs finish on the previous executor."""
+        with self._lock:
+            old, self._executor = self._executor, None
+            self.workers = max(0, workers)
+            self.max_queue = max(0, max_queue)
+            self.retry_after = retry_after
+        if old is not None:
+            old.shutdown(wait=False)
+
+    def _get_executor(self):
+        # Caller holds the lock
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix='password')
+        return self._executor
+
+    def _run_job(self, func, args):
+        with self._lock:
+            self._active += 1
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._pending -= 1
+                self.completed += 1
+
+    def submit(self, func, *args):
+        """Queue func(*args) and return its Future.
+
+        Raises:
+            PasswordPoolBusy: If workers + max_queue jobs are pending
+        """
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise PasswordPoolBusy(self.retry_after)
+            self._pending += 1
+            self.peak_queued = max(self.peak_queued,
+                                   self._pending - self.workers)
+            executor = self._get_executor()
+        try:
+            return executor.submit(self._run_job, func, args)
+        except RuntimeError:
+            # The executor was shut down by a concurrent configure()
+            with self._lock:
+                self._pending -= 1
+            raise
+
+    def run(self, func, *args):
+        """Run func(*args) on the pool and wait for its result.
+
+        Raises:
+            PasswordPoolBusy: If the pool is saturated
+        """
+        if self.workers == 0:
+            return func(*args)
+        return self.submit(func, *args).result()
+
+    def stats(self):
+        """Return a snapshot of the pool counters.
+
+        Returns:
+            dict: workers, max_queue, active, queued, completed, rejected
+                and peak_queued
+        """
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'max_queue': self.max_queue,
+                'active': self._active,
+                'queued': max(0, self._pending - self._active),
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'peak_queued': self.peak_queued
+            }
@@ -0,0 +1,6 @@
+"""Performance benchmarks for the HBnB backend.
+
+Each module is a standalone script run from the backend directory, e.g.:
+
+    python -m benchmarks.reviews_by_place
+"""
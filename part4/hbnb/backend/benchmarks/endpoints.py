@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""Latency and query-count benchmark of every API route, with baselines.
+
+For each dataset size (N places and N reviews, plus users and amenities
+in proportion) a fresh in-memory database is seeded by the dataset
+seeder (app.persistence.seeder) and every route in
+ROUTES is called --requests times through create_app().test_client(),
+rotating over sampled ids. The p50/p95/p99 latency and the SQL statements
+per request (X-DB-Query-Count, see app.metrics) are printed per route.
+
+Every API route is measured, writes included: creations, batches,
+updates, review deletion, login and token refresh. Writes that consume
+what they target (a place can be reviewed once, a review deleted once, a
+refresh token used once) get fresh rows or tokens, created before each
+request and outside its timing (FRESH). Only the Swagger UI and spec and
+the static files are left out.
+
+--save writes the results to a JSON baseline; --compare reads one and
+flags a route as a regression when its p95 grows by more than
+--tolerance (and by more than --min-delta-ms, to ignore noise on fast
+routes) or when it runs more SQL statements than before, which is how
+N+1 queries show up. The exit status is 1 when a regression is found.
+
+Usage:
+    python -m benchmarks.endpoints [--sizes 1000 100000 1000000]
+        [--requests 200] [--save baseline.json]
+        [--compare baseline.json --tolerance 0.25]
+"""
+import argparse
+import itertools
+import json
+import platform
+import string
+import sys
+import time
+
+from sqlalchemy import select
+
+from app import create_app, db
+from app.models.amenity import AmenityModel
+from app.models.place import PlaceModel
+from app.models.review import ReviewModel
+from app.models.user import UserModel
+from app.persistence.seeder import DatasetSeeder
+from benchmarks.reviews_by_place import BenchmarkConfig
+
+# Generated host, not an administrator, and the generated administrator
+EMAIL = 'user1@seed.example.com'
+ADMIN_EMAIL = 'user0@seed.example.com'
+PASSWORD = 'benchmark-password'
+AMENITIES = 20
+
+# Sampled ids routes rotate over
+SAMPLE = 100
+
+# Items per request of the batch routes
+BATCH_SIZE = 10
+
+
+class EndpointBenchmarkConfig(BenchmarkConfig):
+    """Statement counts in responses, cheap bcrypt, no slow request logs."""
+    METRICS_QUERY_HEADER = True
+    SLOW_REQUEST_MS = 10 ** 9
+    SLOW_QUERY_MS = 10 ** 9
+    # Login is measured for its queries, not for bcrypt's work factor
+    BCRYPT_LOG_ROUNDS = 4
+    PASSWORD_POOL_WORKERS = 0
+
+
+def seed(size, random_seed):
+    """Seed size places and size reviews; return sampled ids by kind."""
+    counts = DatasetSeeder(random_seed, PASSWORD).seed(
+        users=max(20, size // 20), places=size, reviews=size,
+        amenities=AMENITIES)
+
+    # Ids are random, the first ones in id order are a repeatable sample
+    def sample(model, *criteria):
+        return db.session.scalars(
+            select(model.id).where(*criteria).order_by(model.id)
+            .limit(SAMPLE)).all()
+
+    owner = db.session.scalar(select(UserModel).where(
+        UserModel.email == EMAIL))
+    return {'place': sample(PlaceModel), 'user': sample(UserModel),
+            'review': sample(ReviewModel), 'amenity': sample(AmenityModel),
+            # The login user and its places, for the authenticated PUTs
+            'host': [owner.id],
+            'own_place': sample(PlaceModel,
+                                PlaceModel.owner_id == owner.id)}, counts
+
+
+def _created(response):
+    if response.status_code != 201:
+        raise RuntimeError('setup request answered {}'.format(
+            response.status_code))
+    return response.get_json()
+
+
+def _place(n):
+    # Far from the nearby route's center, so its results do not grow
+    return {'title': 'Benchmark place {}'.format(n), 'price': 120.0,
+            'latitude': -45.0, 'longitude': -150.0}
+
+
+def fresh_place(client, headers, n):
+    """Create a place of the administrator, which the host can review."""
+    return _created(client.post('/api/v1/places/', headers=headers['admin'],
+                                json=_place(n)))['id']
+
+
+def fresh_places(client, headers, n):
+    """Create BATCH_SIZE places of the administrator."""
+    return [place['id'] for place in _created(client.post(
+        '/api/v1/places/batch', headers=headers['admin'],
+        json=[_place('{}.{}'.format(n, k)) for k in range(BATCH_SIZE)]))]
+
+
+def fresh_review(client, headers, n):
+    """Create a review by the host, on a fresh place."""
+    return _created(client.post(
+        '/api/v1/reviews/', headers=headers['host'],
+        json={'text': 'Fresh stay', 'rating': 4,
+              'place_id': fresh_place(client, headers, n)}))['id']
+
+
+def fresh_refresh(client, headers, n):
+    """Log the host in; return an unused refresh token."""
+    return client.post('/api/v1/auth/login', json={
+        'email': EMAIL, 'password': PASSWORD}).get_json()['refresh_token']
+
+
+# Values created before each request of the routes naming them
+FRESH = {'fresh_place': fresh_place, 'fresh_places': fresh_places,
+         'fresh_review': fresh_review, 'fresh_refresh': fresh_refresh}
+
+# Route name -> (method, URL template, auth, JSON body template)
+# Strings of the URL and body are formatted with {place}, {user},
+# {review}, {amenity}, {host} and {own_place}, rotating over sampled ids,
+# {n}, unique per request, and the FRESH values they name. auth is None,
+# a role ('host' or 'admin') or a FRESH token name.
+ROUTES = {
+    'places list': ('GET', '/api/v1/places/?limit=20', None, None),
+    'places filtered': ('GET', '/api/v1/places/?limit=20&min_price=100'
+                               '&max_price=200&min_rating=3', None, None),
+    'places by amenity': ('GET', '/api/v1/places/?limit=20'
+                                 '&amenities={amenity}', None, None),
+    'place facets': ('GET', '/api/v1/places/facets?max_price=200', None,
+                     None),
+    'place search': ('GET', '/api/v1/places/search?q=garden+view', None,
+                     None),
+    'places nearby': ('GET', '/api/v1/places/nearby?lat=48.86&lng=2.35'
+                             '&radius_km=10&limit=20', None, None),
+    'place detail': ('GET', '/api/v1/places/{place}', None, None),
+    'place reviews': ('GET', '/api/v1/places/{place}/reviews', None, None),
+    'place amenities': ('GET', '/api/v1/places/{place}/amenities', None,
+                        None),
+    'place create': ('POST', '/api/v1/places/', 'admin',
+                     {'title': 'Created place {n}', 'price': 80.0,
+                      'latitude': -45.0, 'longitude': -150.0}),
+    'place batch': ('POST', '/api/v1/places/batch', 'admin',
+                    [{'title': 'Batch place {{n}}.{}'.format(k),
+                      'price': 80.0, 'latitude': -45.0, 'longitude': -150.0}
+                     for k in range(BATCH_SIZE)]),
+    'place update': ('PUT', '/api/v1/places/{own_place}', 'host',
+                     {'description': 'Updated {n}'}),
+    'place amenity add': ('POST', '/api/v1/places/{fresh_place}/amenities',
+                          'admin', {'amenity_id': '{amenity}'}),
+    'users list': ('GET', '/api/v1/users/?limit=20', None, None),
+    'user detail': ('GET', '/api/v1/users/{user}', None, None),
+    'user create': ('POST', '/api/v1/users/', None,
+                    {'first_name': 'Bench', 'last_name': 'User',
+                     'email': 'bench{n}@bench.example.com',
+                     'password': PASSWORD}),
+    'user update': ('PUT', '/api/v1/users/{host}', 'host',
+                    {'last_name': 'Host {n}'}),
+    'reviews list': ('GET', '/api/v1/reviews/?limit=20', None, None),
+    'review detail': ('GET', '/api/v1/reviews/{review}', None, None),
+    'review create': ('POST', '/api/v1/reviews/', 'host',
+                      {'text': 'Benchmark stay {n}', 'rating': 4,
+                       'place_id': '{fresh_place}'}),
+    'review batch': ('POST', '/api/v1/reviews/batch', 'host',
+                     [{'text': 'Batch stay {n}', 'rating': 4,
+                       'place_id': '{{fresh_places[{}]}}'.format(k)}
+                      for k in range(BATCH_SIZE)]),
+    'review update': ('PUT', '/api/v1/reviews/{fresh_review}', 'host',
+                      {'text': 'Updated stay {n}', 'rating': 5}),
+    'review delete': ('DELETE', '/api/v1/reviews/{fresh_review}', 'host',
+                      None),
+    'amenities list': ('GET', '/api/v1/amenities/', None, None),
+    'amenity detail': ('GET', '/api/v1/amenities/{amenity}', None, None),
+    'amenity create': ('POST', '/api/v1/amenities/', 'admin',
+                       {'name': 'Amenity {n}'}),
+    'amenity batch': ('POST', '/api/v1/amenities/batch', 'admin',
+                      [{'name': 'Amenity {{n}}.{}'.format(k)}
+                       for k in range(BATCH_SIZE)]),
+    'amenity update': ('PUT', '/api/v1/amenities/{amenity}', 'admin',
+                       {'name': 'Renamed amenity {n}'}),
+    'login': ('POST', '/api/v1/auth/login', None,
+              {'email': EMAIL, 'password': PASSWORD}),
+    'token refresh': ('POST', '/api/v1/auth/refresh', 'fresh_refresh',
+                      None),
+    'auth protected': ('GET', '/api/v1/auth/protected', 'host', None),
+    'api info': ('GET', '/api/', None, None),
+    'metrics': ('GET', '/api/metrics', None, None),
+}
+
+# Unique number of each request, for unique emails, titles and names
+_numbers = itertools.count()
+
+
+def fields_of(template):
+    """Return the names formatted into the strings of a template."""
+    if isinstance(template, str):
+        return {field.split('[')[0].split('.')[0]
+                for _, field, _, _ in string.Formatter().parse(template)
+                if field}
+    if isinstance(template, dict):
+        template = list(template.values())
+    if isinstance(template, list):
+        return set().union(*[fields_of(item) for item in template])
+    return set()
+
+
+def fill(template, values):
+    """Format the strings of a URL or JSON body template."""
+    if isinstance(template, str):
+        return template.format(**values)
+    if isinstance(template, dict):
+        return {key: fill(value, values) for key, value in template.items()}
+    if isinstance(template, list):
+        return [fill(item, values) for item in template]
+    return template
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def measure_route(client, route, ids, headers, requests):
+    """Call one route; return its latency percentiles and query count.
+
+    Args:
+        client: Test client of the application
+        route (tuple): (method, URL template, auth, body template)
+        ids (dict): Sampled ids by kind
+        headers (dict): Authorization headers by role
+        requests (int): Number of calls
+    """
+    method, template, auth, body = route
+    fresh = (fields_of(template) | fields_of(body) | {auth}) & set(FRESH)
+    timings = []
+    queries = []
+    for i in range(requests):
+        n = next(_numbers)
+        values = {kind: values[i % len(values)]
+                  for kind, values in ids.items()}
+        values['n'] = n
+        for name in fresh:
+            values[name] = FRESH[name](client, headers, n)
+        url = fill(template, values)
+        kwargs = {}
+        if auth in headers:
+            kwargs['headers'] = headers[auth]
+        elif auth is not None:
+            kwargs['headers'] = {'Authorization': 'Bearer ' + values[auth]}
+        if body is not None:
+            kwargs['json'] = fill(body, values)
+        start = time.perf_counter()
+        response = client.open(url, method=method, **kwargs)
+        timings.append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            raise RuntimeError('{} {} answered {}'.format(
+                method, url, response.status_code))
+        queries.append(int(response.headers.get('X-DB-Query-Count', 0)))
+    return {'p50_ms': round(percentile(timings, 0.50) * 1000, 3),
+            'p95_ms': round(percentile(timings, 0.95) * 1000, 3),
+            'p99_ms': round(percentile(timings, 0.99) * 1000, 3),
+            'queries': round(sum(queries) / len(queries), 2)}
+
+
+def run_size(size, args):
+    app = create_app(EndpointBenchmarkConfig)
+    with app.app_context():
+        db.create_all()
+        started = time.perf_counter()
+        ids, counts = seed(size, args.seed)
+        print('size {}: seeded {} users, {} reviews in {:.1f} s'.format(
+            size, counts['users'], counts['reviews'],
+            time.perf_counter() - started))
+
+    client = app.test_client()
+    headers = {}
+    for role, email in (('host', EMAIL), ('admin', ADMIN_EMAIL)):
+        token = client.post('/api/v1/auth/login', json={
+            'email': email, 'password': PASSWORD}).get_json()['access_token']
+        headers[role] = {'Authorization': 'Bearer ' + token}
+    results = {}
+    print('{:>18} {:>9} {:>9} {:>9} {:>8}'.format(
+        'route', 'p50 ms', 'p95 ms', 'p99 ms', 'queries'))
+    for name, route in ROUTES.items():
+        if args.routes and name not in args.routes:
+            continue
+        # Warm-up calls fill caches and compile statements, like the
+        # first requests after a deploy
+        measure_route(client, route, ids, headers, min(args.requests, 5))
+        results[name] = measure_route(client, route, ids, headers,
+                                      args.requests)
+        print('{:>18} {p50_ms:>9.2f} {p95_ms:>9.2f} {p99_ms:>9.2f} '
+              '{queries:>8.1f}'.format(name, **results[name]))
+
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+    return results
+
+
+def compare(baseline, results, tolerance, min_delta_ms):
+    """Print current results against a baseline; return the regressions.
+
+    Args:
+        baseline (dict): Size -> route -> metrics, as saved by --save
+        results (dict): Current results, same shape
+        tolerance (float): Allowed relative p95 growth, 0.25 for 25%
+        min_delta_ms (float): p95 growth always tolerated, in ms
+
+    Returns:
+        list: (size, route, reason) of every regression
+    """
+    regressions = []
+    print('{:>8} {:>18} {:>10} {:>10} {:>8} {:>9}  {}'.format(
+        'size', 'route', 'base p95', 'p95', 'change', 'queries', 'status'))
+    for size, routes in results.items():
+        for route, current in routes.items():
+            base = baseline.get(size, {}).get(route)
+            if base is None:
+                print('{:>8} {:>18} {:>10} {p95_ms:>10.2f} {:>8} '
+                      '{queries:>9.1f}  new'.format(size, route, '-', '-',
+                                                    **current))
+                continue
+            reasons = []
+            delta = current['p95_ms'] - base['p95_ms']
+            if (delta > base['p95_ms'] * tolerance and
+                    delta > min_delta_ms):
+                reasons.append('p95 +{:.0f}%'.format(
+                    100 * delta / base['p95_ms']))
+            if current['queries'] > base['queries']:
+                reasons.append('queries {} -> {}'.format(base['queries'],
+                                                         current['queries']))
+            regressions.extend((size, route, reason) for reason in reasons)
+            print('{:>8} {:>18} {:>10.2f} {:>10.2f} {:>+7.0f}% '
+                  '{:>9}  {}'.format(
+                      size, route, base['p95_ms'], current['p95_ms'],
+                      100 * delta / base['p95_ms'] if base['p95_ms'] else 0,
+                      '{}/{}'.format(base['queries'], current['queries']),
+                      'REGRESSION: ' + ', '.join(reasons) if reasons
+                      else 'ok'))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000],
+                        help='places (and reviews) per dataset, e.g. '
+                             '1000 100000 1000000')
+    parser.add_argument('--requests', type=int, default=200,
+                        help='timed requests per route')
+    parser.add_argument('--seed', type=int, default=42,
+                        help='random seed of the generated datasets')
+    parser.add_argument('--routes', nargs='+', choices=list(ROUTES),
+                        metavar='ROUTE', help='only measure these routes')
+    parser.add_argument('--save', metavar='PATH',
+                        help='write the results to a JSON baseline')
+    parser.add_argument('--compare', metavar='PATH',
+                        help='compare the results with a JSON baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed relative p95 growth (default 0.25)')
+    parser.add_argument('--min-delta-ms', type=float, default=1.0,
+                        help='p95 growth below this is never a regression')
+    args = parser.parse_args()
+
+    # JSON object keys are strings, so sizes are too
+    results = {str(size): run_size(size, args) for size in args.sizes}
+
+    if args.save:
+        with open(args.save, 'w') as output:
+            json.dump({'meta': {'python': platform.python_version(),
+                                'platform': platform.platform(),
+                                'requests': args.requests,
+                                'seed': args.seed},
+                       'results': results}, output, indent=2)
+            output.write('\n')
+        print('baseline written to {}'.format(args.save))
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)['results']
+        regressions = compare(baseline, results, args.tolerance,
+                              args.min_delta_ms)
+        if regressions:
+            print('{} regression(s)'.format(len(regressions)))
+            sys.exit(1)
+        print('no regression')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""Benchmark for concurrent reads and writes per database engine profile.
+
+The same mixed workload runs against a fresh SQLite file with:
+
+- development: DevelopmentConfig engine defaults (rollback journal, full
+  synchronous commits, no busy timeout beyond the driver's default);
+- production: ProductionConfig pool options and pragmas (WAL, synchronous
+  NORMAL, busy_timeout, larger cache, mmap, foreign keys).
+
+Request threads submit GET /places/?limit=20 reads and PUT /places/<id>
+writes, one write every --read-ratio reads. Each write is its own
+transaction, committed by the request's unit of work.
+
+Usage:
+    python -m benchmarks.engine_profile [--requests 2000] [--threads 8]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app import create_app, db
+from config import DevelopmentConfig, ProductionConfig
+
+EMAIL = 'bench.engine@example.com'
+PASSWORD = 'benchmark-password'
+
+
+def make_config(base, db_path):
+    class EngineBenchmarkConfig(base):
+        DEBUG = False
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + db_path
+        BCRYPT_LOG_ROUNDS = 4
+        PASSWORD_POOL_WORKERS = 0
+    return EngineBenchmarkConfig
+
+
+def seed(app, places):
+    from app.services import facade
+
+    with app.app_context():
+        db.create_all()
+        owner = facade.create_user({'first_name': 'Bench',
+                                    'last_name': 'Engine', 'email': EMAIL,
+                                    'password': PASSWORD})
+        return [facade.create_place({'title': 'Engine place {}'.format(i),
+                                     'description': 'Seeded place',
+                                     'price': 50.0 + i, 'latitude': 0.0,
+                                     'longitude': 0.0,
+                                     'owner_id': owner.id}).id
+                for i in range(places)]
+
+
+def percentile(values, fraction):
+    if not values:
+        return float('nan')
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_profile(name, base, args):
+    directory = tempfile.mkdtemp()
+    try:
+        app = create_app(make_config(base, os.path.join(directory,
+                                                        'bench.db')))
+        place_ids = seed(app, args.places)
+        token = app.test_client().post('/api/v1/auth/login', json={
+            'email': EMAIL, 'password': PASSWORD}).get_json()['access_token']
+        headers = {'Authorization': 'Bearer ' + token}
+
+        def read(i):
+            return app.test_client().get(
+                '/api/v1/places/?limit=20').status_code
+
+        def write(i):
+            place_id = place_ids[i % len(place_ids)]
+            return app.test_client().put(
+                '/api/v1/places/' + place_id, headers=headers,
+                json={'description': 'Updated {}'.format(i)}).status_code
+
+        jobs = [('write', write) if i % (args.read_ratio + 1) == 0
+                else ('read', read) for i in range(args.requests)]
+        results = {'read': [], 'write': []}
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as workers:
+            def timed(kind, func, i):
+                began = time.perf_counter()
+                status = func(i)
+                results[kind].append((status,
+                                      time.perf_counter() - began))
+            for future in [workers.submit(timed, kind, func, i)
+                           for i, (kind, func) in enumerate(jobs)]:
+                future.result()
+        elapsed = time.perf_counter() - start
+
+        reads = [t for status, t in results['read'] if status == 200]
+        writes = [t for status, t in results['write'] if status == 200]
+        errors = sum(1 for kind in results.values()
+                     for status, _ in kind if status != 200)
+        print('{:>12} {:>9.0f} {:>9.2f} {:>9.2f} {:>10.2f} {:>10.2f} '
+              '{:>7}'.format(
+                  name, len(jobs) / elapsed,
+                  statistics.median(reads) * 1000,
+                  percentile(reads, 0.95) * 1000,
+                  statistics.median(writes) * 1000,
+                  percentile(writes, 0.95) * 1000, errors))
+        with app.app_context():
+            db.session.remove()
+            for engine in db.engines.values():
+                engine.dispose()
+    finally:
+        shutil.rmtree(directory)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--requests', type=int, default=2000,
+                        help='requests per profile')
+    parser.add_argument('--threads', type=int, default=8,
+                        help='request threads')
+    parser.add_argument('--read-ratio', type=int, default=4,
+                        help='reads per write')
+    parser.add_argument('--places', type=int, default=200,
+                        help='places in the database')
+    args = parser.parse_args()
+
+    print('{:>12} {:>9} {:>9} {:>9} {:>10} {:>10} {:>7}'.format(
+        'profile', 'req/s', 'read p50', 'read p95', 'write p50',
+        'write p95', 'errors'))
+    run_profile('development', DevelopmentConfig, args)
+    run_profile('production', ProductionConfig, args)
+
+
+if __name__ == '__main__':
+    main()
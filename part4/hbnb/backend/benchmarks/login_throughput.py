@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""Benchmark for logins and reads running concurrently.
+
+A fixed number of request threads (like a threaded WSGI server) serves a
+mix of POST /auth/login and GET /places/ requests submitted as a burst.
+Each mode is run with the same load:
+
+- inline: bcrypt runs on the request thread (PASSWORD_POOL_WORKERS=0), so
+  a login burst occupies every request thread and reads wait behind it;
+- pool: bcrypt runs on the bounded password pool, logins beyond its queue
+  are rejected at once with 503 and the request threads stay available
+  for reads.
+
+Latencies are measured from submission, so they include the time a
+request waited for a free request thread.
+
+Usage:
+    python -m benchmarks.login_throughput [--logins 64] [--reads 256]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app import create_app, db
+from config import DevelopmentConfig
+
+EMAIL = 'bench.login@example.com'
+PASSWORD = 'benchmark-password'
+
+
+def make_config(db_path, pool_workers, max_queue, rounds):
+    class LoginBenchmarkConfig(DevelopmentConfig):
+        # File database shared by all request threads
+        DEBUG = False
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + db_path
+        PASSWORD_POOL_WORKERS = pool_workers
+        PASSWORD_POOL_MAX_QUEUE = max_queue
+        BCRYPT_LOG_ROUNDS = rounds
+    return LoginBenchmarkConfig
+
+
+def seed(app, places):
+    from app.services import facade
+
+    with app.app_context():
+        db.create_all()
+        owner = facade.create_user({'first_name': 'Bench',
+                                    'last_name': 'Login', 'email': EMAIL,
+                                    'password': PASSWORD})
+        for i in range(places):
+            facade.create_place({'title': 'Bench place {}'.format(i),
+                                 'price': 100.0, 'latitude': 0.0,
+                                 'longitude': 0.0, 'owner_id': owner.id})
+
+
+def percentile(values, fraction):
+    if not values:
+        return float('nan')
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_mode(name, pool_workers, args):
+    from app.services import facade
+
+    fd, db_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    try:
+        app = create_app(make_config(db_path, pool_workers, args.max_queue,
+                                     args.rounds))
+        seed(app, args.places)
+
+        def login():
+            return app.test_client().post('/api/v1/auth/login', json={
+                'email': EMAIL, 'password': PASSWORD}).status_code
+
+        def read():
+            return app.test_client().get('/api/v1/places/').status_code
+
+        # Interleave one login every few reads, logins front-loaded
+        jobs = []
+        reads_per_login = max(1, args.reads // max(1, args.logins))
+        reads_left = args.reads
+        for _ in range(args.logins):
+            jobs.append(('login', login))
+            for _ in range(min(reads_per_login, reads_left)):
+                jobs.append(('read', read))
+                reads_left -= 1
+        jobs.extend([('read', read)] * reads_left)
+
+        results = {'login': [], 'read': []}
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as workers:
+            def timed(kind, func, submitted):
+                status = func()
+                results[kind].append(
+                    (status, time.perf_counter() - submitted))
+            futures = [workers.submit(timed, kind, func, time.perf_counter())
+                       for kind, func in jobs]
+            for future in futures:
+                future.result()
+        elapsed = time.perf_counter() - start
+
+        ok = [t for status, t in results['login'] if status == 200]
+        shed = [t for status, t in results['login'] if status == 503]
+        reads = [t for status, t in results['read'] if status == 200]
+        print('{:>7} {:>9} {:>9} {:>11.1f} {:>10.1f} {:>10.1f} {:>10.1f} '
+              '{:>8.2f} {:>6}'.format(
+                  name, len(ok), len(shed),
+                  statistics.median(ok) * 1000 if ok else float('nan'),
+                  percentile(reads, 0.50) * 1000,
+                  percentile(reads, 0.95) * 1000,
+                  percentile(reads, 0.99) * 1000,
+                  elapsed, facade.password_pool.stats()['peak_queued']))
+    finally:
+        os.remove(db_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--logins', type=int, default=64,
+                        help='login requests in the burst')
+    parser.add_argument('--reads', type=int, default=256,
+                        help='GET /places/ requests in the burst')
+    parser.add_argument('--threads', type=int, default=8,
+                        help='request threads serving the burst')
+    parser.add_argument('--pool-workers', type=int, default=2,
+                        help='password pool threads in pool mode')
+    parser.add_argument('--max-queue', type=int, default=4,
+                        help='password jobs allowed to wait in pool mode')
+    parser.add_argument('--rounds', type=int, default=12,
+                        help='bcrypt cost factor')
+    parser.add_argument('--places', type=int, default=50,
+                        help='places returned by each read')
+    args = parser.parse_args()
+
+    print('{:>7} {:>9} {:>9} {:>11} {:>10} {:>10} {:>10} {:>8} {:>6}'.format(
+        'mode', 'login ok', 'login 503', 'login p50', 'read p50',
+        'read p95', 'read p99', 'total s', 'peakq'))
+    run_mode('inline', 0, args)
+    run_mode('pool', args.pool_workers, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Benchmark for listing the reviews of one place.
+
+Seeds databases with a growing number of reviews while the measured place
+always has the same number of reviews, then times
+HBnBFacade.get_reviews_by_place. With the indexed query the latency and
+the number of SQL statements stay flat as the reviews table grows; the
+legacy column shows the old "load every review and filter in Python"
+approach for comparison.
+
+Usage:
+    python -m benchmarks.reviews_by_place [--sizes 1000 10000 50000]
+"""
+import argparse
+import statistics
+import time
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import event, insert
+
+from app import create_app, db
+from app.models.place import PlaceModel
+from app.models.review import ReviewModel
+from app.models.user import UserModel
+from config import DevelopmentConfig
+
+# Reviews attached to every place, including the measured one
+REVIEWS_PER_PLACE = 20
+
+
+class BenchmarkConfig(DevelopmentConfig):
+    """In-memory database so runs do not touch development.db."""
+    DEBUG = False
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+
+
+def seed(total_reviews):
+    """Insert users, places and reviews; return the measured place id."""
+    now = datetime.now(timezone.utc)
+    users = [{'id': str(uuid.uuid4()), 'first_name': 'Bench',
+              'last_name': 'User{}'.format(i),
+              'email': 'bench{}@example.com'.format(i),
+              'email_normalized': 'bench{}@example.com'.format(i),
+              'password': 'not-a-real-hash', 'is_admin': False,
+              'created_at': now, 'updated_at': now}
+             for i in range(REVIEWS_PER_PLACE + 1)]
+    owner_id = users[0]['id']
+    reviewers = [user['id'] for user in users[1:]]
+
+    place_count = max(1, total_reviews // REVIEWS_PER_PLACE)
+    places = [{'id': str(uuid.uuid4()), 'owner_id': owner_id,
+               'title': 'Bench place {}'.format(i), 'price': 100.0,
+               'latitude': 0.0, 'longitude': 0.0,
+               'created_at': now, 'updated_at': now}
+              for i in range(place_count)]
+    reviews = [{'id': str(uuid.uuid4()), 'text': 'Benchmark review',
+                'rating': 1 + j % 5, 'place_id': place['id'],
+                'user_id': reviewers[j], 'created_at': now,
+                'updated_at': now}
+               for place in places for j in range(REVIEWS_PER_PLACE)]
+
+    db.session.execute(insert(UserModel.__table__), users)
+    db.session.execute(insert(PlaceModel.__table__), places)
+    db.session.execute(insert(ReviewModel.__table__), reviews)
+    db.session.commit()
+    return places[len(places) // 2]['id']
+
+
+def measure(func, repeat):
+    """Return (median seconds, statements per call) for func()."""
+    statements = []
+    listener = (lambda *args: statements.append(1))
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        timings = []
+        for _ in range(repeat):
+            # Start from a cold identity map like a fresh request would
+            db.session.expire_all()
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+    return statistics.median(timings), len(statements) / repeat
+
+
+def run(sizes, repeat):
+    from app.services import facade
+
+    print('{:>10} {:>14} {:>9} {:>14} {:>9}'.format(
+        'reviews', 'indexed (ms)', 'queries', 'legacy (ms)', 'queries'))
+    for size in sizes:
+        app = create_app(BenchmarkConfig)
+        with app.app_context():
+            db.create_all()
+            place_id = seed(size)
+
+            def indexed():
+                return [review.user.id for review in
+                        facade.get_reviews_by_place(place_id)]
+
+            def legacy():
+                return [review.user.id for review in
+                        facade.get_all_reviews()
+                        if review.place.id == place_id]
+
+            indexed_time, indexed_queries = measure(indexed, repeat)
+            legacy_time, legacy_queries = measure(legacy, max(1, repeat // 5))
+            print('{:>10} {:>14.2f} {:>9.0f} {:>14.2f} {:>9.0f}'.format(
+                size, indexed_time * 1000, indexed_queries,
+                legacy_time * 1000, legacy_queries))
+            db.session.remove()
+            db.drop_all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[1000, 10000, 50000],
+                        help='total number of reviews per run')
+    parser.add_argument('--repeat', type=int, default=50,
+                        help='timed calls per size')
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Benchmark for serializing and encoding place lists.
+
+Builds transient PlaceModel instances (no database round trips, so only
+the serialization cost is measured) and times turning them into the
+place card payload of GET /places/:
+
+- hand-written: the per-field dict loop the handlers used before;
+- serializer: the precompiled PLACE_CARD serializer, every field;
+- sparse: the serializer with ?fields=id,title,price;
+
+then encodes the full payload with the standard json module (what
+Flask-RESTX uses by default) and with orjson when it is installed.
+
+Usage:
+    python -m benchmarks.serialization [--places 10000] [--repeat 5]
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+
+from app import create_app
+from app.api.v1.serializers import PLACE_CARD
+from app.models.place import PlaceModel
+from benchmarks.reviews_by_place import BenchmarkConfig
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+SPARSE_FIELDS = 'id,title,price'
+
+
+def make_places(count):
+    rng = random.Random(count)
+    return [PlaceModel(title='Place {}'.format(i),
+                       description='Seeded place',
+                       price=round(rng.uniform(20, 500), 2),
+                       latitude=rng.uniform(-90, 90),
+                       longitude=rng.uniform(-180, 180),
+                       review_count=rng.randint(0, 50),
+                       rating_avg=rng.uniform(1, 5))
+            for i in range(count)]
+
+
+def hand_written(places):
+    result = []
+    for place in places:
+        place_dict = {
+            'id': place.id,
+            'title': place.title,
+            'price': place.price,
+            'latitude': place.latitude,
+            'longitude': place.longitude,
+            'average_rating': place.average_rating,
+            'review_count': place.review_count}
+        result.append(place_dict)
+    return result
+
+
+def timed(func, repeat):
+    """Return the median duration of func() in milliseconds."""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--places', type=int, default=10000,
+                        help='places in the serialized list')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='runs per measurement, the median is kept')
+    args = parser.parse_args()
+
+    app = create_app(BenchmarkConfig)
+    with app.app_context():
+        places = make_places(args.places)
+        fields = PLACE_CARD.parse_fields(SPARSE_FIELDS)
+        payload = PLACE_CARD.dump_many(places)
+        assert payload == hand_written(places)
+
+        rows = [
+            ('hand-written', lambda: hand_written(places)),
+            ('serializer', lambda: PLACE_CARD.dump_many(places)),
+            ('sparse', lambda: PLACE_CARD.dump_many(places, fields)),
+            ('json.dumps', lambda: json.dumps(payload)),
+        ]
+        if orjson is not None:
+            rows.append(('orjson.dumps', lambda: orjson.dumps(payload)))
+
+        print('{} places, median of {} runs'.format(args.places,
+                                                     args.repeat))
+        print('{:>14} {:>10}'.format('step', 'ms'))
+        for name, func in rows:
+            print('{:>14} {:>10.2f}'.format(name, timed(func, args.repeat)))
+        if orjson is None:
+            print('orjson is not installed, responses use json')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""Cold-start benchmark of the application, with a time budget.
+
+Each run starts a fresh interpreter which imports the app package,
+calls create_app() and answers a first request, so nothing is cached
+between runs. Three modes are measured:
+
+- app: the full API, Swagger UI and spec included;
+- app without docs: the full API with API_DOCS off;
+- lean: create_app(http=False), what scripts such as init_db.py use.
+
+The median and worst time to a ready application (imports and
+create_app()) and of the first request are printed per mode, and for
+the full app the first GET /swagger.json, when flask-restx builds the
+spec. The exit status is 1 when a mode's median exceeds its budget
+(STARTUP_BUDGET_MS, or --budget-ms for every mode).
+
+--profile runs one more interpreter under python -X importtime and
+prints the modules taking the most import time, by their own time and
+by top-level package.
+
+Usage:
+    python -m benchmarks.startup [--runs 7] [--budget-ms 1500]
+        [--profile] [--top 15]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import Counter
+
+# Median time to a ready application allowed per mode, in milliseconds
+STARTUP_BUDGET_MS = {
+    'app': 1500,
+    'app without docs': 1500,
+    'lean': 1000,
+}
+
+# Mode -> (create_app http argument, API_DOCS)
+MODES = {
+    'app': (True, True),
+    'app without docs': (True, False),
+    'lean': (False, False),
+}
+
+CHILD = '''
+import json
+import time
+started = time.perf_counter()
+from app import create_app
+from config import DevelopmentConfig
+
+
+class StartupConfig(DevelopmentConfig):
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    DEBUG = False
+    API_DOCS = {docs}
+
+
+app = create_app(StartupConfig, http={http})
+ready = time.perf_counter()
+timings = {{'ready_ms': (ready - started) * 1000}}
+if {http}:
+    client = app.test_client()
+    client.get('/api/')
+    timings['first_request_ms'] = (time.perf_counter() - ready) * 1000
+    if {docs}:
+        spec_started = time.perf_counter()
+        client.get('/swagger.json')
+        timings['spec_ms'] = (time.perf_counter() - spec_started) * 1000
+print(json.dumps(timings))
+'''
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_child(http, docs, *python_options):
+    """Start an interpreter on CHILD; return its timings and stderr."""
+    result = subprocess.run(
+        [sys.executable, *python_options, '-c',
+         CHILD.format(http=http, docs=docs)],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def import_profile(stderr, top):
+    """Print the slowest imports of a python -X importtime report."""
+    own = Counter()
+    packages = Counter()
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        own[name] += int(self_us)
+        packages[name.split('.')[0]] += int(self_us)
+    total = sum(own.values())
+    print('\nimport time: {:.1f} ms in {} modules'.format(total / 1000,
+                                                        len(own)))
+    print('{:>40} {:>10}'.format('package', 'ms'))
+    for name, self_us in packages.most_common(top):
+        print('{:>40} {:>10.1f}'.format(name, self_us / 1000))
+    print('{:>40} {:>10}'.format('module (own time)', 'ms'))
+    for name, self_us in own.most_common(top):
+        print('{:>40} {:>10.1f}'.format(name[-40:], self_us / 1000))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--runs', type=int, default=7,
+                        help='fresh interpreters started per mode')
+    parser.add_argument('--budget-ms', type=float,
+                        help='median budget of every mode, instead of '
+                             'STARTUP_BUDGET_MS')
+    parser.add_argument('--profile', action='store_true',
+                        help='print an import-time profile of the full app')
+    parser.add_argument('--top', type=int, default=15,
+                        help='modules listed by --profile')
+    args = parser.parse_args()
+
+    over_budget = []
+    print('{:>18} {:>10} {:>10} {:>10} {:>10} {:>10}'.format(
+        'mode', 'ready p50', 'ready max', 'budget', '1st req', 'spec'))
+    for mode, (http, docs) in MODES.items():
+        runs = [run_child(http, docs)[0] for _ in range(args.runs)]
+        ready = [run['ready_ms'] for run in runs]
+        budget = (args.budget_ms if args.budget_ms is not None
+                  else STARTUP_BUDGET_MS[mode])
+
+        def median_of(key):
+            values = [run[key] for run in runs if key in run]
+            return ('{:.1f}'.format(statistics.median(values)) if values
+                    else '-')
+
+        print('{:>18} {:>10.1f} {:>10.1f} {:>10.0f} {:>10} {:>10}'.format(
+            mode, statistics.median(ready), max(ready), budget,
+            median_of('first_request_ms'), median_of('spec_ms')))
+        if statistics.median(ready) > budget:
+            over_budget.append(mode)
+
+    if args.profile:
+        _, stderr = run_child(True, True, '-X', 'importtime')
+        import_profile(stderr, args.top)
+
+    if over_budget:
+        print('\nOver budget: {}'.format(', '.join(over_budget)))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -21,6 +21,62 @@ class Config:
     # Debug mode disabled by default for security
     DEBUG = False
 
+    # Maximum number of serialized place detail payloads kept in memory
+    # Set to 0 to disable the place detail cache
+    PLACE_CACHE_SIZE = int(os.getenv('PLACE_CACHE_SIZE', '1024'))
+
+    # Maximum number of items accepted by one batch create request
+    BATCH_MAX_ITEMS = int(os.getenv('BATCH_MAX_ITEMS', '500'))
+
+    # Commit once per API request (rolled back on 4xx/5xx responses)
+    # instead of once per repository write; set to 0 to disable
+    UNIT_OF_WORK = os.getenv('UNIT_OF_WORK', '1') not in ('0', 'false', 'False')
+
+    # Threads hashing and verifying passwords with bcrypt (0 runs inline)
+    # and how many password jobs may wait before requests get a 503
+    PASSWORD_POOL_WORKERS = int(os.getenv('PASSWORD_POOL_WORKERS', '4'))
+    PASSWORD_POOL_MAX_QUEUE = int(os.getenv('PASSWORD_POOL_MAX_QUEUE', '32'))
+    PASSWORD_POOL_RETRY_AFTER = 1
+
+    # PRAGMA name -> value run on every new SQLite connection (none by
+    # default, see ProductionConfig)
+    SQLITE_PRAGMAS = {}
+
+    # Optional read replica (a copy of the database kept in sync outside
+    # the app) serving repository reads until a request writes
+    SQLALCHEMY_READ_REPLICA_URI = os.getenv('SQLALCHEMY_READ_REPLICA_URI')
+
+    # Compress JSON and text responses (br when brotli is installed, gzip
+    # or deflate otherwise) from COMPRESS_MIN_SIZE bytes; streamed lists
+    # are compressed whatever their size
+    COMPRESS_ENABLED = os.getenv('COMPRESS_ENABLED', '1') not in ('0', 'false',
+                                                                  'False')
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', '1024'))
+    COMPRESS_LEVEL = 6
+    COMPRESS_MIMETYPES = {'application/json', 'text/html', 'text/plain',
+                          'text/css', 'application/javascript'}
+
+    # Request and SQL metrics served at /api/metrics; requests and SQL
+    # statements slower than these thresholds are logged
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', '1') not in ('0', 'false',
+                                                                'False')
+    SLOW_REQUEST_MS = int(os.getenv('SLOW_REQUEST_MS', '500'))
+    SLOW_QUERY_MS = int(os.getenv('SLOW_QUERY_MS', '100'))
+    # Send X-DB-Query-Count and X-DB-Time-Ms headers on every response
+    METRICS_QUERY_HEADER = False
+    # Serve /api/metrics without authentication (admin access token
+    # required otherwise), e.g. for a scraper on a private network
+    METRICS_PUBLIC = os.getenv('METRICS_PUBLIC', '0') not in ('0', 'false',
+                                                             'False')
+
+    # Unpaginated lists longer than this are encoded and sent in chunks
+    # instead of being built as one JSON document
+    JSON_STREAM_MIN_ITEMS = int(os.getenv('JSON_STREAM_MIN_ITEMS', '1000'))
+
+    # Serve the Swagger UI at /api/v1/ and its spec at /swagger.json (the
+    # spec is built on its first request); set to 0 to skip both
+    API_DOCS = os.getenv('API_DOCS', '1') not in ('0', 'false', 'False')
+
 
 class DevelopmentConfig(Config):
     """Development environment configuration.
@@ -31,6 +87,11 @@ class DevelopmentConfig(Config):
     # Enable debug mode for detailed error messages during development
     DEBUG = True
     
+    # Report each response's SQL statement count in X-DB-Query-Count
+    METRICS_QUERY_HEADER = True
+    # Let anyone read /api/metrics
+    METRICS_PUBLIC = True
+
     # SQLite database URI for local development
     # Creates a file named 'development.db' in the instance folder
     SQLALCHEMY_DATABASE_URI = 'sqlite:///development.db'
@@ -40,9 +101,46 @@ class DevelopmentConfig(Config):
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
 
+class ProductionConfig(Config):
+    """Production environment configuration.
+    
+    Uses DATABASE_URL (a SQLite file by default) with a sized connection
+    pool and, on SQLite, connection pragmas suited to a multi-threaded
+    server: WAL so readers never wait for the writer, a busy timeout so
+    concurrent writers queue instead of failing, a larger page cache,
+    memory-mapped reads and enforced foreign keys (so the ON DELETE
+    CASCADE clauses of the schema run).
+    """
+    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL',
+                                        'sqlite:///production.db')
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Connections kept open, extra connections allowed under load, how
+    # long a request waits for one, and recycling of old connections
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', '10')),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', '20')),
+        'pool_timeout': 30,
+        'pool_recycle': 1800,
+        'pool_pre_ping': True
+    }
+
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        # Durable at each WAL checkpoint; safe against corruption in WAL
+        'synchronous': 'NORMAL',
+        'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000')),
+        # Negative values are in KiB: 64 MiB of page cache per connection
+        'cache_size': -64000,
+        'mmap_size': 256 * 1024 * 1024,
+        'foreign_keys': 'ON'
+    }
+
+
 # Configuration dictionary mapping environment names to config classes
 # Used by the application factory to select the appropriate configuration
 config = {
     'development': DevelopmentConfig,
+    'production': ProductionConfig,
     'default': DevelopmentConfig
 }
@@ -1,23 +1,53 @@
 #!/usr/bin/env python3
 """Database initialization script.
 
-This script creates all database tables defined in the application models.
-It should be run once before starting the application for the first time,
-or whenever new models are added to the application.
+This script brings the database up to date: it creates the tables and
+indexes defined in the application models (including indexes added to
+existing tables), backfills the normalized email column of existing
+users and loads the sample data of sql/insert_data.sql into an empty
+database, then computes the rating aggregates and the full-text search
+index of the loaded places.
+
+Everything runs in one transaction, and the checksum of the schema and
+of each seed file is recorded in the bootstrap_checksums table: running
+the script again on an up-to-date database does nothing, so it is cheap
+enough to run before every start of the application.
 
 Usage:
     python init_db.py
 """
-from app import create_app, db
+import os
+import sys
+import time
+
+from app import create_app
+from app.persistence.bootstrap import BootstrapError, bootstrap
+from config import config
 
 if __name__ == '__main__':
     # Create application instance to access database configuration
-    app = create_app()
-    
+    # HBNB_ENV selects the configuration, as in run.py; the HTTP layer is
+    # not needed, which keeps the startup short
+    app = create_app(config[os.getenv('HBNB_ENV', 'default')], http=False)
+
     # Push application context to make app and db available
     # This is required for SQLAlchemy operations outside of request handlers
     with app.app_context():
-        # Create all tables defined in models that inherit from db.Model
-        # This reads the model definitions and generates corresponding SQL
-        db.create_all()
-        print('Database tables created successfully!')
+        started = time.perf_counter()
+        try:
+            steps, conflicts = bootstrap()
+        except BootstrapError as error:
+            print('Database not initialized: {}'.format(error))
+            sys.exit(1)
+
+        for step, outcome, seconds in steps:
+            print('{:<16} {} ({:.1f} ms)'.format(step, outcome,
+                                                 seconds * 1000))
+        for email, user_ids in conflicts.items():
+            print('Conflict: {} is used by users {}'.format(
+                email, ', '.join(user_ids)))
+        if conflicts:
+            print('Unique index on email_normalized not created, merge the '
+                  'conflicting accounts and run this script again.')
+        print('Database ready in {:.1f} ms.'.format(
+            (time.perf_counter() - started) * 1000))
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""Rating aggregates rebuild script.
+
+This script recomputes the review count, rating sum, average rating and
+rating histogram stored on every place from the reviews table, after
+adding these columns to databases created before them. Run it once
+after upgrading an existing database, or whenever the aggregates need to
+be repaired (e.g. after editing reviews directly in SQL).
+
+Usage:
+    python rebuild_ratings.py
+"""
+import os
+
+from app import create_app
+from app.services import get_facade
+from config import config
+
+if __name__ == '__main__':
+    # Create application instance to access database configuration
+    # HBNB_ENV selects the configuration, as in run.py
+    app = create_app(config[os.getenv('HBNB_ENV', 'default')], http=False)
+
+    # Push application context to make app and db available
+    with app.app_context():
+        updated = get_facade().rebuild_rating_aggregates()
+        print('Rating aggregates rebuilt for {} places.'.format(updated))
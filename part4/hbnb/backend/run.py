@@ -4,12 +4,16 @@
 This module serves as the main entry point for the HBnB Evolution application.
 It creates and runs the Flask application instance.
 """
+import os
+
 from app import create_app
+from config import config
 
 # Create the Flask application instance using the factory pattern
-app = create_app()
+# HBNB_ENV selects the configuration (development or production)
+app = create_app(config[os.getenv('HBNB_ENV', 'default')])
 
 if __name__ == '__main__':
-    # Run the application in debug mode for development
+    # Run the application, in debug mode for development
     # Debug mode provides detailed error messages and auto-reloading
-    app.run(debug=True)
+    app.run(debug=app.config['DEBUG'])
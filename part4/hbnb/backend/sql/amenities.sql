@@ -1,7 +1,13 @@
 -- Create amenities table
-CREATE TABLE IF NOT EXISTS amenities (
-    id CHAR(36) PRIMARY KEY,
-    name VARCHAR(255) UNIQUE,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+CREATE TABLE amenities (
+    name VARCHAR(50) NOT NULL,
+    id VARCHAR(36) NOT NULL,
+    created_at DATETIME,
+    updated_at DATETIME,
+    PRIMARY KEY (id),
+    UNIQUE (name)
 );
+
+-- Indexes
+CREATE INDEX ix_amenities_created_at_id ON amenities (created_at, id);
+CREATE INDEX ix_amenities_updated_at ON amenities (updated_at);
@@ -1,12 +1,13 @@
 -- Insert initial data into the database
 
 -- Insert Administrator User - Using bcrypt-generator.com for hash bcrypt2 the password
-INSERT INTO users (id, first_name, last_name, email, password, is_admin, created_at, updated_at)
+INSERT INTO users (id, first_name, last_name, email, email_normalized, password, is_admin, created_at, updated_at)
 VALUES (
     '36c9050e-ddd3-4c3b-9731-9f487208bbc1',
     'Admin',
     'HBnB',
     'admin@hbnb.io',
+    'admin@hbnb.io',
     '$2b$12$6D/A418HGqInNHr.syUNf.HAyxcK6Uz2FB4yuiOQwSpytaoD48TTG',
     TRUE,
     CURRENT_TIMESTAMP,
@@ -14,12 +15,13 @@ VALUES (
 );
 
 -- Insert Maria Garcia - password: test_user1234
-INSERT INTO users (id, first_name, last_name, email, password, is_admin, created_at, updated_at)
+INSERT INTO users (id, first_name, last_name, email, email_normalized, password, is_admin, created_at, updated_at)
 VALUES (
     '550e8400-e29b-41d4-a716-446655440000',
     'Maria',
     'Garcia',
     'maria.garcia@example.com',
+    'maria.garcia@example.com',
     '$2b$12$N6HuyLoIbmo0xQgILZdJLeYyYUtLPi9CausIFTzg1krsOKz6h1H6u',
     FALSE,
     CURRENT_TIMESTAMP,
@@ -27,12 +29,13 @@ VALUES (
 );
 
 -- Insert Yuki Tanaka - password: yuki_pass2024
-INSERT INTO users (id, first_name, last_name, email, password, is_admin, created_at, updated_at)
+INSERT INTO users (id, first_name, last_name, email, email_normalized, password, is_admin, created_at, updated_at)
 VALUES (
     '7f8e9d0c-1b2a-3c4d-5e6f-7a8b9c0d1e2f',
     'Yuki',
     'Tanaka',
     'yuki.tanaka@example.com',
+    'yuki.tanaka@example.com',
     '$2b$12$8K5BoJ0MfXqN.zTvW1YxHuV3pL9sC2jD4nE6mF7gH8iJ9kL0mN1oP',
     FALSE,
     CURRENT_TIMESTAMP,
@@ -47,23 +50,24 @@ VALUES
     ('32561383-c728-4ba3-9fd2-cb7ceab79fca', 'Air Conditioning', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP);
 
 -- Insert Initial Places
-INSERT INTO places (id, title, description, price, latitude, longitude, owner_id, created_at, updated_at)
+-- Rating aggregates start at zero, init_db.py computes them from the reviews below
+INSERT INTO places (id, title, description, price, latitude, longitude, owner_id, review_count, rating_sum, rating_1_count, rating_2_count, rating_3_count, rating_4_count, rating_5_count, created_at, updated_at)
 VALUES 
     -- Admin's properties (luxury & premium)
-    ('a1b2c3d4-e5f6-7890-abcd-ef1234567890', 'Apartment Cosy Nice', 'Beautiful apartment in Nice with sea view', 90.00, 43.7102, 7.2620, '36c9050e-ddd3-4c3b-9731-9f487208bbc1', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP),
-    ('e5f6a7b8-c9d0-1234-ef12-345678901234', 'Luxury Villa Cannes', 'Exclusive villa with private pool and sea view', 350.00, 43.5528, 7.0174, '36c9050e-ddd3-4c3b-9731-9f487208bbc1', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP),
-    ('a7b8c9d0-e1f2-3456-1234-567890123456', 'Penthouse Monaco', 'Stunning penthouse with panoramic views', 500.00, 43.7384, 7.4246, '36c9050e-ddd3-4c3b-9731-9f487208bbc1', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP),
-    ('c3d4e5f6-a7b8-9012-cdef-123456789012', 'Apartment Cosy Paris', 'Modern apartment in the heart of Paris', 120.00, 48.8566, 2.3522, '36c9050e-ddd3-4c3b-9731-9f487208bbc1', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP),
+    ('a1b2c3d4-e5f6-7890-abcd-ef1234567890', 'Apartment Cosy Nice', 'Beautiful apartment in Nice with sea view', 90.00, 43.7102, 7.2620, '36c9050e-ddd3-4c3b-9731-9f487208bbc1', 0, 0, 0, 0, 0, 0, 0, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP),
+    ('e5f6a7b8-c9d0-1234-ef12-345678901234', 'Luxury Villa Cannes', 'Exclusive villa with private pool and sea view', 350.00, 43.5528, 7.0174, '36c9050e-ddd3-4c3b-9731-9f487208bbc1', 0, 0, 0, 0, 0, 0, 0, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP),
+    ('a7b8c9d0-e1f2-3456-1234-567890123456', 'Penthouse Monaco', 'Stunning penthouse with panoramic views', 500.00, 43.7384, 7.4246, '36c9050e-ddd3-4c3b-9731-9f487208bbc1', 0, 0, 0, 0, 0, 0, 0, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP),
+    ('c3d4e5f6-a7b8-9012-cdef-123456789012', 'Apartment Cosy Paris', 'Modern apartment in the heart of Paris', 120.00, 48.8566, 2.3522, '36c9050e-ddd3-4c3b-9731-9f487208bbc1', 0, 0, 0, 0, 0, 0, 0, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP),
     
     -- Maria Garcia's properties (mid-range)
-    ('b2c3d4e5-f6a7-8901-bcde-f12345678901', 'Apartment Cosy Fréjus', 'Charming apartment in Fréjus near the beach', 75.00, 43.4332, 6.7369, '550e8400-e29b-41d4-a716-446655440000', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP),
-    ('b8c9d0e1-f2a3-4567-2345-678901234567', 'Charming Flat Bordeaux', 'Beautiful flat in historic district', 65.00, 44.8378, -0.5792, '550e8400-e29b-41d4-a716-446655440000', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP),
-    ('d0e1f2a3-b4c5-6789-4567-890123456789', 'Beachfront Apartment Biarritz', 'Direct access to the beach', 95.00, 43.4832, -1.5586, '550e8400-e29b-41d4-a716-446655440000', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP),
+    ('b2c3d4e5-f6a7-8901-bcde-f12345678901', 'Apartment Cosy Fréjus', 'Charming apartment in Fréjus near the beach', 75.00, 43.4332, 6.7369, '550e8400-e29b-41d4-a716-446655440000', 0, 0, 0, 0, 0, 0, 0, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP),
+    ('b8c9d0e1-f2a3-4567-2345-678901234567', 'Charming Flat Bordeaux', 'Beautiful flat in historic district', 65.00, 44.8378, -0.5792, '550e8400-e29b-41d4-a716-446655440000', 0, 0, 0, 0, 0, 0, 0, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP),
+    ('d0e1f2a3-b4c5-6789-4567-890123456789', 'Beachfront Apartment Biarritz', 'Direct access to the beach', 95.00, 43.4832, -1.5586, '550e8400-e29b-41d4-a716-446655440000', 0, 0, 0, 0, 0, 0, 0, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP),
     
     -- Yuki Tanaka's properties (budget & eco-friendly)
-    ('d4e5f6a7-b8c9-0123-def1-234567890123', 'Budget Studio Marseille', 'Affordable studio near the old port', 45.00, 43.2965, 5.3698, '7f8e9d0c-1b2a-3c4d-5e6f-7a8b9c0d1e2f', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP),
-    ('f6a7b8c9-d0e1-2345-f123-456789012345', 'Cozy Room Lyon', 'Small room in city center, perfect for solo travelers', 35.00, 45.7640, 4.8357, '7f8e9d0c-1b2a-3c4d-5e6f-7a8b9c0d1e2f', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP),
-    ('c9d0e1f2-a3b4-5678-3456-789012345678', 'Tiny House Toulouse', 'Eco-friendly tiny house with garden', 55.00, 43.6047, 1.4442, '7f8e9d0c-1b2a-3c4d-5e6f-7a8b9c0d1e2f', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP);
+    ('d4e5f6a7-b8c9-0123-def1-234567890123', 'Budget Studio Marseille', 'Affordable studio near the old port', 45.00, 43.2965, 5.3698, '7f8e9d0c-1b2a-3c4d-5e6f-7a8b9c0d1e2f', 0, 0, 0, 0, 0, 0, 0, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP),
+    ('f6a7b8c9-d0e1-2345-f123-456789012345', 'Cozy Room Lyon', 'Small room in city center, perfect for solo travelers', 35.00, 45.7640, 4.8357, '7f8e9d0c-1b2a-3c4d-5e6f-7a8b9c0d1e2f', 0, 0, 0, 0, 0, 0, 0, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP),
+    ('c9d0e1f2-a3b4-5678-3456-789012345678', 'Tiny House Toulouse', 'Eco-friendly tiny house with garden', 55.00, 43.6047, 1.4442, '7f8e9d0c-1b2a-3c4d-5e6f-7a8b9c0d1e2f', 0, 0, 0, 0, 0, 0, 0, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP);
 
 -- Insert Place-Amenity associations
 INSERT INTO place_amenity (place_id, amenity_id)
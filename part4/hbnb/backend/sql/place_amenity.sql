@@ -1,8 +1,11 @@
 -- Create place_amenity junction table (many-to-many relationship)
-CREATE TABLE IF NOT EXISTS place_amenity (
-    place_id CHAR(36),
-    amenity_id CHAR(36),
+CREATE TABLE place_amenity (
+    place_id VARCHAR(36) NOT NULL,
+    amenity_id VARCHAR(36) NOT NULL,
     PRIMARY KEY (place_id, amenity_id),
-    FOREIGN KEY (place_id) REFERENCES places(id) ON DELETE CASCADE,
-    FOREIGN KEY (amenity_id) REFERENCES amenities(id) ON DELETE CASCADE
+    FOREIGN KEY(place_id) REFERENCES places (id),
+    FOREIGN KEY(amenity_id) REFERENCES amenities (id)
 );
+
+-- Indexes
+CREATE INDEX idx_place_amenity_amenity_id ON place_amenity (amenity_id, place_id);
@@ -1,13 +1,32 @@
 -- Create places table
-CREATE TABLE IF NOT EXISTS places (
-    id CHAR(36) PRIMARY KEY,
-    title VARCHAR(255),
-    description TEXT,
-    price DECIMAL(10, 2),
-    latitude FLOAT,
-    longitude FLOAT,
-    owner_id CHAR(36),
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-    FOREIGN KEY (owner_id) REFERENCES users(id) ON DELETE CASCADE
+CREATE TABLE places (
+    owner_id VARCHAR(36),
+    title VARCHAR(50) NOT NULL,
+    description VARCHAR,
+    price FLOAT NOT NULL,
+    latitude FLOAT NOT NULL,
+    longitude FLOAT NOT NULL,
+    review_count INTEGER NOT NULL,
+    rating_sum INTEGER NOT NULL,
+    rating_1_count INTEGER NOT NULL,
+    rating_2_count INTEGER NOT NULL,
+    rating_3_count INTEGER NOT NULL,
+    rating_4_count INTEGER NOT NULL,
+    rating_5_count INTEGER NOT NULL,
+    rating_avg FLOAT,
+    id VARCHAR(36) NOT NULL,
+    created_at DATETIME,
+    updated_at DATETIME,
+    PRIMARY KEY (id),
+    FOREIGN KEY(owner_id) REFERENCES users (id) ON DELETE CASCADE
 );
+
+-- Indexes
+CREATE INDEX idx_places_lat_lng ON places (latitude, longitude);
+CREATE INDEX ix_places_created_at_id ON places (created_at, id);
+CREATE INDEX ix_places_price ON places (price);
+CREATE INDEX ix_places_rating_avg ON places (rating_avg);
+CREATE INDEX ix_places_updated_at ON places (updated_at);
+
+-- SQLite only: full-text index of places, filled by the application
+-- CREATE VIRTUAL TABLE IF NOT EXISTS places_fts USING fts5(place_id, title, description, reviews, tokenize='unicode61 remove_diacritics 2');
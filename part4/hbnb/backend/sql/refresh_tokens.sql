@@ -0,0 +1,14 @@
+-- Create refresh_tokens table
+CREATE TABLE refresh_tokens (
+    jti VARCHAR(36) NOT NULL,
+    family_id VARCHAR(36) NOT NULL,
+    user_id VARCHAR(36) NOT NULL,
+    expires_at DATETIME NOT NULL,
+    used BOOLEAN NOT NULL,
+    PRIMARY KEY (jti),
+    FOREIGN KEY(user_id) REFERENCES users (id) ON DELETE CASCADE
+);
+
+-- Indexes
+CREATE INDEX ix_refresh_tokens_expires_at ON refresh_tokens (expires_at);
+CREATE INDEX ix_refresh_tokens_family_id ON refresh_tokens (family_id);
@@ -1,13 +1,19 @@
 -- Create reviews table
-CREATE TABLE IF NOT EXISTS reviews (
-    id CHAR(36) PRIMARY KEY,
-    text TEXT,
-    rating INT CHECK (rating >= 1 AND rating <= 5),
-    user_id CHAR(36),
-    place_id CHAR(36),
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-    UNIQUE (user_id, place_id),
-    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
-    FOREIGN KEY (place_id) REFERENCES places(id) ON DELETE CASCADE
+CREATE TABLE reviews (
+    text TEXT NOT NULL,
+    rating INTEGER NOT NULL,
+    place_id VARCHAR(36),
+    user_id VARCHAR(36),
+    id VARCHAR(36) NOT NULL,
+    created_at DATETIME,
+    updated_at DATETIME,
+    PRIMARY KEY (id),
+    CONSTRAINT unique_user_place UNIQUE (user_id, place_id),
+    FOREIGN KEY(place_id) REFERENCES places (id) ON DELETE CASCADE,
+    FOREIGN KEY(user_id) REFERENCES users (id) ON DELETE CASCADE
 );
+
+-- Indexes
+CREATE INDEX ix_reviews_created_at_id ON reviews (created_at, id);
+CREATE INDEX ix_reviews_place_id ON reviews (place_id);
+CREATE INDEX ix_reviews_updated_at ON reviews (updated_at);
@@ -1,11 +1,19 @@
 -- Create users table
-CREATE TABLE IF NOT EXISTS users (
-    id CHAR(36) PRIMARY KEY,
-    first_name VARCHAR(255),
-    last_name VARCHAR(255),
-    email VARCHAR(255) UNIQUE,
-    password VARCHAR(255),
-    is_admin BOOLEAN DEFAULT FALSE,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+CREATE TABLE users (
+    first_name VARCHAR(50) NOT NULL,
+    last_name VARCHAR(50) NOT NULL,
+    email VARCHAR(120) NOT NULL,
+    email_normalized VARCHAR(120) NOT NULL,
+    password VARCHAR(128) NOT NULL,
+    is_admin BOOLEAN,
+    id VARCHAR(36) NOT NULL,
+    created_at DATETIME,
+    updated_at DATETIME,
+    PRIMARY KEY (id),
+    UNIQUE (email)
 );
+
+-- Indexes
+CREATE INDEX ix_users_created_at_id ON users (created_at, id);
+CREATE UNIQUE INDEX ix_users_email_normalized ON users (email_normalized);
+CREATE INDEX ix_users_updated_at ON users (updated_at);
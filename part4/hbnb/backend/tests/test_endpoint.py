@@ -133,6 +133,24 @@ class TestEndpointsValidation(unittest.TestCase):
         response = self.client.get('/api/v1/auth/protected')
         self.assertEqual(response.status_code, 401)
 
+    def test_jwt_errors_without_debug(self):
+        """Test JWT errors answer 401/422 when exceptions do not propagate"""
+        from config import DevelopmentConfig
+
+        class NoDebugConfig(DevelopmentConfig):
+            SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+            DEBUG = False
+
+        app = create_app(NoDebugConfig)
+        self.assertIsNone(app.config['PROPAGATE_EXCEPTIONS'])
+        client = app.test_client()
+        response = client.get('/api/v1/auth/protected')
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('X-DB-Query-Count', response.headers)
+        response = client.get('/api/v1/auth/protected',
+                              headers={'Authorization': 'Bearer not-a-jwt'})
+        self.assertEqual(response.status_code, 422)
+
     def test_protected_endpoint_with_valid_token(self):
         """Test accessing protected endpoint with valid JWT token"""
         user_id, token = self._create_user_and_login("protected@example.com")
@@ -1076,5 +1094,1235 @@ class TestEndpointsValidation(unittest.TestCase):
         self.assertIsInstance(data, list)
 
 
+    # ========================================================================
+    # GEOSPATIAL SEARCH TESTS - Radius and bounding-box queries
+    # ========================================================================
+
+    def _create_place_at(self, token, title, latitude, longitude):
+        """Helper method to create a place at the given coordinates"""
+        response = self.client.post('/api/v1/places/',
+                                    headers={'Authorization': f'Bearer {token}'},
+                                    json={
+                                        "title": title,
+                                        "price": 100.0,
+                                        "latitude": latitude,
+                                        "longitude": longitude
+                                    })
+        self.assertEqual(response.status_code, 201)
+        return response.get_json()['id']
+
+    def test_places_nearby_radius(self):
+        """Test radius search returns only close places, nearest first"""
+        user_id, token = self._create_user_and_login("geo1@example.com")
+        nice = self._create_place_at(token, "Geo Nice", 43.7102, 7.2620)
+        monaco = self._create_place_at(token, "Geo Monaco", 43.7384, 7.4246)
+        self._create_place_at(token, "Geo Paris", 48.8566, 2.3522)
+
+        response = self.client.get(
+            '/api/v1/places/nearby?lat=43.70&lng=7.25&radius_km=25')
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual([place['id'] for place in data], [nice, monaco])
+        self.assertLessEqual(data[0]['distance_km'], data[1]['distance_km'])
+
+    def test_places_nearby_bbox(self):
+        """Test bounding-box search, including across the antimeridian"""
+        user_id, token = self._create_user_and_login("geo2@example.com")
+        fiji = self._create_place_at(token, "Geo Fiji", -17.7, 178.0)
+        samoa = self._create_place_at(token, "Geo Samoa", -13.8, -172.0)
+        self._create_place_at(token, "Geo Lima", -12.0, -77.0)
+
+        response = self.client.get(
+            '/api/v1/places/nearby?bbox=170,-20,-170,-10')
+        self.assertEqual(response.status_code, 200)
+        ids = {place['id'] for place in response.get_json()}
+        self.assertEqual(ids, {fiji, samoa})
+
+    def test_places_nearby_limit(self):
+        """Test both searches stop at limit, nearest or most reviewed first"""
+        owner_id, owner_token = self._create_user_and_login("geo3@example.com")
+        reviewer_id, reviewer_token = self._create_user_and_login("geo4@example.com")
+        near = self._create_place_at(owner_token, "Geo Near", 30.01, 30.01)
+        reviewed = self._create_place_at(owner_token, "Geo Reviewed", 30.2, 30.2)
+        self._create_place_at(owner_token, "Geo Far", 30.1, 30.1)
+        self._post_review(reviewer_token, reviewed, 4)
+
+        response = self.client.get(
+            '/api/v1/places/nearby?lat=30&lng=30&radius_km=50&limit=1')
+        self.assertEqual([place['id'] for place in response.get_json()],
+                         [near])
+        response = self.client.get(
+            '/api/v1/places/nearby?bbox=29,29,31,31&limit=1')
+        self.assertEqual([place['id'] for place in response.get_json()],
+                         [reviewed])
+
+    def test_places_nearby_invalid_parameters(self):
+        """Test radius and bbox searches reject invalid parameters"""
+        invalid_queries = [
+            'lat=43.7&lng=7.2',
+            'lat=abc&lng=7.2&radius_km=5',
+            'lat=95&lng=7.2&radius_km=5',
+            'lat=43.7&lng=7.2&radius_km=-1',
+            'lat=43.7&lng=7.2&radius_km=1000',
+            'lat=43.7&lng=7.2&radius_km=5&limit=0',
+            'bbox=1,2,3',
+            'bbox=0,10,5,0',
+            'bbox=0,0,5,5&limit=501',
+            'bbox=0,0,5,5&limit=many',
+        ]
+        for query in invalid_queries:
+            with self.subTest(query=query):
+                response = self.client.get(f'/api/v1/places/nearby?{query}')
+                self.assertEqual(response.status_code, 400)
+
+
+    # ========================================================================
+    # PAGINATION TESTS - Keyset cursors on list endpoints
+    # ========================================================================
+
+    def test_list_places_keyset_pagination(self):
+        """Test walking the place list page by page with cursors"""
+        user_id, token = self._create_user_and_login("pager@example.com")
+        created = [self._create_place_at(token, f"Paged Place {i}", 10.0, 10.0)
+                   for i in range(5)]
+
+        seen = []
+        url = '/api/v1/places/?limit=2'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            page = response.get_json()
+            self.assertLessEqual(len(page), 2)
+            seen.extend(place['id'] for place in page)
+            cursor = response.headers.get('X-Next-Cursor')
+            self.assertEqual('Link' in response.headers, cursor is not None)
+            url = f'/api/v1/places/?limit=2&cursor={cursor}' if cursor else None
+
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertEqual(sorted(seen), sorted(created))
+
+    def test_list_without_pagination_returns_everything(self):
+        """Test list endpoints keep returning the full list by default"""
+        user_id, token = self._create_user_and_login("nopager@example.com")
+        for i in range(3):
+            self._create_place_at(token, f"Unpaged Place {i}", 10.0, 10.0)
+
+        response = self.client.get('/api/v1/places/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.get_json()), 3)
+        self.assertNotIn('X-Next-Cursor', response.headers)
+
+    def test_list_invalid_pagination_parameters(self):
+        """Test invalid limit or cursor values return 400"""
+        for endpoint in ['/api/v1/places/', '/api/v1/users/',
+                         '/api/v1/reviews/', '/api/v1/amenities/']:
+            for query in ['limit=0', 'limit=abc', 'limit=100000',
+                          'cursor=not-a-cursor']:
+                with self.subTest(endpoint=endpoint, query=query):
+                    response = self.client.get(f'{endpoint}?{query}')
+                    self.assertEqual(response.status_code, 400)
+
+
+    # ========================================================================
+    # RATING AGGREGATE TESTS - Incrementally maintained place ratings
+    # ========================================================================
+
+    def _post_review(self, token, place_id, rating):
+        """Helper method to create a review and return its id"""
+        response = self.client.post('/api/v1/reviews/',
+                                    headers={'Authorization': f'Bearer {token}'},
+                                    json={
+                                        "text": "Rated stay",
+                                        "rating": rating,
+                                        "place_id": place_id
+                                    })
+        self.assertEqual(response.status_code, 201)
+        return response.get_json()['id']
+
+    def test_place_rating_aggregates_follow_reviews(self):
+        """Test average, count and histogram follow review create/delete"""
+        owner_id, owner_token = self._create_user_and_login("ratedowner@example.com")
+        first_id, first_token = self._create_user_and_login("rater1@example.com")
+        second_id, second_token = self._create_user_and_login("rater2@example.com")
+        place_id = self._create_place_at(owner_token, "Rated Place", 10.0, 10.0)
+
+        response = self.client.get(f'/api/v1/places/{place_id}')
+        data = response.get_json()
+        self.assertIsNone(data['average_rating'])
+        self.assertEqual(data['review_count'], 0)
+
+        first_review = self._post_review(first_token, place_id, 5)
+        self._post_review(second_token, place_id, 2)
+
+        data = self.client.get(f'/api/v1/places/{place_id}').get_json()
+        self.assertEqual(data['review_count'], 2)
+        self.assertEqual(data['average_rating'], 3.5)
+        self.assertEqual(data['rating_distribution'],
+                         {'1': 0, '2': 1, '3': 0, '4': 0, '5': 1})
+
+        listed = self.client.get('/api/v1/places/').get_json()
+        self.assertEqual(listed[0]['average_rating'], 3.5)
+
+        response = self.client.delete(f'/api/v1/reviews/{first_review}',
+                                      headers={'Authorization': f'Bearer {first_token}'})
+        self.assertEqual(response.status_code, 200)
+
+        data = self.client.get(f'/api/v1/places/{place_id}').get_json()
+        self.assertEqual(data['review_count'], 1)
+        self.assertEqual(data['average_rating'], 2.0)
+        self.assertEqual(data['rating_distribution']['5'], 0)
+
+
+    # ========================================================================
+    # LOADER PROFILE TESTS - Constant query count on place detail
+    # ========================================================================
+
+    def _add_direct_reviews(self, place_id, count):
+        """Helper method to add reviews without going through the API"""
+        from app.models.place import PlaceModel
+        from app.models.review import ReviewModel
+        from app.models.user import UserModel
+        import uuid
+        with self.app.app_context():
+            place = db.session.get(PlaceModel, place_id)
+            for _ in range(count):
+                user = UserModel(first_name="Bulk", last_name="Reviewer",
+                                 email=f"bulk-{uuid.uuid4().hex[:8]}@example.com",
+                                 password="x")
+                db.session.add(ReviewModel(text="Direct", rating=4,
+                                           place=place, user=user))
+            db.session.commit()
+        # Bypassing the facade, so drop the cached payload by hand
+        from app.services import facade
+        facade.invalidate_place(place_id)
+
+    def _count_queries(self, url):
+        """Helper method returning (response, number of SQL statements)"""
+        from sqlalchemy import event
+        statements = []
+
+        def listener(*args):
+            statements.append(1)
+
+        with self.app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', listener)
+        try:
+            response = self.client.get(url)
+        finally:
+            event.remove(engine, 'before_cursor_execute', listener)
+        return response, len(statements)
+
+    def test_place_detail_query_count_is_constant(self):
+        """Test place detail does not issue one query per review"""
+        owner_id, token = self._create_user_and_login("profiled@example.com")
+        place_id = self._create_place_at(token, "Profiled Place", 10.0, 10.0)
+
+        self._add_direct_reviews(place_id, 2)
+        response, few = self._count_queries(f'/api/v1/places/{place_id}')
+        self.assertEqual(len(response.get_json()['reviews']), 2)
+
+        self._add_direct_reviews(place_id, 20)
+        response, many = self._count_queries(f'/api/v1/places/{place_id}')
+        self.assertEqual(len(response.get_json()['reviews']), 22)
+        self.assertEqual(few, many)
+
+
+    # ========================================================================
+    # PLACE CACHE TESTS - Read-through cache with write invalidation
+    # ========================================================================
+
+    def test_place_detail_cache_hit_and_invalidation(self):
+        """Test repeated GETs hit the cache and review writes invalidate it"""
+        from app.services import facade
+        owner_id, owner_token = self._create_user_and_login("cachedowner@example.com")
+        reviewer_id, reviewer_token = self._create_user_and_login("cachedreviewer@example.com")
+        place_id = self._create_place_at(owner_token, "Cached Place", 10.0, 10.0)
+
+        first = self.client.get(f'/api/v1/places/{place_id}').get_json()
+        hits = facade.place_cache.stats()['hits']
+        second = self.client.get(f'/api/v1/places/{place_id}').get_json()
+        self.assertEqual(first, second)
+        self.assertEqual(facade.place_cache.stats()['hits'], hits + 1)
+
+        self._post_review(reviewer_token, place_id, 4)
+        data = self.client.get(f'/api/v1/places/{place_id}').get_json()
+        self.assertEqual(len(data['reviews']), 1)
+        self.assertEqual(data['review_count'], 1)
+
+        # Owner names are embedded, so profile updates invalidate too
+        response = self.client.put(f'/api/v1/users/{owner_id}',
+                                   headers={'Authorization': f'Bearer {owner_token}'},
+                                   json={"first_name": "Renamed"})
+        self.assertEqual(response.status_code, 200)
+        data = self.client.get(f'/api/v1/places/{place_id}').get_json()
+        self.assertEqual(data['owner']['first_name'], 'Renamed')
+
+    def test_lru_cache_rejects_stale_writes_and_evicts(self):
+        """Test versioned writes and LRU eviction of the cache"""
+        from app.services.cache import LRUCache
+        cache = LRUCache(maxsize=2)
+
+        version = cache.version('a')
+        cache.invalidate('a')
+        self.assertFalse(cache.set('a', {'stale': True}, version))
+        self.assertIsNone(cache.get('a'))
+
+        for key in ('a', 'b', 'c'):
+            cache.set(key, {'key': key}, cache.version(key))
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('c'), {'key': 'c'})
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+
+    # ========================================================================
+    # CONDITIONAL GET TESTS - ETag and Last-Modified validators
+    # ========================================================================
+
+    def test_place_detail_etag_not_modified(self):
+        """Test a matching If-None-Match returns 304 until a review is added"""
+        owner_id, owner_token = self._create_user_and_login("etagowner@example.com")
+        reviewer_id, reviewer_token = self._create_user_and_login("etagreviewer@example.com")
+        place_id = self._create_place_at(owner_token, "Tagged Place", 5.0, 5.0)
+
+        response = self.client.get(f'/api/v1/places/{place_id}')
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers['ETag']
+        self.assertIn('Last-Modified', response.headers)
+
+        response = self.client.get(f'/api/v1/places/{place_id}',
+                                   headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+        self.assertEqual(response.headers['ETag'], etag)
+
+        self._post_review(reviewer_token, place_id, 5)
+        response = self.client.get(f'/api/v1/places/{place_id}',
+                                   headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+        self.assertEqual(len(response.get_json()['reviews']), 1)
+
+    def test_list_etag_changes_after_create(self):
+        """Test list ETags revalidate and change when an item is added"""
+        owner_id, token = self._create_user_and_login("listetag@example.com")
+        self._create_place_at(token, "First Listed", 1.0, 1.0)
+
+        response = self.client.get('/api/v1/places/')
+        etag = response.headers['ETag']
+        response = self.client.get('/api/v1/places/',
+                                   headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+        # Paginated and full lists are different representations
+        response = self.client.get('/api/v1/places/?limit=1')
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+        self._create_place_at(token, "Second Listed", 2.0, 2.0)
+        response = self.client.get('/api/v1/places/',
+                                   headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_if_modified_since_returns_not_modified(self):
+        """Test If-Modified-Since with the returned Last-Modified value"""
+        user_id, token = self._create_user_and_login("modifiedsince@example.com")
+        response = self.client.get(f'/api/v1/users/{user_id}')
+        last_modified = response.headers['Last-Modified']
+
+        response = self.client.get(f'/api/v1/users/{user_id}',
+                                   headers={'If-Modified-Since': last_modified})
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(
+            f'/api/v1/users/{user_id}',
+            headers={'If-Modified-Since': 'Mon, 01 Jan 2001 00:00:00 GMT'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_ignores_if_modified_since_after_delete(self):
+        """Test a deleted item is not kept through If-Modified-Since"""
+        owner_id, owner_token = self._create_user_and_login("imsowner@example.com")
+        reviewer_id, reviewer_token = self._create_user_and_login("imsreviewer@example.com")
+        place_id = self._create_place_at(owner_token, "Dated Place", 6.0, 6.0)
+        review_id = self._post_review(reviewer_token, place_id, 4)
+
+        for url in ['/api/v1/reviews/', f'/api/v1/places/{place_id}/reviews']:
+            response = self.client.get(url)
+            self.assertNotIn('Last-Modified', response.headers)
+
+        self.client.delete(f'/api/v1/reviews/{review_id}',
+                           headers={'Authorization': f'Bearer {reviewer_token}'})
+        response = self.client.get(
+            '/api/v1/reviews/',
+            headers={'If-Modified-Since': 'Fri, 01 Jan 2100 00:00:00 GMT'})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(review_id,
+                         [review['id'] for review in response.get_json()])
+
+
+    # ========================================================================
+    # BATCH CREATE TESTS - All-or-nothing bulk inserts
+    # ========================================================================
+
+    def _create_admin_and_login(self):
+        """Helper creating an admin directly through the facade"""
+        import uuid
+        from app.services import facade
+        email = f"admin-{uuid.uuid4().hex[:8]}@example.com"
+        with self.app.app_context():
+            facade.create_user({"first_name": "Admin", "last_name": "User",
+                                "email": email, "password": "adminpass",
+                                "is_admin": True})
+        response = self.client.post('/api/v1/auth/login', json={
+            "email": email, "password": "adminpass"})
+        return response.get_json()['access_token']
+
+    def test_place_batch_creates_all_items(self):
+        """Test a valid place batch is inserted and listed"""
+        owner_id, token = self._create_user_and_login("batchowner@example.com")
+        items = [{"title": f"Batch Place {i}", "price": 50 + i,
+                  "latitude": 10.0 + i, "longitude": "20.5"}
+                 for i in range(5)]
+        response = self.client.post('/api/v1/places/batch',
+                                    headers={'Authorization': f'Bearer {token}'},
+                                    json=items)
+        self.assertEqual(response.status_code, 201)
+        created = response.get_json()
+        self.assertEqual([place['title'] for place in created],
+                         [item['title'] for item in items])
+        self.assertTrue(all(place['owner_id'] == owner_id for place in created))
+        self.assertEqual(created[0]['longitude'], 20.5)
+
+        titles = {place['title'] for place in
+                  self.client.get('/api/v1/places/').get_json()}
+        self.assertTrue({item['title'] for item in items} <= titles)
+
+    def test_place_batch_rejects_whole_batch_with_item_errors(self):
+        """Test invalid items are reported by index and nothing is created"""
+        owner_id, token = self._create_user_and_login("batchreject@example.com")
+        self._create_place_at(token, "Existing Batch Title", 1.0, 1.0)
+        items = [
+            {"title": "Fine Batch Place", "price": 80,
+             "latitude": 1.0, "longitude": 1.0},
+            {"title": "Bad Price", "price": -5,
+             "latitude": 1.0, "longitude": 1.0},
+            {"title": "Existing Batch Title", "price": 80,
+             "latitude": 1.0, "longitude": 1.0},
+            {"title": "Fine Batch Place", "price": 90,
+             "latitude": 1.0, "longitude": 1.0},
+        ]
+        response = self.client.post('/api/v1/places/batch',
+                                    headers={'Authorization': f'Bearer {token}'},
+                                    json=items)
+        self.assertEqual(response.status_code, 400)
+        errors = response.get_json()['errors']
+        self.assertEqual([error['index'] for error in errors], [1, 2, 3])
+        self.assertEqual(errors[0]['error'], 'Price must be positive')
+
+        titles = [place['title'] for place in
+                  self.client.get('/api/v1/places/').get_json()]
+        self.assertNotIn("Fine Batch Place", titles)
+
+    def test_review_batch_updates_rating_aggregates(self):
+        """Test a review batch across places keeps aggregates in sync"""
+        owner_id, owner_token = self._create_user_and_login("batchhost@example.com")
+        reviewer_id, reviewer_token = self._create_user_and_login("batchguest@example.com")
+        first = self._create_place_at(owner_token, "Batch Reviewed One", 3.0, 3.0)
+        second = self._create_place_at(owner_token, "Batch Reviewed Two", 4.0, 4.0)
+        headers = {'Authorization': f'Bearer {reviewer_token}'}
+
+        response = self.client.post('/api/v1/reviews/batch', headers=headers,
+                                    json=[{"text": "Great", "rating": 5,
+                                           "place_id": first},
+                                          {"text": "Okay", "rating": 3,
+                                           "place_id": second}])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.get_json()), 2)
+        data = self.client.get(f'/api/v1/places/{first}').get_json()
+        self.assertEqual(data['review_count'], 1)
+        self.assertEqual(data['average_rating'], 5.0)
+
+        # Already reviewed, own place and unknown place are all rejected
+        response = self.client.post('/api/v1/reviews/batch', headers=headers,
+                                    json=[{"text": "Again", "rating": 1,
+                                           "place_id": first},
+                                          {"text": "Nope", "rating": 2,
+                                           "place_id": "missing"}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error['error'] for error in
+                          response.get_json()['errors']],
+                         ['You have already reviewed this place.',
+                          'Place not found'])
+        response = self.client.post(
+            '/api/v1/reviews/batch',
+            headers={'Authorization': f'Bearer {owner_token}'},
+            json=[{"text": "Mine", "rating": 5, "place_id": first}])
+        self.assertEqual(response.get_json()['errors'][0]['error'],
+                         'You cannot review your own place.')
+
+    def test_amenity_batch_requires_admin_and_limits_size(self):
+        """Test amenity batches are admin only and capped in size"""
+        user_id, token = self._create_user_and_login("batchuser@example.com")
+        response = self.client.post('/api/v1/amenities/batch',
+                                    headers={'Authorization': f'Bearer {token}'},
+                                    json=[{"name": "Pool"}])
+        self.assertEqual(response.status_code, 403)
+
+        admin_token = self._create_admin_and_login()
+        headers = {'Authorization': f'Bearer {admin_token}'}
+        response = self.client.post('/api/v1/amenities/batch', headers=headers,
+                                    json=[{"name": " Batch Pool "},
+                                          {"name": "Batch Gym"}])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([amenity['name'] for amenity in response.get_json()],
+                         ["Batch Pool", "Batch Gym"])
+
+        response = self.client.post('/api/v1/amenities/batch', headers=headers,
+                                    json=[{"name": "Batch Pool"}])
+        self.assertEqual(response.get_json()['errors'][0]['error'],
+                         'Amenity already exist')
+
+        self.app.config['BATCH_MAX_ITEMS'] = 2
+        response = self.client.post('/api/v1/amenities/batch', headers=headers,
+                                    json=[{"name": f"Cap {i}"} for i in range(3)])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('more than 2 items', response.get_json()['error'])
+
+
+    # ========================================================================
+    # UNIT OF WORK TESTS - One commit per request, rollback on errors
+    # ========================================================================
+
+    def _count_commits(self, method, url, **kwargs):
+        """Helper returning (response, number of COMMITs) for a request"""
+        from sqlalchemy import event
+        commits = []
+
+        def on_commit(conn):
+            commits.append(1)
+
+        with self.app.app_context():
+            engine = db.engine
+        event.listen(engine, 'commit', on_commit)
+        try:
+            response = getattr(self.client, method)(url, **kwargs)
+        finally:
+            event.remove(engine, 'commit', on_commit)
+        return response, len(commits)
+
+    def test_write_requests_commit_once(self):
+        """Test review creation and place updates commit exactly once"""
+        owner_id, owner_token = self._create_user_and_login("uowowner@example.com")
+        reviewer_id, reviewer_token = self._create_user_and_login("uowreviewer@example.com")
+        place_id = self._create_place_at(owner_token, "Unit Of Work Place", 7.0, 7.0)
+
+        response, commits = self._count_commits(
+            'post', '/api/v1/reviews/',
+            headers={'Authorization': f'Bearer {reviewer_token}'},
+            json={"text": "Nice", "rating": 4, "place_id": place_id})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(commits, 1)
+
+        # Updates used to be left uncommitted; they are now persisted
+        response, commits = self._count_commits(
+            'put', f'/api/v1/places/{place_id}',
+            headers={'Authorization': f'Bearer {owner_token}'},
+            json={"title": "Renamed Unit Of Work Place"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(commits, 1)
+        data = self.client.get(f'/api/v1/places/{place_id}').get_json()
+        self.assertEqual(data['title'], "Renamed Unit Of Work Place")
+        self.assertEqual(data['review_count'], 1)
+
+    def test_error_response_rolls_back_writes(self):
+        """Test writes staged by a request answering 4xx are discarded"""
+        from app.services import facade
+
+        @self.app.route('/api/v1/test-rollback', methods=['POST'])
+        def failing_view():
+            facade.create_amenity({'name': 'Never Committed'})
+            return {'error': 'Rejected after writing'}, 409
+
+        response, commits = self._count_commits('post', '/api/v1/test-rollback')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(commits, 0)
+        with self.app.app_context():
+            self.assertIsNone(facade.get_amenity_by_name('Never Committed'))
+
+
+    # ========================================================================
+    # PASSWORD POOL TESTS - Bounded bcrypt worker pool
+    # ========================================================================
+
+    def test_login_returns_503_when_password_pool_saturated(self):
+        """Test logins are shed with Retry-After while the pool is full"""
+        import threading
+        from app.services import facade
+        user_id, token = self._create_user_and_login("poolbusy@example.com")
+        email = self.client.get(f'/api/v1/users/{user_id}').get_json()['email']
+
+        pool = facade.password_pool
+        pool.configure(workers=1, max_queue=0, retry_after=2)
+        release = threading.Event()
+        blocker = pool.submit(release.wait)
+        try:
+            response = self.client.post('/api/v1/auth/login', json={
+                "email": email, "password": "password123"})
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response.headers['Retry-After'], '2')
+            stats = pool.stats()
+            self.assertEqual(stats['active'], 1)
+            self.assertEqual(stats['rejected'], 1)
+        finally:
+            release.set()
+            blocker.result()
+
+        response = self.client.post('/api/v1/auth/login', json={
+            "email": email, "password": "password123"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(pool.stats()['active'], 0)
+
+    def test_admin_password_change_hashes_on_pool(self):
+        """Test a password set by an admin is hashed and usable for login"""
+        user_id, token = self._create_user_and_login("poolchange@example.com")
+        email = self.client.get(f'/api/v1/users/{user_id}').get_json()['email']
+        admin_token = self._create_admin_and_login()
+
+        response = self.client.put(f'/api/v1/users/{user_id}',
+                                   headers={'Authorization': f'Bearer {admin_token}'},
+                                   json={"password": "changed-secret"})
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post('/api/v1/auth/login', json={
+            "email": email, "password": "password123"})
+        self.assertEqual(response.status_code, 401)
+        response = self.client.post('/api/v1/auth/login', json={
+            "email": email, "password": "changed-secret"})
+        self.assertEqual(response.status_code, 200)
+
+
+    # ========================================================================
+    # REFRESH TOKEN TESTS - Rotation, replay detection and pruning
+    # ========================================================================
+
+    def _login(self, email, password="password123"):
+        """Helper returning the JSON body of a successful login"""
+        response = self.client.post('/api/v1/auth/login', json={
+            "email": email, "password": password})
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()
+
+    def test_refresh_rotates_tokens_without_bcrypt(self):
+        """Test refresh returns a working token pair and skips bcrypt"""
+        from app.services import facade
+        user_id, token = self._create_user_and_login("refresh@example.com")
+        email = self.client.get(f'/api/v1/users/{user_id}').get_json()['email']
+        tokens = self._login(email)
+
+        completed = facade.password_pool.stats()['completed']
+        response = self.client.post(
+            '/api/v1/auth/refresh',
+            headers={'Authorization': f"Bearer {tokens['refresh_token']}"})
+        self.assertEqual(response.status_code, 200)
+        rotated = response.get_json()
+        self.assertNotEqual(rotated['refresh_token'], tokens['refresh_token'])
+        self.assertEqual(facade.password_pool.stats()['completed'], completed)
+
+        response = self.client.get(
+            '/api/v1/auth/protected',
+            headers={'Authorization': f"Bearer {rotated['access_token']}"})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(user_id, response.get_json()['message'])
+
+        # Access tokens are not accepted as refresh tokens
+        response = self.client.post(
+            '/api/v1/auth/refresh',
+            headers={'Authorization': f"Bearer {rotated['access_token']}"})
+        self.assertEqual(response.status_code, 422)
+
+    def test_refresh_token_replay_revokes_session(self):
+        """Test reusing a rotated token revokes its whole login session"""
+        user_id, token = self._create_user_and_login("replay@example.com")
+        email = self.client.get(f'/api/v1/users/{user_id}').get_json()['email']
+        stolen = self._login(email)['refresh_token']
+        other_device = self._login(email)['refresh_token']
+
+        rotated = self.client.post(
+            '/api/v1/auth/refresh',
+            headers={'Authorization': f'Bearer {stolen}'}).get_json()
+        response = self.client.post(
+            '/api/v1/auth/refresh', headers={'Authorization': f'Bearer {stolen}'})
+        self.assertEqual(response.status_code, 401)
+
+        # The revocation was committed although the request answered 401
+        response = self.client.post(
+            '/api/v1/auth/refresh',
+            headers={'Authorization': f"Bearer {rotated['refresh_token']}"})
+        self.assertEqual(response.status_code, 401)
+        # Other login sessions are unaffected
+        response = self.client.post(
+            '/api/v1/auth/refresh',
+            headers={'Authorization': f'Bearer {other_device}'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_login_prunes_expired_refresh_tokens(self):
+        """Test expired refresh tokens are deleted on login"""
+        from datetime import timedelta
+        from app.models.refresh_token import RefreshTokenModel
+        from app.services import facade
+        user_id, token = self._create_user_and_login("prune@example.com")
+        email = self.client.get(f'/api/v1/users/{user_id}').get_json()['email']
+        with self.app.app_context():
+            expired = facade.create_refresh_token(user_id, timedelta(days=-1))
+            expired_jti = expired.jti
+
+        self._login(email)
+        with self.app.app_context():
+            self.assertIsNone(db.session.get(RefreshTokenModel, expired_jti))
+            self.assertEqual(RefreshTokenModel.query.filter_by(
+                user_id=user_id).count(), 2)
+
+
+    # ========================================================================
+    # NORMALIZED EMAIL TESTS - Case-insensitive, indexed email lookups
+    # ========================================================================
+
+    def test_email_lookup_is_case_insensitive(self):
+        """Test signup rejects case variants and login ignores case"""
+        response = self.client.post('/api/v1/users/', json={
+            "first_name": "Case", "last_name": "User",
+            "email": "Case.User@Example.com", "password": "password123"})
+        self.assertEqual(response.status_code, 201)
+
+        response = self.client.post('/api/v1/users/', json={
+            "first_name": "Case", "last_name": "Copy",
+            "email": "case.user@example.COM", "password": "password123"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()['error'],
+                         'Email already registered')
+
+        response = self.client.post('/api/v1/auth/login', json={
+            "email": "CASE.USER@example.com", "password": "password123"})
+        self.assertEqual(response.status_code, 200)
+
+    # ========================================================================
+    # FULL-TEXT SEARCH TESTS - FTS5 index over places and reviews
+    # ========================================================================
+
+    def _create_searchable_place(self, token, title, description):
+        """Helper method to create a place with a description"""
+        response = self.client.post('/api/v1/places/',
+                                    headers={'Authorization': f'Bearer {token}'},
+                                    json={"title": title,
+                                          "description": description,
+                                          "price": 80.0, "latitude": 10.0,
+                                          "longitude": 10.0})
+        self.assertEqual(response.status_code, 201)
+        return response.get_json()['id']
+
+    def _search(self, query, **params):
+        response = self.client.get('/api/v1/places/search',
+                                   query_string={'q': query, **params})
+        self.assertEqual(response.status_code, 200)
+        return [place['id'] for place in response.get_json()]
+
+    def test_search_ranks_title_matches_first(self):
+        """Test search matches titles and descriptions, titles ranked first"""
+        _, token = self._create_user_and_login("fts1@example.com")
+        described = self._create_searchable_place(
+            token, "Quiet flat", "Five minutes from the lighthouse")
+        titled = self._create_searchable_place(
+            token, "Lighthouse keeper cottage", "Stone walls")
+        self._create_searchable_place(token, "City loft", "Downtown")
+
+        self.assertEqual(self._search("lighthouse"), [titled, described])
+        # Every word must match, the last one may be a prefix
+        self.assertEqual(self._search("lighthouse sto"), [titled])
+        self.assertEqual(self._search("lighthouse", limit=1), [titled])
+
+    def test_search_follows_review_writes(self):
+        """Test review text is searchable and kept in sync"""
+        owner_id, owner_token = self._create_user_and_login("fts2@example.com")
+        _, guest_token = self._create_user_and_login("fts3@example.com")
+        place_id = self._create_searchable_place(
+            owner_token, "Harbour room", "Near the port")
+        headers = {'Authorization': f'Bearer {guest_token}'}
+
+        response = self.client.post('/api/v1/reviews/', headers=headers,
+                                    json={"text": "Amazing croissants nearby",
+                                          "rating": 5, "place_id": place_id})
+        self.assertEqual(response.status_code, 201)
+        review_id = response.get_json()['id']
+        self.assertEqual(self._search("croissants"), [place_id])
+
+        response = self.client.put(f'/api/v1/reviews/{review_id}',
+                                   headers=headers,
+                                   json={"text": "Great pastries", "rating": 4})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._search("croissants"), [])
+        self.assertEqual(self._search("pastries"), [place_id])
+
+        response = self.client.delete(f'/api/v1/reviews/{review_id}',
+                                      headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._search("pastries"), [])
+        self.assertEqual(self._search("harbour"), [place_id])
+
+    def test_search_index_writes_only_changed_columns(self):
+        """Test the FTS table lookup is cached and writes touch their fields"""
+        from sqlalchemy import event
+        _, owner_token = self._create_user_and_login("fts5@example.com")
+        _, guest_token = self._create_user_and_login("fts6@example.com")
+        place_id = self._create_searchable_place(
+            owner_token, "Mill house", "By the river")
+        statements = []
+
+        def listener(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        with self.app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', listener)
+        try:
+            response = self.client.post(
+                '/api/v1/reviews/',
+                headers={'Authorization': f'Bearer {guest_token}'},
+                json={"text": "Lovely waterwheel", "rating": 5,
+                      "place_id": place_id})
+            self.assertEqual(response.status_code, 201)
+            response = self.client.put(
+                f'/api/v1/places/{place_id}',
+                headers={'Authorization': f'Bearer {owner_token}'},
+                json={"description": "By the canal"})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(self._search("mill canal waterwheel"), [place_id])
+        finally:
+            event.remove(engine, 'before_cursor_execute', listener)
+        self.assertEqual(self._search("river"), [])
+        self.assertFalse([s for s in statements if 'sqlite_master' in s])
+        fts_writes = [s for s in statements
+                      if s.startswith(('INSERT INTO places_fts',
+                                       'UPDATE places_fts',
+                                       'DELETE FROM places_fts'))]
+        self.assertEqual(len(fts_writes), 2)
+        self.assertTrue(all(s.startswith('UPDATE') for s in fts_writes))
+        self.assertNotIn('group_concat', ' '.join(fts_writes))
+        self.assertNotIn('title=', fts_writes[1])
+
+    def test_search_input_handling(self):
+        """Test accents are folded, query syntax is ignored, q is required"""
+        _, token = self._create_user_and_login("fts4@example.com")
+        place_id = self._create_searchable_place(
+            token, "Café de la plage", "Vue mer")
+
+        self.assertEqual(self._search("cafe"), [place_id])
+        self.assertEqual(self._search('"plage" (mer* -'), [place_id])
+        self.assertEqual(self._search("()*"), [])
+
+        response = self.client.get('/api/v1/places/search')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/v1/places/search?q=cafe&limit=0')
+        self.assertEqual(response.status_code, 400)
+
+    # ========================================================================
+    # PLACE FILTER TESTS - Price and rating ranges applied in SQL
+    # ========================================================================
+
+    def _create_priced_place(self, token, title, price):
+        """Helper method to create a place with the given price"""
+        response = self.client.post('/api/v1/places/',
+                                    headers={'Authorization': f'Bearer {token}'},
+                                    json={"title": title, "price": price,
+                                          "latitude": 0.0, "longitude": 0.0})
+        self.assertEqual(response.status_code, 201)
+        return response.get_json()['id']
+
+    def test_places_price_and_rating_filters(self):
+        """Test min_price, max_price and min_rating narrow the list"""
+        _, owner_token = self._create_user_and_login("filter1@example.com")
+        _, guest_token = self._create_user_and_login("filter2@example.com")
+        cheap = self._create_priced_place(owner_token, "Filter cheap", 20.0)
+        middle = self._create_priced_place(owner_token, "Filter middle", 60.0)
+        luxury = self._create_priced_place(owner_token, "Filter luxury", 300.0)
+        for place_id, rating in ((cheap, 2), (middle, 5)):
+            response = self.client.post(
+                '/api/v1/reviews/',
+                headers={'Authorization': f'Bearer {guest_token}'},
+                json={"text": "Stayed here", "rating": rating,
+                      "place_id": place_id})
+            self.assertEqual(response.status_code, 201)
+
+        def ids(query):
+            response = self.client.get('/api/v1/places/?' + query)
+            self.assertEqual(response.status_code, 200)
+            return {place['id'] for place in response.get_json()}
+
+        self.assertEqual(ids('max_price=60'), {cheap, middle})
+        self.assertEqual(ids('min_price=50&max_price=500'), {middle, luxury})
+        self.assertEqual(ids('min_rating=4'), {middle})
+        self.assertEqual(ids('min_price=10&min_rating=1'), {cheap, middle})
+
+        # Filters combine with pagination, the cursor keeps them
+        response = self.client.get('/api/v1/places/?min_price=50&limit=1')
+        self.assertEqual([p['id'] for p in response.get_json()], [middle])
+        cursor = response.headers['X-Next-Cursor']
+        self.assertEqual(ids(f'min_price=50&limit=1&cursor={cursor}'),
+                         {luxury})
+
+    def test_places_filter_validation(self):
+        """Test invalid filter values are rejected"""
+        for query in ('min_price=abc', 'max_price=-1',
+                      'min_price=100&max_price=10', 'min_rating=6'):
+            response = self.client.get('/api/v1/places/?' + query)
+            self.assertEqual(response.status_code, 400, query)
+            self.assertIn('error', response.get_json())
+
+    # ========================================================================
+    # AMENITY FACET TESTS - Filter by amenities and count them
+    # ========================================================================
+
+    def test_places_amenity_filter_and_facets(self):
+        """Test amenities= keeps places with all amenities, facets count them"""
+        admin_token = self._create_admin_and_login()
+        admin = {'Authorization': f'Bearer {admin_token}'}
+        amenity_ids = {}
+        for name in ("Facet WiFi", "Facet Pool", "Facet Sauna"):
+            response = self.client.post('/api/v1/amenities/', headers=admin,
+                                        json={"name": name})
+            self.assertEqual(response.status_code, 201)
+            amenity_ids[name] = response.get_json()['id']
+        wifi, pool, sauna = amenity_ids.values()
+
+        _, token = self._create_user_and_login("facet1@example.com")
+        both = self._create_priced_place(token, "Facet both", 100.0)
+        wifi_only = self._create_priced_place(token, "Facet wifi", 40.0)
+        self._create_priced_place(token, "Facet none", 40.0)
+        for place_id, amenity_id in ((both, wifi), (both, pool),
+                                     (wifi_only, wifi)):
+            response = self.client.post(
+                f'/api/v1/places/{place_id}/amenities',
+                headers={'Authorization': f'Bearer {token}'},
+                json={"amenity_id": amenity_id})
+            self.assertEqual(response.status_code, 200)
+
+        def ids(query):
+            response = self.client.get('/api/v1/places/?' + query)
+            self.assertEqual(response.status_code, 200)
+            return {place['id'] for place in response.get_json()}
+
+        self.assertEqual(ids(f'amenities={wifi}'), {both, wifi_only})
+        self.assertEqual(ids(f'amenities={wifi},{pool}'), {both})
+        self.assertEqual(ids(f'amenities={wifi},{wifi}'), {both, wifi_only})
+        self.assertEqual(ids(f'amenities={sauna}'), set())
+        self.assertEqual(ids(f'amenities={wifi}&max_price=50'), {wifi_only})
+
+        response = self.client.get('/api/v1/places/facets')
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(data['total'], 3)
+        self.assertEqual([(a['name'], a['count']) for a in data['amenities']],
+                         [("Facet WiFi", 2), ("Facet Pool", 1)])
+
+        # Counts follow the current filters, and are cached per query
+        response = self.client.get('/api/v1/places/facets?max_price=50')
+        data = response.get_json()
+        self.assertEqual(data['total'], 2)
+        self.assertEqual([(a['id'], a['count']) for a in data['amenities']],
+                         [(wifi, 1)])
+        response = self.client.get(
+            '/api/v1/places/facets?max_price=50',
+            headers={'If-None-Match': response.headers['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+    # ========================================================================
+    # SPARSE FIELDSET TESTS - ?fields= selects the returned fields
+    # ========================================================================
+
+    def test_place_list_and_detail_sparse_fieldsets(self):
+        """Test fields= trims lists and details and varies the ETag"""
+        _, token = self._create_user_and_login("fields1@example.com")
+        place_id = self._create_priced_place(token, "Fields place", 80.0)
+
+        response = self.client.get('/api/v1/places/?fields=price,id')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), [{'id': place_id, 'price': 80.0}])
+
+        full = self.client.get(f'/api/v1/places/{place_id}')
+        self.assertIn('owner', full.get_json())
+        response = self.client.get(
+            f'/api/v1/places/{place_id}?fields=title, owner')
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(set(data), {'title', 'owner'})
+        self.assertEqual(data['owner'], full.get_json()['owner'])
+        self.assertNotEqual(response.headers['ETag'], full.headers['ETag'])
+        response = self.client.get(
+            f'/api/v1/places/{place_id}?fields=title, owner',
+            headers={'If-None-Match': response.headers['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+        # Unknown fields are rejected, empty ones mean every field
+        response = self.client.get('/api/v1/places/?fields=id,secret')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('secret', response.get_json()['error'])
+        response = self.client.get(f'/api/v1/places/{place_id}?fields=')
+        self.assertEqual(response.get_json(), full.get_json())
+
+    def test_user_and_review_sparse_fieldsets(self):
+        """Test fields= on user and review endpoints"""
+        user_id, _ = self._create_user_and_login("fields2@example.com")
+        response = self.client.get(
+            f'/api/v1/users/{user_id}?fields=email,first_name')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.get_json()),
+                         ['first_name', 'email'])
+        response = self.client.get('/api/v1/users/?fields=password')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/v1/reviews/?fields=rating')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(all(list(review) == ['rating']
+                            for review in response.get_json()))
+
+    def test_serializer_compiles_field_subsets(self):
+        """Test Serializer output order, subsets and spec validation"""
+        from types import SimpleNamespace
+        from app.api.v1.serializers import Serializer
+
+        serializer = Serializer({
+            'id': 'id',
+            'owner_name': 'owner.name',
+            'label': lambda obj: obj.id.upper()
+        })
+        obj = SimpleNamespace(id='a1', owner=SimpleNamespace(name='Ann'))
+        self.assertEqual(serializer.dump(obj),
+                         {'id': 'a1', 'owner_name': 'Ann', 'label': 'A1'})
+        fields = serializer.parse_fields('label,id,label')
+        self.assertEqual(fields, ('id', 'label'))
+        self.assertEqual(serializer.dump_many([obj], fields),
+                         [{'id': 'a1', 'label': 'A1'}])
+        self.assertIs(serializer.function(fields),
+                      serializer.function(('id', 'label')))
+        with self.assertRaises(ValueError):
+            serializer.parse_fields('id,nope')
+        with self.assertRaises(ValueError):
+            Serializer({'id': 'id; import os'})
+
+    # ========================================================================
+    # COMPRESSION TESTS - Negotiated gzip/deflate and streamed lists
+    # ========================================================================
+
+    def test_large_responses_are_compressed(self):
+        """Test gzip above the size threshold, ETag suffix and 304s"""
+        import gzip
+        import json
+
+        user_id, token = self._create_user_and_login("gzip1@example.com")
+        for i in range(12):
+            self._create_priced_place(token, f"Compressed place {i}", 50.0 + i)
+
+        plain = self.client.get('/api/v1/places/')
+        self.assertNotIn('Content-Encoding', plain.headers)
+        self.assertIn('Accept-Encoding', plain.headers['Vary'])
+
+        response = self.client.get('/api/v1/places/',
+                                   headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertLess(len(response.data), len(plain.data))
+        self.assertEqual(json.loads(gzip.decompress(response.data)),
+                         plain.get_json())
+        self.assertEqual(response.headers['ETag'],
+                         plain.headers['ETag'][:-1] + '-gzip"')
+        response = self.client.get(
+            '/api/v1/places/',
+            headers={'Accept-Encoding': 'gzip',
+                     'If-None-Match': response.headers['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+        # Small bodies and refused encodings are sent as-is
+        response = self.client.get(f'/api/v1/users/{user_id}',
+                                   headers={'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', response.headers)
+        response = self.client.get(
+            '/api/v1/places/', headers={'Accept-Encoding': 'gzip;q=0'})
+        self.assertNotIn('Content-Encoding', response.headers)
+
+    def test_long_lists_are_streamed_compressed(self):
+        """Test lists above JSON_STREAM_MIN_ITEMS stream through deflate"""
+        import json
+        import zlib
+
+        self.app.config['JSON_STREAM_MIN_ITEMS'] = 2
+        for i in range(5):
+            self._create_user_and_login(f"stream{i}@example.com")
+
+        plain = self.client.get('/api/v1/users/?fields=id,email')
+        self.assertTrue(plain.is_streamed)
+        self.assertEqual(len(plain.get_json()), 5)
+        self.assertIn('ETag', plain.headers)
+
+        response = self.client.get('/api/v1/users/?fields=id,email',
+                                   headers={'Accept-Encoding': 'deflate'})
+        self.assertEqual(response.headers['Content-Encoding'], 'deflate')
+        self.assertNotIn('Content-Length', response.headers)
+        self.assertEqual(json.loads(zlib.decompress(response.data)),
+                         plain.get_json())
+
+    # ========================================================================
+    # METRICS TESTS - Per-route SQL counts, latency and /api/metrics
+    # ========================================================================
+
+    def test_metrics_count_queries_per_route(self):
+        """Test X-DB-Query-Count and the Prometheus histograms"""
+        _, token = self._create_user_and_login("metrics1@example.com")
+        place_id = self._create_priced_place(token, "Metrics place", 90.0)
+
+        response = self.client.get(f'/api/v1/places/{place_id}')
+        self.assertEqual(response.status_code, 200)
+        queries = int(response.headers['X-DB-Query-Count'])
+        self.assertGreater(queries, 0)
+        self.assertIn('X-DB-Time-Ms', response.headers)
+        # The second read is served by the place detail cache
+        response = self.client.get(f'/api/v1/places/{place_id}')
+        self.assertLess(int(response.headers['X-DB-Query-Count']), queries)
+
+        response = self.client.get('/api/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'text/plain')
+        text = response.get_data(as_text=True)
+        route = 'method="GET",route="/api/v1/places/<place_id>"'
+        self.assertIn('hbnb_http_requests_total{%s,status="200"} 2' % route,
+                      text)
+        self.assertIn('hbnb_db_queries_per_request_count{%s} 2' % route, text)
+        self.assertIn('hbnb_http_request_duration_seconds_bucket{%s,le="+Inf"}'
+                      ' 2' % route, text)
+        self.assertIn('# TYPE hbnb_db_time_per_request_seconds histogram',
+                      text)
+        # Facade statistics, counted since the process started
+        self.assertRegex(text, r'\nhbnb_place_cache_hits_total \d+\n')
+        self.assertRegex(text, r'\nhbnb_password_pool_rejected_total \d+\n')
+
+    def test_slow_requests_and_statements_are_logged(self):
+        """Test the slow request and slow SQL logs and counters"""
+        from config import DevelopmentConfig
+
+        class SlowConfig(DevelopmentConfig):
+            SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+            SLOW_REQUEST_MS = 0
+            SLOW_QUERY_MS = 0
+
+        app = create_app(SlowConfig)
+        with app.app_context():
+            db.create_all()
+        with self.assertLogs('app.metrics', level='WARNING') as logs:
+            response = app.test_client().get('/api/v1/amenities/')
+        self.assertEqual(response.status_code, 200)
+        output = '\n'.join(logs.output)
+        self.assertIn('Slow SQL statement', output)
+        self.assertIn('SELECT', output)
+        self.assertIn('Slow request GET /api/v1/amenities/', output)
+        text = app.test_client().get('/api/metrics').get_data(as_text=True)
+        self.assertIn('hbnb_slow_requests_total 1', text)
+
+    def test_metrics_require_admin_unless_public(self):
+        """Test /api/metrics is admin only without METRICS_PUBLIC"""
+        from config import DevelopmentConfig
+
+        class PrivateMetricsConfig(DevelopmentConfig):
+            SQLALCHEMY_DATABASE_URI = 'sqlite:///test_endpoints.db'
+            METRICS_PUBLIC = False
+
+        self.assertEqual(self.client.get('/api/metrics').status_code, 200)
+        _, token = self._create_user_and_login("metrics2@example.com")
+        admin_token = self._create_admin_and_login()
+        client = create_app(PrivateMetricsConfig).test_client()
+        self.assertEqual(client.get('/api/metrics').status_code, 401)
+        response = client.get('/api/metrics',
+                              headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 403)
+        response = client.get(
+            '/api/metrics', headers={'Authorization': f'Bearer {admin_token}'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_failed_statement_leaves_no_timer_behind(self):
+        """Test statements failing in the driver do not leak timings"""
+        from sqlalchemy import text
+        with self.app.app_context():
+            with db.engine.connect() as connection:
+                with self.assertRaises(Exception):
+                    connection.execute(text('SELECT * FROM no_such_table'))
+                connection.execute(text('SELECT 1'))
+                self.assertNotIn('metrics_started', connection.info)
+
+    # ========================================================================
+    # STARTUP TESTS - Lean script mode, optional API docs, lazy facade
+    # ========================================================================
+
+    def test_lean_app_skips_http_layer(self):
+        """Test create_app(http=False) only sets up the database"""
+        from config import DevelopmentConfig
+        from app.services import get_facade
+
+        class ScriptConfig(DevelopmentConfig):
+            SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+            PLACE_CACHE_SIZE = 7
+
+        app = create_app(ScriptConfig, http=False)
+        facade = get_facade()
+        rules = {rule.rule for rule in app.url_map.iter_rules()}
+        self.assertEqual(rules, {'/static/<path:filename>'})
+        self.assertEqual(app.after_request_funcs, {})
+        # The facade is configured for the newest app
+        self.assertEqual(facade.place_cache.stats()['maxsize'], 7)
+        with app.app_context():
+            db.create_all()
+            amenity = facade.create_amenity({'name': 'Script amenity'})
+            self.assertEqual(facade.get_amenity(amenity.id).name,
+                             'Script amenity')
+
+    def test_lean_app_metadata_and_facade_in_fresh_interpreter(self):
+        """Test a lean app creates every table and facade is the singleton"""
+        import os
+        import subprocess
+        import sys
+        script = (
+            "from app import create_app, db\n"
+            "from app.services import get_facade\n"
+            "from app.services.facade import HBnBFacade\n"
+            "from config import DevelopmentConfig\n"
+            "class ScriptConfig(DevelopmentConfig):\n"
+            "    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'\n"
+            "app = create_app(ScriptConfig, http=False)\n"
+            "facade = get_facade()\n"
+            "from app.services import facade as imported\n"
+            "assert isinstance(facade, HBnBFacade) and imported is facade\n"
+            "with app.app_context():\n"
+            "    db.create_all()\n"
+            "    print(sorted(db.metadata.tables))\n"
+            "    print(facade.get_all_amenities())\n")
+        result = subprocess.run(
+            [sys.executable, '-c', script], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.assertEqual(result.returncode, 0, result.stderr)
+        tables, amenities = result.stdout.splitlines()
+        self.assertEqual(tables, str(sorted(db.metadata.tables)))
+        self.assertEqual(amenities, '[]')
+
+    def test_api_docs_can_be_disabled(self):
+        """Test API_DOCS=False drops the Swagger UI and spec only"""
+        from config import DevelopmentConfig
+
+        class NoDocsConfig(DevelopmentConfig):
+            SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+            API_DOCS = False
+
+        self.assertEqual(self.client.get('/swagger.json').status_code, 200)
+        app = create_app(NoDocsConfig)
+        with app.app_context():
+            db.create_all()
+        client = app.test_client()
+        self.assertEqual(client.get('/swagger.json').status_code, 404)
+        self.assertEqual(client.get('/api/v1/').status_code, 404)
+        self.assertEqual(client.get('/api/v1/amenities/').status_code, 200)
+        self.assertIsNone(client.get('/api/').get_json()['documentation'])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -30,9 +30,11 @@ class TestDatabasePersistence(unittest.TestCase):
 
     def tearDown(self):
         """Clean up after each test."""
+        from app.persistence.bootstrap import bootstrap_checksums
         with self.app.app_context():
             db.session.remove()
             db.drop_all()
+            bootstrap_checksums.drop(db.engine, checkfirst=True)
         
         # Remove test database file
         try:
@@ -312,5 +314,469 @@ class TestDatabasePersistence(unittest.TestCase):
                 db.session.commit()
 
 
+    def test_rating_aggregates_rebuild_persists(self):
+        """Test rebuilt rating aggregates match reviews written directly."""
+        # Step 1: Write reviews without going through the facade
+        with self.app.app_context():
+            owner = UserModel(first_name='Agg', last_name='Owner',
+                              email='agg.owner@example.com', password='x')
+            place = PlaceModel(title='Aggregate Place', price=80.0,
+                               latitude=1.0, longitude=2.0, owner=owner)
+            db.session.add_all([owner, place])
+            for index, rating in enumerate([5, 4, 4]):
+                reviewer = UserModel(first_name='Agg', last_name='Reviewer',
+                                     email=f'agg.reviewer{index}@example.com',
+                                     password='x')
+                db.session.add(reviewer)
+                db.session.add(ReviewModel(text='Direct review', rating=rating,
+                                           place=place, user=reviewer))
+            db.session.commit()
+            place_id = place.id
+            self.assertEqual(place.review_count, 0)
+
+            from app.services import facade
+            facade.rebuild_rating_aggregates()
+
+        # Step 2: Verify aggregates in a new context
+        with self.app.app_context():
+            place = db.session.get(PlaceModel, place_id)
+            self.assertEqual(place.review_count, 3)
+            self.assertEqual(place.rating_sum, 13)
+            self.assertEqual(place.average_rating, 4.33)
+            self.assertEqual(place.rating_distribution,
+                             {'1': 0, '2': 0, '3': 0, '4': 2, '5': 1})
+
+
+    def test_seeder_is_deterministic_and_consistent(self):
+        """Test seeded datasets repeat and carry correct aggregates."""
+        from sqlalchemy import select
+        from app.persistence.seeder import DatasetSeeder
+        from app.services import facade
+
+        def seed_and_snapshot():
+            with self.app.app_context():
+                db.drop_all()
+                db.create_all()
+                counts = DatasetSeeder(seed=7, batch_size=40).seed(
+                    users=30, places=50, reviews=200, amenities=12)
+                snapshot = {
+                    'users': db.session.scalars(select(UserModel.id)
+                                                .order_by(UserModel.email)
+                                                ).all(),
+                    'places': db.session.execute(
+                        select(PlaceModel.id, PlaceModel.title,
+                               PlaceModel.price, PlaceModel.review_count,
+                               PlaceModel.rating_sum)
+                        .order_by(PlaceModel.id)).all(),
+                    'reviews': db.session.execute(
+                        select(ReviewModel.id, ReviewModel.place_id,
+                               ReviewModel.user_id, ReviewModel.rating)
+                        .order_by(ReviewModel.id)).all()
+                }
+                return counts, snapshot
+
+        # Step 1: The same seed generates the same rows
+        counts, first = seed_and_snapshot()
+        _, second = seed_and_snapshot()
+        self.assertEqual(first, second)
+        self.assertEqual((counts['users'], counts['places'],
+                          counts['reviews']), (30, 50, 200))
+
+        # Step 2: Precomputed aggregates match a rebuild from the reviews,
+        # owners never review their places and generated users can log in
+        with self.app.app_context():
+            facade.rebuild_rating_aggregates()
+            rebuilt = db.session.execute(
+                select(PlaceModel.id, PlaceModel.title, PlaceModel.price,
+                       PlaceModel.review_count, PlaceModel.rating_sum)
+                .order_by(PlaceModel.id)).all()
+            self.assertEqual(rebuilt, second['places'])
+            self_reviews = db.session.scalars(
+                select(ReviewModel.id).join(PlaceModel).where(
+                    PlaceModel.owner_id == ReviewModel.user_id)).all()
+            self.assertEqual(self_reviews, [])
+            user = facade.get_user_by_email('user3@seed.example.com')
+            self.assertTrue(user.verify_password('seed-password'))
+
+
+    def test_unit_of_work_commits_once_or_rolls_back(self):
+        """Test scripts can group facade writes into one transaction."""
+        from app.persistence.unit_of_work import unit_of_work
+        from app.services import facade
+
+        # Step 1: A failing block leaves nothing behind
+        with self.app.app_context():
+            with self.assertRaises(RuntimeError):
+                with unit_of_work():
+                    facade.create_amenity({'name': 'Rolled Back'})
+                    raise RuntimeError('abort')
+
+        # Step 2: A successful block commits every write together
+        with self.app.app_context():
+            with unit_of_work():
+                facade.create_amenity({'name': 'Sauna'})
+                facade.create_amenity({'name': 'Hammam'})
+
+        # Step 3: Verify in a new context
+        with self.app.app_context():
+            names = {amenity.name for amenity in AmenityModel.query.all()}
+            self.assertEqual(names, {'Sauna', 'Hammam'})
+
+
+    def test_bootstrap_applies_each_step_once(self):
+        """Test the bootstrap seeds an empty database, then does nothing."""
+        from app.persistence.bootstrap import bootstrap
+        from app.services import facade
+
+        # Step 1: First run creates the schema and loads the seed data
+        with self.app.app_context():
+            steps, conflicts = bootstrap()
+            self.assertEqual(conflicts, {})
+            self.assertEqual([step[0] for step in steps],
+                             ['schema', 'insert_data.sql', 'derived data'])
+
+        # Step 2: Seed rows have their derived data
+        with self.app.app_context():
+            admin = facade.get_user_by_email('ADMIN@hbnb.io')
+            self.assertTrue(admin.is_admin)
+            place = db.session.get(PlaceModel,
+                                   'a1b2c3d4-e5f6-7890-abcd-ef1234567890')
+            self.assertEqual((place.review_count, place.rating_sum), (2, 9))
+            self.assertIn(place, facade.search_places('Nice sea', 10))
+
+            # Step 3: Repeat runs skip every step
+            steps, _ = bootstrap()
+            self.assertEqual([(step[0], step[1]) for step in steps],
+                             [('schema', 'unchanged'),
+                              ('insert_data.sql', 'unchanged')])
+            self.assertEqual(UserModel.query.count(), 3)
+
+
+    def test_bootstrap_failure_leaves_database_untouched(self):
+        """Test the schema and seed data are one transaction."""
+        import tempfile
+        from sqlalchemy import inspect
+        from sqlalchemy.exc import OperationalError
+        from app.persistence.bootstrap import bootstrap
+
+        with self.app.app_context():
+            db.drop_all()
+
+        with tempfile.TemporaryDirectory() as sql_dir:
+            with open(os.path.join(sql_dir, 'broken.sql'), 'w') as file:
+                file.write("INSERT INTO amenities (id, name) "
+                           "VALUES ('a-1', 'Sauna; Hammam');\n"
+                           "INSERT INTO missing_table VALUES (1);\n")
+            with self.app.app_context():
+                with self.assertRaises(OperationalError):
+                    bootstrap(sql_dir, ('broken.sql',))
+
+        with self.app.app_context():
+            tables = inspect(db.engine).get_table_names()
+            self.assertNotIn('amenities', tables)
+            self.assertNotIn('bootstrap_checksums', tables)
+
+
+    def test_bootstrap_upgrades_baseline_database(self):
+        """Test the bootstrap adds the columns missing from old databases."""
+        from sqlalchemy import inspect, text
+        from app.persistence.bootstrap import bootstrap
+        from app.services import facade
+
+        # Step 1: Build the schema of the first release, with some data
+        with self.app.app_context():
+            db.drop_all()
+            for statement in (
+                    'CREATE TABLE amenities (name VARCHAR(50) NOT NULL, '
+                    'id VARCHAR(36) NOT NULL, created_at DATETIME, '
+                    'updated_at DATETIME, PRIMARY KEY (id), UNIQUE (name))',
+                    'CREATE TABLE users (first_name VARCHAR(50) NOT NULL, '
+                    'last_name VARCHAR(50) NOT NULL, '
+                    'email VARCHAR(120) NOT NULL, '
+                    'password VARCHAR(128) NOT NULL, is_admin BOOLEAN, '
+                    'id VARCHAR(36) NOT NULL, created_at DATETIME, '
+                    'updated_at DATETIME, PRIMARY KEY (id), UNIQUE (email))',
+                    'CREATE TABLE places (owner_id VARCHAR(36), '
+                    'title VARCHAR(50) NOT NULL, description VARCHAR, '
+                    'price FLOAT NOT NULL, latitude FLOAT NOT NULL, '
+                    'longitude FLOAT NOT NULL, id VARCHAR(36) NOT NULL, '
+                    'created_at DATETIME, updated_at DATETIME, '
+                    'PRIMARY KEY (id), FOREIGN KEY(owner_id) '
+                    'REFERENCES users (id) ON DELETE CASCADE)',
+                    'CREATE TABLE place_amenity ('
+                    'place_id VARCHAR(36) NOT NULL, '
+                    'amenity_id VARCHAR(36) NOT NULL, '
+                    'PRIMARY KEY (place_id, amenity_id), '
+                    'FOREIGN KEY(place_id) REFERENCES places (id), '
+                    'FOREIGN KEY(amenity_id) REFERENCES amenities (id))',
+                    'CREATE TABLE reviews (text TEXT NOT NULL, '
+                    'rating INTEGER NOT NULL, place_id VARCHAR(36), '
+                    'user_id VARCHAR(36), id VARCHAR(36) NOT NULL, '
+                    'created_at DATETIME, updated_at DATETIME, '
+                    'PRIMARY KEY (id), '
+                    'CONSTRAINT unique_user_place UNIQUE (user_id, place_id), '
+                    'FOREIGN KEY(place_id) REFERENCES places (id) '
+                    'ON DELETE CASCADE, FOREIGN KEY(user_id) '
+                    'REFERENCES users (id) ON DELETE CASCADE)',
+                    "INSERT INTO users (id, first_name, last_name, email, "
+                    "password, is_admin) VALUES ('old-user', 'Old', 'User', "
+                    "'Old.User@Example.com', 'x', 0)",
+                    "INSERT INTO places (id, owner_id, title, price, "
+                    "latitude, longitude) VALUES ('old-place', 'old-user', "
+                    "'Old house', 50, 10, 20)",
+                    "INSERT INTO reviews (id, place_id, user_id, text, "
+                    "rating) VALUES ('old-review', 'old-place', 'old-user', "
+                    "'Fine', 4)"):
+                db.session.execute(text(statement))
+            db.session.commit()
+
+            steps, conflicts = bootstrap()
+            self.assertEqual(conflicts, {})
+            self.assertEqual(steps[1][1],
+                             'skipped, the database already has users')
+
+        # Step 2: Every model column exists and the old rows are usable
+        with self.app.app_context():
+            inspector = inspect(db.engine)
+            for table in db.metadata.sorted_tables:
+                columns = {column['name']
+                           for column in inspector.get_columns(table.name)}
+                self.assertEqual(columns, set(table.columns.keys()))
+            place = db.session.get(PlaceModel, 'old-place')
+            self.assertEqual((place.review_count, place.rating_sum,
+                              place.rating_4_count, place.rating_avg),
+                             (1, 4, 1, 4.0))
+            user = facade.get_user_by_email('old.user@example.com')
+            self.assertEqual(user.id, 'old-user')
+
+
+    def test_sql_schema_files_match_models(self):
+        """Test sql/*.sql declare exactly the tables of the models."""
+        from sqlalchemy.dialects import sqlite
+        from app.persistence.bootstrap import (SEED_FILES, SQL_DIR,
+                                               schema_statements,
+                                               split_statements)
+
+        declared = []
+        for name in sorted(os.listdir(SQL_DIR)):
+            if name.endswith('.sql') and name not in SEED_FILES:
+                with open(os.path.join(SQL_DIR, name)) as file:
+                    declared += split_statements(file.read())
+        with self.app.app_context():
+            expected = schema_statements(sqlite.dialect())
+        self.assertEqual(sorted(' '.join(sql.split()) for sql in declared),
+                         sorted(' '.join(sql.split()) for sql in expected))
+
+
+    def test_normalized_email_backfill(self):
+        """Test the backfill adds, fills and indexes email_normalized."""
+        from sqlalchemy import inspect, text
+        from app.services import facade
+
+        # Step 1: Recreate the legacy users table without the column
+        with self.app.app_context():
+            for statement in (
+                    'DROP INDEX ix_users_email_normalized',
+                    'ALTER TABLE users DROP COLUMN email_normalized',
+                    "INSERT INTO users (id, first_name, last_name, email, "
+                    "password, is_admin) VALUES ('legacy-1', 'Old', 'User', "
+                    "'Old.User@Example.com', 'x', 0)"):
+                db.session.execute(text(statement))
+            db.session.commit()
+
+            updated, conflicts = facade.backfill_normalized_emails()
+            self.assertEqual((updated, conflicts), (1, {}))
+
+        # Step 2: Verify the lookup path in a new context
+        with self.app.app_context():
+            user = facade.get_user_by_email('old.user@example.COM')
+            self.assertEqual(user.id, 'legacy-1')
+            indexes = {index['name']: index['unique'] for index in
+                       inspect(db.engine).get_indexes('users')}
+            self.assertTrue(indexes['ix_users_email_normalized'])
+
+
+    def test_production_sqlite_pragmas(self):
+        """Test ProductionConfig pragmas are set on every connection."""
+        import tempfile
+        from sqlalchemy import text
+        from sqlalchemy.exc import IntegrityError
+        from config import ProductionConfig
+
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'production.db')
+
+        class TestProductionConfig(ProductionConfig):
+            SQLALCHEMY_DATABASE_URI = 'sqlite:///' + path
+
+        app = create_app(TestProductionConfig)
+        try:
+            with app.app_context():
+                db.create_all()
+                values = {name: db.session.execute(
+                    text('PRAGMA ' + name)).scalar() for name in (
+                    'journal_mode', 'synchronous', 'busy_timeout',
+                    'foreign_keys')}
+                self.assertEqual(values, {'journal_mode': 'wal',
+                                          'synchronous': 1,
+                                          'busy_timeout': 5000,
+                                          'foreign_keys': 1})
+
+                # Foreign keys are enforced
+                with self.assertRaises(IntegrityError):
+                    db.session.execute(text(
+                        "INSERT INTO places (id, title, price, latitude, "
+                        "longitude, owner_id, review_count, rating_sum, "
+                        "rating_1_count, rating_2_count, rating_3_count, "
+                        "rating_4_count, rating_5_count) VALUES ('p', 't', "
+                        "1, 0, 0, 'missing-user', 0, 0, 0, 0, 0, 0, 0)"))
+                db.session.rollback()
+                db.session.remove()
+                db.drop_all()
+                for engine in db.engines.values():
+                    engine.dispose()
+        finally:
+            for name in os.listdir(directory):
+                os.remove(os.path.join(directory, name))
+            os.rmdir(directory)
+
+
+    def test_reads_use_replica_until_the_session_writes(self):
+        """Test repository reads go to the replica, then stick to primary."""
+        import tempfile
+        from datetime import datetime, timezone
+        from config import DevelopmentConfig
+        from app.services import facade
+
+        directory = tempfile.mkdtemp()
+
+        class ReplicaConfig(DevelopmentConfig):
+            SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(
+                directory, 'primary.db')
+            SQLALCHEMY_READ_REPLICA_URI = 'sqlite:///' + os.path.join(
+                directory, 'replica.db')
+
+        app = create_app(ReplicaConfig)
+        try:
+            # Step 1: A row only the replica has (as if not yet deleted
+            # there) tells which database served a read
+            with app.app_context():
+                db.create_all()
+                db.metadata.create_all(db.engines['replica'])
+                now = datetime.now(timezone.utc)
+                with db.engines['replica'].begin() as connection:
+                    connection.execute(AmenityModel.__table__.insert(), {
+                        'id': 'replica-only', 'name': 'Replica',
+                        'created_at': now, 'updated_at': now})
+
+            # Step 2: Reads are served by the replica
+            response = app.test_client().get('/api/v1/amenities/replica-only')
+            self.assertEqual(response.status_code, 200)
+            with app.app_context():
+                self.assertEqual(
+                    [a.id for a in facade.get_all_amenities()],
+                    ['replica-only'])
+
+            # Step 3: Requests that write read from the primary throughout
+            with app.test_request_context('/api/v1/amenities/',
+                                          method='POST'):
+                app.preprocess_request()
+                self.assertIsNone(facade.get_amenity('replica-only'))
+                self.assertEqual(facade.get_all_amenities(), [])
+
+            with app.app_context():
+                # Step 4: After a write the session reads the primary
+                amenity = facade.create_amenity({'name': 'Primary'})
+                self.assertEqual(
+                    [a.id for a in facade.get_all_amenities()], [amenity.id])
+                self.assertIsNone(facade.get_amenity('replica-only'))
+
+                db.session.remove()
+                db.drop_all()
+                for engine in db.engines.values():
+                    engine.dispose()
+        finally:
+            for name in os.listdir(directory):
+                os.remove(os.path.join(directory, name))
+            os.rmdir(directory)
+
+
+    def test_pages_keep_rows_sharing_a_timestamp(self):
+        """Test keyset pages return every row when timestamps collide."""
+        from sqlalchemy import text
+        from app.persistence.repository import SQLAlchemyRepository
+
+        # Step 1: Rows written in the same second, as CURRENT_TIMESTAMP
+        # stores them (no microseconds) and as SQLAlchemy stores them
+        stamps = ['2025-01-01 12:00:00', '2025-01-01 12:00:00',
+                  '2025-01-01 12:00:00', '2025-01-01 12:00:00.000000',
+                  '2025-01-01 12:00:00.250000', '2025-01-01 12:00:01']
+        with self.app.app_context():
+            for index, stamp in enumerate(stamps):
+                db.session.execute(text(
+                    'INSERT INTO amenities (id, name, created_at, updated_at)'
+                    ' VALUES (:id, :name, :stamp, :stamp)'),
+                    {'id': f'amenity-{index}', 'name': f'Amenity {index}',
+                     'stamp': stamp})
+            db.session.commit()
+
+        # Step 2: Walking pages of two returns each row once, in order
+        with self.app.app_context():
+            repository = SQLAlchemyRepository(AmenityModel)
+            ids, cursor = [], None
+            while True:
+                items, cursor = repository.get_page(2, cursor)
+                ids.extend(item.id for item in items)
+                if cursor is None:
+                    break
+            self.assertEqual(ids, [f'amenity-{index}'
+                                   for index in range(len(stamps))])
+
+
+    def test_reviews_by_place_are_filtered_and_ordered(self):
+        """Test reviews by place return only that place's reviews, in order."""
+        from datetime import datetime
+        from sqlalchemy import inspect
+        from app.persistence.review_repository import ReviewRepository
+
+        # Step 1: Reviews of two places, inserted out of chronological order
+        with self.app.app_context():
+            owner = UserModel(first_name='Order', last_name='Owner',
+                              email='order.owner@example.com', password='x')
+            place = PlaceModel(title='Ordered Place', price=50.0,
+                               latitude=1.0, longitude=2.0, owner=owner)
+            other = PlaceModel(title='Other Place', price=60.0,
+                               latitude=3.0, longitude=4.0, owner=owner)
+            db.session.add_all([owner, place, other])
+            expected = []
+            for index, day in enumerate([3, 1, 2]):
+                reviewer = UserModel(first_name=f'Reviewer{index}',
+                                     last_name='Order',
+                                     email=f'order.reviewer{index}@example.com',
+                                     password='x')
+                review = ReviewModel(text=f'Review {day}', rating=4,
+                                     place=place, user=reviewer,
+                                     created_at=datetime(2025, 1, day))
+                db.session.add_all([reviewer, review,
+                                    ReviewModel(text='Elsewhere', rating=2,
+                                                place=other, user=reviewer)])
+                expected.append((day, review))
+            db.session.commit()
+            expected = [(review.id, review.text, review.user.first_name)
+                        for _, review in sorted(expected,
+                                                key=lambda pair: pair[0])]
+            place_id = place.id
+
+        # Step 2: The repository returns them oldest first, authors loaded
+        with self.app.app_context():
+            reviews = ReviewRepository().get_reviews_by_place(place_id)
+            self.assertTrue(all('user' not in inspect(review).unloaded
+                                for review in reviews))
+            self.assertEqual([(review.id, review.text, review.user.first_name)
+                              for review in reviews], expected)
+            self.assertEqual(ReviewRepository().get_reviews_by_place('none'),
+                             [])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -78,26 +78,11 @@ document.addEventListener('DOMContentLoaded', () => {
   // Get the price filter if it exists
   const priceFilter = document.getElementById('price-filter');
 
-  // If the filter exists, listen for changes
+  // If the filter exists, reload the places matching it
+  // The API filters by price, so only matching places are downloaded
   if (priceFilter) {
-    priceFilter.addEventListener('change', (event) => {
-      const selectedPrice = event.target.value; // The selected price
-      const placeCards = document.querySelectorAll('.place-card'); // All places
-
-      // Filter places based on the selected price
-      for (let card of placeCards) {
-        const priceText = card.querySelector('p').textContent;
-        const price = parseInt(priceText.split('$')[1]);
-
-        // Show or hide cards based on filter selection
-        if (selectedPrice === 'all') {
-          card.style.display = 'block';
-        } else if (price <= parseInt(selectedPrice)) {
-          card.style.display = 'block';
-        } else {
-          card.style.display = 'none';
-        }
-      }
+    priceFilter.addEventListener('change', () => {
+      fetchPlaces(getCookie('token'));
     });
   }
 });
@@ -121,15 +106,51 @@ async function loginUser(email, password) {
   });
 
   if (response.ok) {
-    // If login succeeds, save the token and redirect
+    // If login succeeds, save the tokens and redirect
     const data = await response.json();
-    document.cookie = `token=${data.access_token}; path=/`; // Save the token
+    saveTokens(data);
     window.location.href = 'index.html'; // Redirect to home page
   } else {
     alert('Login failed: ' + response.statusText);
   }
 }
 
+/**
+ * Saves the access and refresh tokens returned by the API
+ * @param {Object} data - Response body with access_token and refresh_token
+ */
+function saveTokens(data) {
+  document.cookie = `token=${data.access_token}; path=/`;
+  document.cookie = `refresh_token=${data.refresh_token}; path=/`;
+}
+
+/**
+ * Gets a new access token with the refresh token, without asking
+ * for the password again (each refresh token can only be used once)
+ * @returns {Promise<string|null>} The new access token, or null if the
+ * user has to log in again
+ */
+async function refreshAccessToken() {
+  const refreshToken = getCookie('refresh_token');
+  if (!refreshToken) {
+    return null;
+  }
+
+  const response = await fetch(`${API_BASE_URL}/api/v1/auth/refresh`, {
+    method: 'POST',
+    headers: {
+      'Authorization': `Bearer ${refreshToken}`,
+    },
+  });
+
+  if (!response.ok) {
+    return null;
+  }
+  const data = await response.json();
+  saveTokens(data);
+  return data.access_token;
+}
+
 /**
  * Checks if the user is logged in and updates the interface
  * This function:
@@ -199,6 +220,7 @@ function checkAuthentication() {
 function logout() {
   // Delete the cookie by making it expire in the past
   document.cookie = 'token=; path=/; expires=Thu, 01 Jan 1970 00:00:00 GMT';
+  document.cookie = 'refresh_token=; path=/; expires=Thu, 01 Jan 1970 00:00:00 GMT';
   // Redirect to home page
   window.location.href = 'index.html';
 }
@@ -226,7 +248,21 @@ function getCookie(name) {
 // ============================================
 
 /**
- * Fetches all places from the API
+ * Builds the query string of the places list from the filters on the page
+ * @returns {string} The query string, empty when no filter is selected
+ */
+function getPlaceFilterQuery() {
+  const params = new URLSearchParams();
+  const priceFilter = document.getElementById('price-filter');
+  if (priceFilter && priceFilter.value !== 'all') {
+    params.set('max_price', priceFilter.value);
+  }
+  const query = params.toString();
+  return query ? `?${query}` : '';
+}
+
+/**
+ * Fetches the places matching the selected filters from the API
  * @param {string|null} token - The login token (optional)
  */
 async function fetchPlaces(token) {
@@ -239,7 +275,7 @@ async function fetchPlaces(token) {
     headers.Authorization = `Bearer ${token}`;
   }
   
-  const response = await fetch(`${API_BASE_URL}/api/v1/places/`, {
+  const response = await fetch(`${API_BASE_URL}/api/v1/places/${getPlaceFilterQuery()}`, {
     method: 'GET',
     headers: headers,
   });
@@ -472,11 +508,11 @@ function getStarRating(rating) {
  * @returns {Promise<void>}
  */
 async function submitReview(token, placeId, reviewText, rating) {
-  const response = await fetch(`${API_BASE_URL}/api/v1/reviews/`, {
+  const postReview = (accessToken) => fetch(`${API_BASE_URL}/api/v1/reviews/`, {
     method: 'POST',
     headers: {
       'Content-Type': 'application/json',
-      'Authorization': `Bearer ${token}`,
+      'Authorization': `Bearer ${accessToken}`,
     },
     body: JSON.stringify({
       text: reviewText,
@@ -485,6 +521,16 @@ async function submitReview(token, placeId, reviewText, rating) {
     }),
   });
 
+  let response = await postReview(token);
+
+  // The access token expired: refresh it once and retry
+  if (response.status === 401) {
+    const newToken = await refreshAccessToken();
+    if (newToken) {
+      response = await postReview(newToken);
+    }
+  }
+
   if (response.ok) {
     alert('Review submitted successfully!');
     document.getElementById('review-form').reset();